@@ -29,6 +29,39 @@ SERVER_PORT = int(os.environ.get("SERVER_PORT", 8000))
 
 SERVER_RESULTS_PATH = os.environ.get("SERVER_RESULTS_PATH")
 
+LOC_COUNTER = os.environ.get("LOC_COUNTER", "builtin")
+
+GENERATE_TIMESERIES_WORKERS = int(os.environ.get("GENERATE_TIMESERIES_WORKERS", 1))
+
+MAX_CLASSIFIED_FILE_SIZE = int(os.environ.get("MAX_CLASSIFIED_FILE_SIZE", 1048576))
+OVERSIZED_FILE_POLICY = os.environ.get("OVERSIZED_FILE_POLICY", "sample")
+
+BLOB_STORE_MAX_ENTRIES = int(os.environ.get("BLOB_STORE_MAX_ENTRIES", 2000000))
+MESSAGE_STORE_MAX_ENTRIES = int(os.environ.get("MESSAGE_STORE_MAX_ENTRIES", 1000000))
+
+REVISION_SAMPLING = os.environ.get("REVISION_SAMPLING", "monthly")
+REVISION_SAMPLING_EVERY_N = int(os.environ.get("REVISION_SAMPLING_EVERY_N", 100))
+REVISION_SAMPLING_MAX_K = int(os.environ.get("REVISION_SAMPLING_MAX_K", 60))
+REVISION_SAMPLING_SELECTION = os.environ.get("REVISION_SAMPLING_SELECTION", "even")
+
+COMMIT_EXTRACTOR = os.environ.get("COMMIT_EXTRACTOR", "pydriller")
+COMMIT_INSERT_BATCH_SIZE = int(os.environ.get("COMMIT_INSERT_BATCH_SIZE", 1000))
+COMMIT_QUEUE_SIZE = int(os.environ.get("COMMIT_QUEUE_SIZE", 4))
+COMMIT_EXTRACTION_MODE = os.environ.get("COMMIT_EXTRACTION_MODE", "full")
+
+MIRROR_CACHE_MAX_SIZE = int(os.environ.get("MIRROR_CACHE_MAX_SIZE", 21474836480))
+CLONE_FILTER = os.environ.get("CLONE_FILTER", "")
+
+COMMAND_TIMEOUT = int(os.environ.get("COMMAND_TIMEOUT", 600))
+HEAVY_COMMAND_TIMEOUT = int(os.environ.get("HEAVY_COMMAND_TIMEOUT", 7200))
+HEAVY_COMMANDS_PER_NODE = int(os.environ.get("HEAVY_COMMANDS_PER_NODE", 4))
+
+PATH_DENY_LIST = os.environ.get("PATH_DENY_LIST", "/node_modules/,/bower_components/,/vendor/,/build/,/dist/")
+PATH_FILTER_RULES = os.environ.get("PATH_FILTER_RULES", "gitattributes")
+
+COMMIT_CLASSIFICATION_WORKERS = int(os.environ.get("COMMIT_CLASSIFICATION_WORKERS", 1))
+COMMIT_MESSAGE_INSERT_BATCH_SIZE = int(os.environ.get("COMMIT_MESSAGE_INSERT_BATCH_SIZE", 1000))
+COMMIT_MESSAGE_MATCHES = os.environ.get("COMMIT_MESSAGE_MATCHES", "store")
 
 
 
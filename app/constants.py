@@ -17,6 +17,9 @@ BASE_LOG_PROJECT_DIMENSION = os.path.join(BASE_RESULTS_PATH, "project_dimension"
 BASE_LOG_MAINTENANCE_ACTIVITIES = os.path.join(BASE_RESULTS_PATH, "maintenance_activities") + MY_SEPARATOR
 BASE_SUMMARY_MAINTENANCE_ACTIVITIES = os.path.join(BASE_RESULTS_PATH, "summary_activities") + MY_SEPARATOR
 BASE_LOG_CO_EVOLUTION = os.path.join(BASE_RESULTS_PATH, "co_evolution_analysis") + MY_SEPARATOR
+BASE_BLOB_STORE = os.path.join(BASE_RESULTS_PATH, "blob_store") + MY_SEPARATOR
+BASE_MIRRORS = os.path.join(BASE_RESULTS_PATH, "mirrors") + MY_SEPARATOR
+BASE_LOCKS = os.path.join(BASE_RESULTS_PATH, "locks") + MY_SEPARATOR
 
 RESOURCES_DIR = os.path.join(PARENT_DIRECTORY, "app", "resources") + MY_SEPARATOR
 
@@ -1,15 +1,15 @@
 import uuid
 
-from sqlalchemy import and_, or_, func, desc
+from sqlalchemy import and_, or_, func, desc, insert
 from sqlalchemy.orm import Session
 
 from . import models, schemas
 from datetime import datetime
 
-from .enums import UserStatusEnum
+from .enums import UserStatusEnum, StageEnum
 from .helpers.user_utils import hash_password
 from .models import Commit, Competence, BaseItem, TestData, CodeMetrics, ProjectDimension, CommitMessageItem, \
-    MaintenanceActivitySummary, Correlation, Insights, CodeDistributionDetail
+    MaintenanceActivitySummary, Correlation, Insights, CodeDistributionDetail, PipelineStatistics
 
 # repository
 def get_repository_by_id(db: Session, repository_id: str):
@@ -106,6 +106,38 @@ def delete_additional_data(db: Session, additional_data_id: str):
     db.commit()
     return True
 
+# commit_filter
+def get_commit_filter_by_repository(db: Session, repository_id: str):
+    return db.query(models.CommitFilter).filter(models.CommitFilter.repository == repository_id).first()
+
+def get_commit_filter_by_id(db: Session, commit_filter_id: str):
+    return db.query(models.CommitFilter).filter(models.CommitFilter.id == commit_filter_id).first()
+
+def create_commit_filter(db: Session, commit_filter: schemas.CommitFilterCreate):
+    db_commit_filter = models.CommitFilter(**commit_filter.dict())
+    db.add(db_commit_filter)
+    db.commit()
+    db.refresh(db_commit_filter)
+    return db_commit_filter
+
+def update_commit_filter(db: Session, commit_filter_id: str, commit_filter: schemas.CommitFilterUpdate):
+    db_commit_filter = db.query(models.CommitFilter).filter(models.CommitFilter.id == commit_filter_id).first()
+    db_commit_filter.skip_merges = commit_filter.skip_merges
+    db_commit_filter.author_deny_regex = commit_filter.author_deny_regex
+    db_commit_filter.message_deny_regex = commit_filter.message_deny_regex
+    db_commit_filter.since = commit_filter.since
+    db_commit_filter.until = commit_filter.until
+    db_commit_filter.max_commits = commit_filter.max_commits
+    db_commit_filter.updated_at = datetime.now()
+    db.commit()
+    db.refresh(db_commit_filter)
+    return db_commit_filter
+
+def delete_commit_filter(db: Session, commit_filter_id: str):
+    db.query(models.CommitFilter).filter(models.CommitFilter.id == commit_filter_id).delete()
+    db.commit()
+    return True
+
 # pipeline
 def get_pipeline_by_id(db: Session, pipeline_id: str):
     return db.query(models.Pipeline).filter(models.Pipeline.id == pipeline_id).first()
@@ -220,9 +252,74 @@ def create_commit(db: Session, commit_data: dict):
 
     return db_commit
 
+def create_all_commits(db: Session, commits_data: list[dict]):
+    if commits_data:
+        db.execute(insert(Commit), commits_data)
+        db.commit()
+
 def get_commits_by_pipeline(db: Session, pipeline_id: str):
     return db.query(models.Commit).filter(models.Commit.pipeline_id == pipeline_id).order_by(models.Commit.created_at.asc()).all()
 
+def stream_commits_by_pipeline(db: Session, pipeline_id: str, batch_size: int = 1000):
+    return (db.query(models.Commit.hash, models.Commit.author_name, models.Commit.committer_name,
+                     models.Commit.author_date, models.Commit.message)
+            .filter(models.Commit.pipeline_id == pipeline_id)
+            .order_by(models.Commit.created_at.asc())
+            .yield_per(batch_size))
+
+def get_last_commit_by_pipeline(db: Session, pipeline_id: str):
+    return db.query(models.Commit).filter(models.Commit.pipeline_id == pipeline_id).order_by(models.Commit.created_at.desc()).first()
+
+def count_commits_by_pipeline(db: Session, pipeline_id: str):
+    return db.query(models.Commit).filter(models.Commit.pipeline_id == pipeline_id).count()
+
+def stream_commit_hashes_by_pipeline(db: Session, pipeline_id: str, batch_size: int = 1000):
+    return (db.query(models.Commit.hash)
+            .filter(models.Commit.pipeline_id == pipeline_id)
+            .order_by(models.Commit.created_at.asc())
+            .yield_per(batch_size))
+
+def get_first_commits_by_period(db: Session, pipeline_id: str, period: str):
+    # First commit by author date of each "month" or "week" (starting on Monday), in period order
+    if db.get_bind().dialect.name == "postgresql":
+        period_start = func.date_trunc(period, models.Commit.author_date)
+
+        return (db.query(models.Commit.hash, models.Commit.author_date)
+                .filter(models.Commit.pipeline_id == pipeline_id)
+                .distinct(period_start)
+                .order_by(period_start, models.Commit.author_date.asc(), models.Commit.created_at.asc())
+                .all())
+
+    if period == "month":
+        period_start = func.strftime("%Y-%m", models.Commit.author_date)
+    else:
+        period_start = func.date(models.Commit.author_date, "weekday 0", "-6 days")
+
+    ranked = (db.query(models.Commit.hash, models.Commit.author_date,
+                       func.row_number().over(partition_by=period_start,
+                                              order_by=(models.Commit.author_date.asc(),
+                                                        models.Commit.created_at.asc())).label("rank"))
+              .filter(models.Commit.pipeline_id == pipeline_id)
+              .subquery())
+
+    return db.query(ranked.c.hash, ranked.c.author_date).filter(ranked.c.rank == 1).order_by(ranked.c.author_date.asc()).all()
+
+def get_ranked_commits_by_pipeline(db: Session, pipeline_id: str):
+    return (db.query(models.Commit.hash, models.Commit.author_date,
+                     (func.row_number().over(order_by=models.Commit.created_at.asc()) - 1).label("position"))
+            .filter(models.Commit.pipeline_id == pipeline_id)
+            .subquery())
+
+def get_every_nth_commit_by_pipeline(db: Session, pipeline_id: str, n: int):
+    ranked = get_ranked_commits_by_pipeline(db, pipeline_id)
+
+    return db.query(ranked.c.hash, ranked.c.author_date).filter(ranked.c.position % n == 0).order_by(ranked.c.position.asc()).all()
+
+def get_commits_by_pipeline_at_positions(db: Session, pipeline_id: str, positions: list[int]):
+    ranked = get_ranked_commits_by_pipeline(db, pipeline_id)
+
+    return db.query(ranked.c.hash, ranked.c.author_date).filter(ranked.c.position.in_(positions)).order_by(ranked.c.position.asc()).all()
+
 def exits_commits_by_pipeline(db: Session, pipeline_id: str):
     return db.query(models.Commit).filter(models.Commit.pipeline_id == pipeline_id).first() is not None
 
@@ -262,6 +359,13 @@ def create_base_item(db: Session, base_item_data: dict):
 def get_base_items_by_pipeline(db: Session, pipeline_id: str):
     return db.query(models.BaseItem).filter(models.BaseItem.pipeline_id == pipeline_id).order_by(models.BaseItem.created_at.asc()).all()
 
+def create_all_competences_and_base_items(db: Session, competences_data: list[dict], base_items_data: list[dict]):
+    if competences_data:
+        db.execute(insert(Competence), competences_data)
+    if base_items_data:
+        db.execute(insert(BaseItem), base_items_data)
+    db.commit()
+
 def exits_base_items_by_pipeline(db: Session, pipeline_id: str):
     return db.query(models.BaseItem).filter(models.BaseItem.pipeline_id == pipeline_id).first() is not None
 
@@ -283,6 +387,13 @@ def create_all_test_data(db: Session, tests_data: list[dict]):
 def get_tests_data_by_pipeline(db: Session, pipeline_id: str):
     return db.query(models.TestData).filter(models.TestData.pipeline_id == pipeline_id).order_by(models.TestData.commit_order.asc(), models.TestData.created_at.asc()).all()
 
+def stream_tests_data_by_pipeline(db: Session, pipeline_id: str, batch_size: int = 1000):
+    return (db.query(models.TestData.commit_order, models.TestData.file_path, models.TestData.is_test_file,
+                     models.TestData.has_test_call)
+            .filter(models.TestData.pipeline_id == pipeline_id)
+            .order_by(models.TestData.commit_order.asc(), models.TestData.created_at.asc())
+            .yield_per(batch_size))
+
 def get_tests_data_by_pipeline_and_commit_order(db: Session, pipeline_id: str, commit_order: int):
     return (db.query(models.TestData)
             .filter(models.TestData.pipeline_id == pipeline_id,
@@ -335,6 +446,12 @@ def create_commit_message_item(db: Session, commit_message_item: dict):
 
     return db_commit_message_item
 
+def create_all_commit_message_items(db: Session, commit_message_items_data: list[dict], batch_size: int = 1000):
+    # One multi-row insert per batch, all of them in a single transaction
+    for i in range(0, len(commit_message_items_data), batch_size):
+        db.execute(insert(CommitMessageItem), commit_message_items_data[i:i + batch_size])
+    db.commit()
+
 def get_commit_message_items_by_pipeline(db: Session, pipeline_id: str):
     return db.query(models.CommitMessageItem).filter(models.CommitMessageItem.pipeline_id == pipeline_id).order_by(models.CommitMessageItem.created_at.asc()).all()
 
@@ -414,3 +531,24 @@ def get_insights_by_pipeline(db: Session, pipeline_id: str):
 def exits_insights_by_pipeline(db: Session, pipeline_id: str):
     return db.query(models.Insights).filter(models.Insights.pipeline_id == pipeline_id).first() is not None
 
+# pipeline_statistics
+def create_pipeline_statistics(db: Session, pipeline_statistics: dict):
+    db_pipeline_statistics = PipelineStatistics(**pipeline_statistics)
+    db.add(db_pipeline_statistics)
+
+    db.commit()
+    db.refresh(db_pipeline_statistics)
+
+    return db_pipeline_statistics
+
+def get_latest_pipeline_with_statistics(db: Session, repository_id: str, stage: StageEnum, exclude_pipeline_id: str):
+    return (db.query(models.Pipeline)
+            .join(models.PipelineStatistics, models.PipelineStatistics.pipeline_id == models.Pipeline.id)
+            .filter(models.Pipeline.repository == repository_id,
+                    models.Pipeline.id != exclude_pipeline_id,
+                    models.PipelineStatistics.stage == stage)
+            .order_by(models.Pipeline.created_at.desc())
+            .first())
+
+def get_pipeline_statistics_by_pipeline(db: Session, pipeline_id: str):
+    return db.query(models.PipelineStatistics).filter(models.PipelineStatistics.pipeline_id == pipeline_id).order_by(models.PipelineStatistics.created_at.asc()).all()
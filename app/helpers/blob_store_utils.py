@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from ..config import BLOB_STORE_MAX_ENTRIES, MESSAGE_STORE_MAX_ENTRIES
+from ..constants import BASE_BLOB_STORE
+from ..logger_config import logger
+
+# Seconds a writer waits for the lock held by another process before failing
+BUSY_TIMEOUT = 60
+
+# Keys looked up per query by get_many, below the host parameter limit of SQLite
+LOOKUP_BATCH_SIZE = 500
+
+def build_blob_key(kind, blob_sha, file_extension, version):
+    """
+    Build the key of a blob result.
+    :param kind: kind of result, e.g. "test" or "loc"
+    :param blob_sha:
+    :param file_extension:
+    :param version: version of the code computing the result
+    :return:
+    """
+    return f"{kind}/{version}/{file_extension}/{blob_sha}"
+
+def build_message_key(kind, message, version):
+    """
+    Build the key of a commit message result.
+    :param kind: kind of result, e.g. "maintenance"
+    :param message: message as classified, already normalized
+    :param version: version of the code computing the result
+    :return:
+    """
+    message_hash = hashlib.sha256(message.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+    return f"{kind}/{version}/{message_hash}"
+
+class BlobStore:
+    """
+    On-disk key-value store of per-blob results (test classification votes, line counts) or of
+    per-message results (maintenance classification of commit messages), each kind in a file of its own.
+
+    Blobs are immutable, so a result keyed by blob SHA and the version of the code that computed it
+    stays valid for every pipeline of every repository, and so does one keyed by the hash of a message.
+    The store is a SQLite database in WAL mode shared by all pipelines and worker processes of a node,
+    bounded to max_entries rows evicted in least recently used order.
+    """
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self.connection = None
+        self.pending = {}
+        self.touched = set()
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """
+        Open the store, creating it if needed.
+        :return:
+        """
+        if self.connection is not None:
+            return
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self.connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS blob_results "
+                                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used INTEGER NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS blob_results_last_used ON blob_results (last_used)")
+
+    def close(self):
+        """
+        Write the pending results, evict the least recently used ones and close the store.
+        :return:
+        """
+        if self.connection is not None:
+            self.flush()
+            self.evict()
+            self.connection.close()
+            self.connection = None
+
+    def get(self, key):
+        """
+        Get a result.
+        :param key:
+        :return: The stored value, None when absent.
+        """
+        if key in self.pending:
+            return self.pending[key]
+
+        row = self.connection.execute("SELECT value FROM blob_results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.touched.add(key)
+
+        return json.loads(row[0])
+
+    def get_many(self, keys):
+        """
+        Get the results of many keys with a few queries.
+        :param keys:
+        :return: A dict of key to stored value, for the keys present.
+        """
+        found = {key: self.pending[key] for key in keys if key in self.pending}
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+
+        for i in range(0, len(missing), LOOKUP_BATCH_SIZE):
+            batch = missing[i:i + LOOKUP_BATCH_SIZE]
+            rows = self.connection.execute("SELECT key, value FROM blob_results WHERE key IN (%s)"
+                                           % ",".join("?" * len(batch)), batch).fetchall()
+
+            for key, value in rows:
+                found[key] = json.loads(value)
+                self.touched.add(key)
+
+            self.hits += len(rows)
+            self.misses += len(batch) - len(rows)
+
+        return found
+
+    def put(self, key, value):
+        """
+        Store a result. Results are buffered until the next flush.
+        :param key:
+        :param value: JSON serializable value
+        :return:
+        """
+        self.pending[key] = value
+
+    def flush(self):
+        """
+        Write the buffered results and the use of the results read since the last flush, in a single transaction.
+        :return:
+        """
+        if not self.pending and not self.touched:
+            return
+
+        now = int(time.time())
+
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.executemany("INSERT OR REPLACE INTO blob_results (key, value, last_used) VALUES (?, ?, ?)",
+                                        [(key, json.dumps(value), now) for key, value in self.pending.items()])
+            self.connection.executemany("UPDATE blob_results SET last_used = ? WHERE key = ?",
+                                        [(now, key) for key in self.touched])
+
+        self.pending = {}
+        self.touched = set()
+
+    def evict(self):
+        """
+        Delete the least recently used results above max_entries.
+        :return:
+        """
+        count = self.connection.execute("SELECT count(*) FROM blob_results").fetchone()[0]
+        if count <= self.max_entries:
+            return
+
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.execute("DELETE FROM blob_results WHERE key IN "
+                                    "(SELECT key FROM blob_results ORDER BY last_used ASC LIMIT ?)",
+                                    (count - self.max_entries,))
+
+        logger.info(f"Blob store: evicted {count - self.max_entries} results")
+
+def open_store(name, max_entries):
+    """
+    Open a store shared by all pipelines, unless it is disabled (max_entries of 0).
+    :param name: name of the database file under BASE_BLOB_STORE
+    :param max_entries:
+    :return: The open BlobStore or None.
+    """
+    if max_entries <= 0:
+        return None
+
+    store = BlobStore(os.path.join(BASE_BLOB_STORE, name), max_entries)
+    store.open()
+
+    return store
+
+def open_blob_store():
+    """
+    Open the store of per-blob results, unless it is disabled (BLOB_STORE_MAX_ENTRIES=0).
+    :return: The open BlobStore or None.
+    """
+    return open_store("blobs.sqlite3", BLOB_STORE_MAX_ENTRIES)
+
+def open_message_store():
+    """
+    Open the store of per-message results, unless it is disabled (MESSAGE_STORE_MAX_ENTRIES=0).
+    Kept apart from the blob store, so classifications neither evict nor are evicted by blob results.
+    :return: The open BlobStore or None.
+    """
+    return open_store("messages.sqlite3", MESSAGE_STORE_MAX_ENTRIES)
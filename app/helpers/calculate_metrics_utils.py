@@ -1,16 +1,25 @@
-from datetime import datetime
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
 
 from .. import crud
+from ..config import COMMIT_CLASSIFICATION_WORKERS, COMMIT_MESSAGE_MATCHES
 from ..constants import *
 from ..crud import get_commits_by_pipeline
-from ..libs.commit_classification_master.language_utils import match
-from ..libs.commit_classification_master.adaptive_model import is_adaptive, build_adaptive_action_regex
-from ..libs.commit_classification_master.corrective_model import is_fix,build_bug_fix_regex
-from ..libs.commit_classification_master.refactor_model import built_is_refactor, build_perfective_regex, build_refactor_regex
-import re
+from .blob_store_utils import build_message_key
+from ..libs.commit_classification_master.maintenance_classifier import get_maintenance_classifier, \
+    MAINTENANCE_CLASSIFIER_VERSION
 
 from ..logger_config import logger
 
+# Columns of the matches found by the maintenance models, left empty with COMMIT_MESSAGE_MATCHES=skip
+MATCHES_COLUMNS = ["perfective_in_text", "refactor_in_text", "adaptive_in_text", "adaptive_by_negation_in_text",
+                   "corrective_in_text"]
+
+# Chunks of messages handed to each worker, more than one so a slow chunk does not hold the others back
+MESSAGES_CHUNKS_PER_WORKER = 4
+
 
 def get_project_dimension_repo(project_result, db):
     """
@@ -129,9 +138,10 @@ def corrective_classifier(commit_message):
     :return:
     """
     text = commit_message.message
+    classifier = get_maintenance_classifier()
 
-    commit_message.is_corrective = is_fix(text)
-    commit_message.corrective_in_text = re.findall(build_bug_fix_regex(), text)
+    commit_message.is_corrective = classifier.is_fix(text)
+    commit_message.corrective_in_text = classifier.bug_fix.findall(text)
     valid_num = len(commit_message.corrective_in_text)
     commit_message.bug_fix_regex_count = valid_num
 
@@ -145,9 +155,10 @@ def adaptive_classifier(commit_message):
     :return:
     """
     text = commit_message.message
+    classifier = get_maintenance_classifier()
 
-    commit_message.is_adaptive = is_adaptive(text)
-    commit_message.adaptive_in_text = re.findall(build_adaptive_action_regex(), text)
+    commit_message.is_adaptive = classifier.is_adaptive(text)
+    commit_message.adaptive_in_text = classifier.adaptive_action.findall(text)
     valid_num = len(commit_message.adaptive_in_text)
     commit_message.adaptive_regex_count = valid_num
 
@@ -161,10 +172,11 @@ def adaptive_by_negation_classifier(commit_message):
     :return:
     """
     text = commit_message.message
+    classifier = get_maintenance_classifier()
 
-    commit_message.is_adaptive_by_negation = (is_fix(text) == 0
-                                              and built_is_refactor(text) == 0
-                                              and match(text, build_perfective_regex()) == 0)
+    commit_message.is_adaptive_by_negation = (classifier.is_fix(text) == 0
+                                              and classifier.is_refactor(text) == 0
+                                              and classifier.count(classifier.perfective, text.lower()) == 0)
     # commitMessage.adaptive_by_negation_in_text = re.findall(build_adaptive_action_regex(), text)
     # valid_num = len(commitMessage.adaptive_in_text)
     # commitMessage.bug_fix_regex_count = valid_num
@@ -180,8 +192,7 @@ def perfective_classifier(commit_message):
     """
     text = commit_message.message
 
-    commit_message.is_perfective = ((match(text, build_perfective_regex())) +
-                                    (match(text, build_refactor_regex())) > 0)
+    commit_message.is_perfective = get_maintenance_classifier().is_perfective(text)
     # commitMessage.perfective_in_text = re.findall(build_adaptive_action_regex(), text)
     # valid_num = len(commitMessage.adaptive_in_text)
     # commitMessage.bug_fix_regex_count = valid_num
@@ -196,14 +207,121 @@ def refactor_classifier(commit_message):
     :return:
     """
     text = commit_message.message
+    classifier = get_maintenance_classifier()
 
-    commit_message.is_refactor = built_is_refactor(text)
-    commit_message.refactor_in_text = re.findall(build_refactor_regex(), text)
+    commit_message.is_refactor = classifier.is_refactor(text)
+    commit_message.refactor_in_text = classifier.refactor.findall(text)
     valid_num = len(commit_message.refactor_in_text)
     commit_message.refactor_regex_count = valid_num
 
     return commit_message
 
+def classify_commit_message(commit_message, classification=None):
+    """
+    Classify the commit message with every maintenance model in a single pass, setting the same fields as
+    corrective_classifier, adaptive_classifier, adaptive_by_negation_classifier, perfective_classifier and
+    refactor_classifier together.
+    :param commit_message:
+    :param classification: classification of the message already computed by classify_many, optional
+    :return:
+    """
+    if classification is None:
+        classification = get_maintenance_classifier().classify(commit_message.message)
+
+    for field, value in classification.items():
+        setattr(commit_message, field, value)
+
+    return commit_message
+
+def classify_messages(messages):
+    """
+    Classify a chunk of commit messages, the unit of work of classify_many.
+    The classifier is compiled once per process and reused by the following chunks.
+    :param messages:
+    :return: the classification of each message, see MaintenanceClassifier.classify
+    """
+    classifier = get_maintenance_classifier()
+
+    return [classifier.classify(message) for message in messages]
+
+def classify_many(messages, workers=COMMIT_CLASSIFICATION_WORKERS, store=None):
+    """
+    Classify commit messages. The classifications stored by earlier pipelines are looked up in bulk first and
+    each distinct remaining message is classified once, so recurring messages ("merge branch 'master'",
+    "update readme.md", ...) never reach the regex engine again.
+    :param messages: list of commit messages, as classified (commit_classification_task lower-cases them)
+    :param workers: number of worker processes, 1 to classify in-process
+    :param store: BlobStore of open_message_store, optional. Classifications are keyed by the hash of the
+    message and MAINTENANCE_CLASSIFIER_VERSION.
+    :return: the classification of each message, in the order of messages
+    """
+    keys = [build_message_key("maintenance", message, MAINTENANCE_CLASSIFIER_VERSION) for message in messages]
+
+    classifications = store.get_many(keys) if store is not None else {}
+
+    missing = {}
+    for key, message in zip(keys, messages):
+        if key not in classifications:
+            missing.setdefault(key, message)
+
+    for key, classification in zip(missing, classify_in_pool(list(missing.values()), workers)):
+        classifications[key] = classification
+        if store is not None:
+            store.put(key, classification)
+
+    logger.info(f"Classified {len(missing)} of {len(messages)} commit messages, "
+                f"{len(set(keys)) - len(missing)} classifications from the message store")
+
+    return [classifications[key] for key in keys]
+
+def classify_in_pool(messages, workers):
+    """
+    Classify commit messages, fanning chunks of them out to a process pool when there is more than one worker,
+    so the regex work neither blocks the gevent hub of the celery worker nor runs on a single core.
+    :param messages: list of commit messages
+    :param workers: number of worker processes, 1 to classify in-process
+    :return: the classification of each message, in the order of messages
+    """
+    if workers <= 1 or len(messages) <= 1:
+        return classify_messages(messages)
+
+    chunk_size = max(1, math.ceil(len(messages) / (workers * MESSAGES_CHUNKS_PER_WORKER)))
+    chunks = [messages[i:i + chunk_size] for i in range(0, len(messages), chunk_size)]
+
+    results = []
+
+    # spawn: the celery worker runs under gevent, forking its hub and open connections is unsafe
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        for chunk_results in executor.map(classify_messages, chunks):
+            results.extend(chunk_results)
+
+    return results
+
+def build_commit_message_rows(commit_messages, pipeline_id, matches=COMMIT_MESSAGE_MATCHES):
+    """
+    Build the CommitMessageItem rows of classified commit messages, for crud.create_all_commit_message_items.
+    The rows are inserted in one transaction, so created_at is set here, increasing, to keep their order.
+    :param commit_messages: CommitMaintenanceActivitiesResult objects, in commit order
+    :param pipeline_id:
+    :param matches: "store" to keep the *_in_text matches, "skip" to leave them empty
+    :return:
+    """
+    start = datetime.now()
+    rows = []
+
+    for index, commit_message in enumerate(commit_messages):
+        row = dict(commit_message.to_dict())
+        row["pipeline_id"] = pipeline_id
+        row["created_at"] = start + timedelta(microseconds=index)
+
+        if matches == "skip":
+            for column in MATCHES_COLUMNS:
+                row[column] = None
+
+        rows.append(row)
+
+    return rows
+
 def save_maintenance_activities_log(file_name, data):
     """
     Save the maintenance activities log to a file.
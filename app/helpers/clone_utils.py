@@ -0,0 +1,212 @@
+import hashlib
+import os
+import shutil
+import time
+
+from app.config import MIRROR_CACHE_MAX_SIZE, CLONE_FILTER
+from app.constants import BASE_MIRRORS
+from app.helpers.process_utils import run_command, run_heavy_command
+from app.logger_config import logger
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Seconds between two attempts to take the lock of a mirror used by another clone
+LOCK_POLL_INTERVAL = 0.5
+
+# Refs kept in the mirrors, pull request refs and the like are not needed by the pipelines
+MIRROR_REFSPECS = ["+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*"]
+
+def run_git(args, cwd=None, heavy=False):
+    """
+    Run a git command, raising if it fails.
+    :param args: arguments after `git`
+    :param cwd:
+    :param heavy: network or full-copy command, limited by the heavy command semaphore
+    :return:
+    """
+    if heavy:
+        run_heavy_command(["git"] + args, cwd=cwd)
+    else:
+        run_command(["git"] + args, cwd=cwd)
+
+def get_mirror_path(clone_url):
+    """
+    Get the path of the mirror of a repository.
+    :param clone_url:
+    :return:
+    """
+    return os.path.join(BASE_MIRRORS, hashlib.sha1(clone_url.encode("utf-8")).hexdigest() + ".git")
+
+class MirrorLock:
+    """
+    Exclusive lock of a mirror, held while it is fetched, cloned or evicted.
+
+    The lock file sits next to the mirror and its modification time is the last use of the mirror.
+    Waiting polls a non-blocking lock, so the gevent pool of the worker keeps running other tasks.
+    """
+
+    def __init__(self, mirror_path):
+        self.path = mirror_path + ".lock"
+        self.file = None
+
+    def acquire(self, blocking=True):
+        """
+        Take the lock.
+        :param blocking: wait until it is free
+        :return: True if the lock was taken.
+        """
+        self.file = open(self.path, "a")
+        if fcntl is None:
+            return True
+
+        while True:
+            try:
+                fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if not blocking:
+                    self.release()
+                    return False
+
+                time.sleep(LOCK_POLL_INTERVAL)
+
+    def release(self):
+        """
+        Release the lock.
+        :return:
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+def update_mirror(clone_url, mirror_path):
+    """
+    Create the mirror of a repository if needed and fetch its branches and tags.
+    Must be called with the lock of the mirror held.
+    :param clone_url:
+    :param mirror_path:
+    :return:
+    """
+    if not os.path.exists(mirror_path):
+        logger.info(f"Creating mirror of {clone_url} in {mirror_path}")
+
+        temporary_path = mirror_path + ".tmp"
+        shutil.rmtree(temporary_path, ignore_errors=True)
+
+        run_git(["init", "--quiet", "--bare", temporary_path])
+        run_git(["remote", "add", "origin", clone_url], cwd=temporary_path)
+        run_git(["config", "--unset-all", "remote.origin.fetch"], cwd=temporary_path)
+        for refspec in MIRROR_REFSPECS:
+            run_git(["config", "--add", "remote.origin.fetch", refspec], cwd=temporary_path)
+
+        run_git(["fetch", "--quiet", "--prune", "origin"], cwd=temporary_path, heavy=True)
+        os.rename(temporary_path, mirror_path)
+
+    else:
+        logger.info(f"Updating mirror of {clone_url} in {mirror_path}")
+        run_git(["fetch", "--quiet", "--prune", "origin"], cwd=mirror_path, heavy=True)
+
+def get_directory_size(path):
+    """
+    Get the size of the files of a directory tree.
+    :param path:
+    :return: The size in bytes.
+    """
+    size = 0
+    for directory, _, names in os.walk(path):
+        for name in names:
+            try:
+                size += os.lstat(os.path.join(directory, name)).st_size
+            except OSError:
+                continue
+
+    return size
+
+def evict_mirrors(max_size, keep_path=None):
+    """
+    Delete the least recently used mirrors until the mirrors take at most max_size bytes.
+    Mirrors in use by another clone are skipped.
+    :param max_size:
+    :param keep_path: mirror never deleted, the one just used
+    :return: The number of mirrors deleted.
+    """
+    mirrors = []
+    for name in os.listdir(BASE_MIRRORS):
+        path = os.path.join(BASE_MIRRORS, name)
+        if name.endswith(".git") and os.path.isdir(path):
+            lock_path = path + ".lock"
+            last_used = os.path.getmtime(lock_path) if os.path.exists(lock_path) else 0
+            mirrors.append((last_used, path, get_directory_size(path)))
+
+    total_size = sum(size for _, _, size in mirrors)
+    deleted = 0
+
+    for _, path, size in sorted(mirrors):
+        if total_size <= max_size:
+            break
+
+        if path == keep_path:
+            continue
+
+        lock = MirrorLock(path)
+        if not lock.acquire(blocking=False):
+            continue
+
+        try:
+            logger.info(f"Evicting mirror {path} ({size} bytes)")
+            shutil.rmtree(path)
+            total_size -= size
+            deleted += 1
+        finally:
+            lock.release()
+
+    return deleted
+
+def clone_repository(clone_url, branch, path_project, max_size=MIRROR_CACHE_MAX_SIZE, clone_filter=CLONE_FILTER):
+    """
+    Clone a branch of a repository into path_project.
+
+    With the mirror cache enabled (max_size > 0) the repository is fetched into a node-local mirror
+    shared by all pipelines, then cloned locally from it: git hardlinks the object files, so the
+    clone costs neither network nor disk, and it stays valid when the mirror is evicted later.
+
+    With a clone filter the clone is partial: it only has the objects of the filter (e.g. no blobs
+    for "blob:none") and fetches the others from clone_url when they are needed, so it bypasses
+    the mirror, which would have to hold every object to serve them.
+    :param clone_url:
+    :param branch:
+    :param path_project: empty directory to clone into
+    :param max_size: size in bytes the mirrors are evicted down to, 0 to clone straight from clone_url
+    :param clone_filter: git object filter of a partial clone, e.g. "blob:none" or "tree:0", empty for a full clone
+    :return:
+    """
+    if clone_filter:
+        run_git(["clone", "--quiet", f"--filter={clone_filter}", "--branch", branch, clone_url, path_project],
+                heavy=True)
+        return
+
+    if max_size <= 0:
+        run_git(["clone", "--quiet", "--branch", branch, clone_url, path_project], heavy=True)
+        return
+
+    os.makedirs(BASE_MIRRORS, exist_ok=True)
+    mirror_path = get_mirror_path(clone_url)
+
+    with MirrorLock(mirror_path) as lock:
+        update_mirror(clone_url, mirror_path)
+        run_git(["clone", "--quiet", "--branch", branch, mirror_path, path_project])
+        os.utime(lock.path)
+
+    run_git(["remote", "set-url", "origin", clone_url], cwd=path_project)
+
+    evict_mirrors(max_size, keep_path=mirror_path)
@@ -0,0 +1,106 @@
+import re
+from datetime import datetime
+
+# Reasons a commit is skipped for, in the order they are checked
+SKIP_REASONS = ["merges", "authors", "messages", "dates", "max_commits"]
+
+def get_invalid_regex(commit_filter):
+    """
+    Find a deny-list regex of a commit filter that does not compile.
+    :param commit_filter: CommitFilter model or schema
+    :return: The first invalid regex, None when they are all valid.
+    """
+    for regex in (commit_filter.author_deny_regex, commit_filter.message_deny_regex):
+        if regex:
+            try:
+                re.compile(regex)
+            except re.error:
+                return regex
+
+    return None
+
+def commit_filter_to_dict(db_commit_filter):
+    """
+    Get the settings of a commit filter, as recorded in the pipeline statistics.
+    :param db_commit_filter: CommitFilter model, optional
+    :return: None when there is no filter.
+    """
+    if db_commit_filter is None:
+        return None
+
+    return {
+        "skip_merges": bool(db_commit_filter.skip_merges),
+        "author_deny_regex": db_commit_filter.author_deny_regex,
+        "message_deny_regex": db_commit_filter.message_deny_regex,
+        "since": db_commit_filter.since.isoformat() if db_commit_filter.since else None,
+        "until": db_commit_filter.until.isoformat() if db_commit_filter.until else None,
+        "max_commits": db_commit_filter.max_commits
+    }
+
+def get_skip_reason(commit, merge, db_commit_filter, author_pattern, message_pattern):
+    """
+    Check a commit against a commit filter.
+    :param commit: commit dict
+    :param merge: whether the commit has more than one parent
+    :param db_commit_filter: CommitFilter model
+    :param author_pattern: compiled author deny-list, optional
+    :param message_pattern: compiled message deny-list, optional
+    :return: The reason the commit is skipped for, None when it is kept.
+    """
+    if db_commit_filter.skip_merges and merge:
+        return "merges"
+
+    if author_pattern is not None and author_pattern.search(commit["author_name"]):
+        return "authors"
+
+    if message_pattern is not None and message_pattern.search(commit["message"]):
+        return "messages"
+
+    if db_commit_filter.since is not None or db_commit_filter.until is not None:
+        author_date = datetime.strptime(commit["author_date"], '%Y-%m-%d %H:%M:%S')
+
+        if db_commit_filter.since is not None and author_date < db_commit_filter.since.replace(tzinfo=None):
+            return "dates"
+
+        if db_commit_filter.until is not None and author_date > db_commit_filter.until.replace(tzinfo=None):
+            return "dates"
+
+    return None
+
+def filter_commits(commits, db_commit_filter, skipped):
+    """
+    Drop the commits rejected by the commit filter of a repository while they are streamed, so they are never stored.
+    Commits are checked for merges, the author and message deny-lists and the date window, then at most
+    max_commits of the remaining ones are kept, oldest first: max_commits counts the commits stored, after
+    the other criteria. A commit rejected by several criteria is counted under the first one that applies.
+    :param commits: commit dicts, oldest first, with a "merge" flag that is removed
+    :param db_commit_filter: CommitFilter model, None keeps every commit
+    :param skipped: dict of skip reason to count, updated as the commits are consumed
+    :return: A generator of the kept commit dicts.
+    """
+    for reason in SKIP_REASONS:
+        skipped.setdefault(reason, 0)
+
+    author_pattern = None
+    message_pattern = None
+    if db_commit_filter is not None:
+        if db_commit_filter.author_deny_regex:
+            author_pattern = re.compile(db_commit_filter.author_deny_regex)
+        if db_commit_filter.message_deny_regex:
+            message_pattern = re.compile(db_commit_filter.message_deny_regex)
+
+    kept = 0
+    for commit in commits:
+        merge = commit.pop("merge")
+
+        if db_commit_filter is not None:
+            reason = get_skip_reason(commit, merge, db_commit_filter, author_pattern, message_pattern)
+            if reason is None and db_commit_filter.max_commits is not None and kept >= db_commit_filter.max_commits:
+                reason = "max_commits"
+
+            if reason is not None:
+                skipped[reason] += 1
+                continue
+
+        kept += 1
+        yield commit
@@ -0,0 +1,311 @@
+import queue
+import threading
+from datetime import datetime, timedelta
+
+from pydriller import Repository, Git
+
+try:
+    import gevent
+    from gevent import monkey
+except ImportError:
+    gevent = None
+
+from app import crud
+from app.config import COMMIT_EXTRACTOR, COMMIT_INSERT_BATCH_SIZE, COMMIT_QUEUE_SIZE, COMMIT_EXTRACTION_MODE
+from app.database import SessionLocal
+from app.helpers.commit_filter_utils import commit_filter_to_dict, filter_commits
+from app.enums import StageEnum
+from app.helpers.git_utils import iter_commits, is_ancestor, list_commit_hashes
+from app.logger_config import logger
+
+# Seconds the reader waits for room in the queue before checking whether the writer stopped
+QUEUE_POLL_TIMEOUT = 1
+
+def commit_to_dict(commit):
+    """
+    Get the stored fields of a pydriller commit, and whether it is a merge.
+    :param commit:
+    :return:
+    """
+    return {
+        "hash": commit.hash,
+        "author_name": commit.author.name,
+        "committer_name": commit.committer.name,
+        "author_date": commit.author_date.strftime('%Y-%m-%d %H:%M:%S'),
+        "message": commit.msg,
+        "merge": commit.merge
+    }
+
+def iter_pydriller_commits(base_git_path, revision_range=None):
+    """
+    Iterate over the commits of a repository with pydriller, oldest first.
+    pydriller's from_commit filter follows the ancestry path only, so a revision range is listed with git
+    and its commits are loaded one by one.
+    :param base_git_path:
+    :param revision_range: commits to read, e.g. "<hash>..HEAD", all of them when None
+    :return: A generator of commit dicts with hash, author_name, committer_name, author_date, message and merge.
+    """
+    if revision_range is None:
+        for commit in Repository(base_git_path).traverse_commits():
+            yield commit_to_dict(commit)
+        return
+
+    git = Git(base_git_path)
+    try:
+        for commit_hash in list_commit_hashes(base_git_path, revision_range):
+            yield commit_to_dict(git.get_commit(commit_hash))
+    finally:
+        git.clear()
+
+def iter_repository_commits(base_git_path, revision_range=None):
+    """
+    Iterate over the commits of a repository, oldest first, with the extractor set by COMMIT_EXTRACTOR.
+    :param base_git_path:
+    :param revision_range: commits to read, e.g. "<hash>..HEAD", all of them when None
+    :return: A generator of commit dicts.
+    """
+    if COMMIT_EXTRACTOR == "git":
+        return iter_commits(base_git_path, revision_range or "HEAD")
+
+    return iter_pydriller_commits(base_git_path, revision_range)
+
+def iter_stored_commits(pipeline_id):
+    """
+    Iterate over the commits stored for a pipeline, in extraction order.
+    Uses a session of its own, the iteration runs in the reader thread of save_commits.
+    :param pipeline_id:
+    :return: A generator of commit dicts.
+    """
+    db = SessionLocal()
+    try:
+        for commit in crud.stream_commits_by_pipeline(db, pipeline_id):
+            yield dict(commit._mapping)
+    finally:
+        db.close()
+
+def iter_incremental_commits(base_pipeline_id, new_commits):
+    """
+    Iterate over the commits stored for an earlier pipeline, then over the ones added since.
+    :param base_pipeline_id:
+    :param new_commits: iterable of the commits after the newest stored one
+    :return: A generator of commit dicts.
+    """
+    yield from iter_stored_commits(base_pipeline_id)
+    yield from new_commits
+
+def run_blocking(function, *args):
+    """
+    Run a blocking call that does not yield to gevent, like a psycopg2 query.
+    Under the gevent pool of the celery worker it runs on an OS thread of the hub's threadpool: the calling
+    greenlet waits for it cooperatively while the other greenlets keep running. Elsewhere it runs in place.
+    :param function:
+    :param args:
+    :return: The result of the call.
+    """
+    if gevent is not None and monkey.is_module_patched("threading"):
+        return gevent.get_hub().threadpool.apply(function, args)
+
+    return function(*args)
+
+def put_or_stop(batches, item, stop):
+    """
+    Put an item on a bounded queue, waiting for room unless the consumer stops.
+    :param batches:
+    :param item:
+    :param stop: event set when the consumer stops
+    :return: True if the item was put, False if the consumer stopped first.
+    """
+    while not stop.is_set():
+        try:
+            batches.put(item, timeout=QUEUE_POLL_TIMEOUT)
+            return True
+        except queue.Full:
+            continue
+
+    return False
+
+def read_commit_batches(commits, pipeline_id, batch_size, batches, stop):
+    """
+    Reader side of save_commits: group the commits into batches of rows and put them on the queue, then None.
+    An error raised while reading is put on the queue in place of None.
+
+    The rows of a batch share one transaction, so created_at is not left to the database clock: it starts at the
+    time of the first commit and advances by a microsecond per commit, which keeps the traversal order that
+    get_commits_by_pipeline relies on.
+    :param commits: iterable of commit dicts, oldest first
+    :param pipeline_id:
+    :param batch_size:
+    :param batches: bounded queue read by the writer
+    :param stop: event set when the writer stops
+    :return:
+    """
+    try:
+        start = datetime.now()
+        count = 0
+        buffer = []
+
+        for commit in commits:
+            if stop.is_set():
+                return
+
+            commit["pipeline_id"] = pipeline_id
+            commit["created_at"] = start + timedelta(microseconds=count)
+            buffer.append(commit)
+            count += 1
+
+            if len(buffer) >= batch_size:
+                if not put_or_stop(batches, buffer, stop):
+                    return
+                buffer = []
+
+        if buffer and not put_or_stop(batches, buffer, stop):
+            return
+
+        put_or_stop(batches, None, stop)
+
+    except Exception as e:
+        put_or_stop(batches, e, stop)
+
+    finally:
+        if hasattr(commits, "close"):
+            commits.close()
+
+def save_commits(db, commits, pipeline_id, batch_size=COMMIT_INSERT_BATCH_SIZE, queue_size=COMMIT_QUEUE_SIZE):
+    """
+    Save the commits of a pipeline, reading them and writing them to the database concurrently.
+
+    A reader thread parses the commits into batches of batch_size rows while the calling thread writes each batch
+    with a multi-row insert in its own transaction. At most queue_size batches wait between them, so memory stays
+    bounded however long the history is.
+
+    Under the gevent pool of the celery worker the threads are greenlets and psycopg2 is not cooperative, so a
+    write would block the hub, and the reader with it. The writes are therefore run on an OS thread of the hub's
+    threadpool (see run_blocking), while the reader greenlet keeps parsing.
+    :param db:
+    :param commits: iterable of commit dicts, oldest first
+    :param pipeline_id:
+    :param batch_size:
+    :param queue_size:
+    :return: The number of commits saved.
+    """
+    batches = queue.Queue(maxsize=max(queue_size, 1))
+    stop = threading.Event()
+
+    reader = threading.Thread(target=read_commit_batches, args=(commits, pipeline_id, batch_size, batches, stop),
+                              name=f"commit-reader-{pipeline_id}", daemon=True)
+    reader.start()
+
+    count = 0
+    try:
+        while True:
+            batch = batches.get()
+            if batch is None:
+                break
+
+            if isinstance(batch, Exception):
+                raise batch
+
+            run_blocking(crud.create_all_commits, db, batch)
+            count += len(batch)
+
+    finally:
+        stop.set()
+        reader.join()
+
+    return count
+
+def get_history_statistics(db, pipeline_id):
+    """
+    Get the statistics recorded by the commit extraction of a pipeline.
+    :param db:
+    :param pipeline_id:
+    :return: Empty for pipelines extracted before they were recorded.
+    """
+    for db_statistics in crud.get_pipeline_statistics_by_pipeline(db, pipeline_id):
+        if db_statistics.stage == StageEnum.EXTRACT_COMMITS and "commit_extraction" in db_statistics.statistics:
+            return db_statistics.statistics
+
+    return {}
+
+def find_base_pipeline(db, pipeline_id, repository_id, base_git_path, commit_filter):
+    """
+    Find the latest earlier pipeline of the repository whose commits can be reused.
+    Its history must have been fully extracted with the same commit filter and its newest commit must still be
+    an ancestor of HEAD, otherwise the history was rewritten and the commits must be extracted again.
+    A filter capping the number of commits is applied to the whole history, so it is never extended.
+    :param db:
+    :param pipeline_id:
+    :param repository_id:
+    :param base_git_path:
+    :param commit_filter: settings of the commit filter of the repository, see commit_filter_to_dict
+    :return: (base pipeline id, hash of its newest commit), (None, None) when there is none.
+    """
+    if commit_filter is not None and commit_filter["max_commits"] is not None:
+        return None, None
+
+    db_base_pipeline = crud.get_latest_pipeline_with_statistics(db, repository_id, StageEnum.EXTRACT_COMMITS,
+                                                               pipeline_id)
+    if db_base_pipeline is None:
+        return None, None
+
+    if get_history_statistics(db, db_base_pipeline.id).get("commit_filter") != commit_filter:
+        logger.info(f"Commits of pipeline {db_base_pipeline.id} were extracted with another commit filter")
+        return None, None
+
+    db_last_commit = crud.get_last_commit_by_pipeline(db, db_base_pipeline.id)
+    if db_last_commit is None:
+        return None, None
+
+    if not is_ancestor(base_git_path, db_last_commit.hash):
+        logger.info(f"Commit {db_last_commit.hash} of pipeline {db_base_pipeline.id} is not an ancestor of HEAD, "
+                    f"history was rewritten")
+        return None, None
+
+    return db_base_pipeline.id, db_last_commit.hash
+
+def extract_pipeline_commits(db, pipeline_id, repository_id, base_git_path, mode=COMMIT_EXTRACTION_MODE):
+    """
+    Extract and save the commits of a pipeline, skipping the ones rejected by the commit filter of the repository.
+    In incremental mode the commits of the latest earlier pipeline of the repository are copied and only
+    the ones after its newest commit are read from the repository.
+    :param db:
+    :param pipeline_id:
+    :param repository_id:
+    :param base_git_path:
+    :param mode: "full" or "incremental"
+    :return: The statistics of the extraction.
+    """
+    db_commit_filter = crud.get_commit_filter_by_repository(db, repository_id)
+    commit_filter = commit_filter_to_dict(db_commit_filter)
+    skipped_commits = {}
+
+    base_pipeline_id, last_hash = None, None
+    if mode == "incremental":
+        base_pipeline_id, last_hash = find_base_pipeline(db, pipeline_id, repository_id, base_git_path, commit_filter)
+
+    if base_pipeline_id is None:
+        commits = save_commits(db, filter_commits(iter_repository_commits(base_git_path), db_commit_filter,
+                                                  skipped_commits), pipeline_id)
+
+        return {
+            "commit_extraction": "full",
+            "base_pipeline_id": None,
+            "copied_commits": 0,
+            "new_commits": commits,
+            "commit_filter": commit_filter,
+            "skipped_commits": skipped_commits
+        }
+
+    copied_commits = crud.count_commits_by_pipeline(db, base_pipeline_id)
+    new_commits = filter_commits(iter_repository_commits(base_git_path, f"{last_hash}..HEAD"), db_commit_filter,
+                                 skipped_commits)
+    commits = save_commits(db, iter_incremental_commits(base_pipeline_id, new_commits), pipeline_id)
+
+    return {
+        "commit_extraction": "incremental",
+        "base_pipeline_id": str(base_pipeline_id),
+        "copied_commits": copied_commits,
+        "new_commits": commits - copied_commits,
+        "commit_filter": commit_filter,
+        "skipped_commits": skipped_commits
+    }
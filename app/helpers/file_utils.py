@@ -1,5 +1,6 @@
 import json
 import os
+import shutil
 from ..logger_config import logger
 
 def is_empty(path):
@@ -22,7 +23,7 @@ def clean_create_dir(my_directory):
     :return:
     """
     if os.path.exists(my_directory):
-      os.system("rm -rf {my_directory}".format(my_directory=my_directory))
+      shutil.rmtree(my_directory)
 
     os.mkdir(my_directory)
 
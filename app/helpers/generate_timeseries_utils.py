@@ -1,118 +1,404 @@
+import csv
+import functools
+import itertools
+import math
+import multiprocessing
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 from app import crud
+from app.config import LOC_COUNTER, MAX_CLASSIFIED_FILE_SIZE, OVERSIZED_FILE_POLICY
 from app.constants import *
-from app.crud import get_tests_data_by_pipeline
-from app.helpers.string_utils import get_comma_separated_names
+from app.database import SessionLocal
+from app.helpers.blob_store_utils import build_blob_key, open_blob_store
+from app.helpers.file_utils import clean_create_dir
+from app.helpers.git_utils import RevisionReader
+from app.helpers.loc_utils import count_file_loc
+from app.helpers.path_filter_utils import PathFilter
+from app.helpers.process_utils import run_heavy_command
 from app.helpers.system_utils import is_windows
 from app.helpers.validation_utils import parse_int
+from app.libs.test_code_classification.TestFrameworkMatcher import TestFrameworkMatcher
+from app.libs.test_code_classification.fileAnalysis import CLASSIFIER_VERSION
+from app.libs.test_code_classification.utilities import lookup_generator, tech_lookup_generator
 from app.logger_config import logger
 
+# Runs of revisions handed to each worker, more than one so a slow run does not hold the others back
+REVISIONS_CHUNKS_PER_WORKER = 4
 
-def process_cloc_history(base_git_path, loc_path_log):
+@functools.lru_cache(maxsize=None)
+def get_test_framework_matcher():
     """
-    Process the cloc history for a given git repository.
+    Build the test framework matcher from the lookup files, once per process.
+    :return:
+    """
+    keyword_lookup = lookup_generator(os.path.join(TEST_CODE_CLASSIFICATION_DIR, "keywords.txt"))
+    tech_lookup = tech_lookup_generator(os.path.join(TEST_CODE_CLASSIFICATION_DIR, "testingTechnologiesFixed3.csv"))
+
+    return TestFrameworkMatcher(tech_lookup, keyword_lookup)
+
+def is_oversized(blob_size):
+    """
+    Check if a blob is above the size ceiling of the test classification.
+    :param blob_size:
+    :return:
+    """
+    return 0 < MAX_CLASSIFIED_FILE_SIZE < blob_size
+
+def classify_test_file(reader, blob_sha, blob_size, file_extension, previous_cache, revision_cache, store=None):
+    """
+    Classify a blob as test code, reusing the result of the previous revision when the blob is unchanged,
+    then the result stored by any earlier pipeline.
+    Both caches are keyed by (blob_sha, file_extension, CLASSIFIER_VERSION).
+    Blobs above MAX_CLASSIFIED_FILE_SIZE are either not classified (OVERSIZED_FILE_POLICY=skip)
+    or classified on their first MAX_CLASSIFIED_FILE_SIZE bytes (sample). The classification holds up to three
+    times the bytes read in memory, so the ceiling bounds it to about 3 * MAX_CLASSIFIED_FILE_SIZE per file.
+    :param reader:
+    :param blob_sha:
+    :param blob_size:
+    :param file_extension:
+    :param previous_cache: results of the previous revision
+    :param revision_cache: results of the current revision, filled by this call
+    :param store: BlobStore, optional. Results of oversized blobs depend on the size ceiling and are not stored.
+    :return: (has_test_import, has_test_call, is_test_file)
+    """
+    key = (blob_sha, file_extension, CLASSIFIER_VERSION)
+
+    result = revision_cache.get(key) or previous_cache.get(key)
+
+    if result is None and store is not None and not is_oversized(blob_size):
+        stored = store.get(build_blob_key("test", *key))
+        if stored is not None:
+            result = tuple(stored)
+
+    if result is None and is_oversized(blob_size) and OVERSIZED_FILE_POLICY == "skip":
+        logger.warning(f"Skipping test classification of blob {blob_sha} ({blob_size} bytes)")
+        result = (0, 0, 0)
+
+    if result is None:
+        limit = None
+        if is_oversized(blob_size):
+            logger.warning(f"Sampling the first {MAX_CLASSIFIED_FILE_SIZE} bytes of blob {blob_sha} ({blob_size} bytes)")
+            limit = MAX_CLASSIFIED_FILE_SIZE
+
+        contents = reader.read_blob(blob_sha, limit)
+        has_test_import, has_test_call = get_test_framework_matcher().votes(file_extension, contents)
+
+        is_test_file = 0
+        if has_test_import + has_test_call == 2:
+            is_test_file = 1
+
+        result = (has_test_import, has_test_call, is_test_file)
+
+        if store is not None and not is_oversized(blob_size):
+            store.put(build_blob_key("test", *key), result)
+
+    revision_cache[key] = result
+
+    return result
+
+def process_cloc_history(reader, files, base_git_path, loc_path_log):
+    """
+    Process the cloc history for a given git revision.
+    The accepted files are exported from the object database into a scratch tree, so the
+    working tree is never touched, and the paths in the log are rewritten to base_git_path.
+    :param reader:
+    :param files: (path, blob_sha, size) tuples of the revision
     :param base_git_path:
     :param loc_path_log:
     :return:
     """
 
     path_full_log = os.path.join(loc_path_log, "cloc.log")
+    path_scratch = os.path.join(loc_path_log, "tree")
+
+    for path, blob_sha, _ in files:
+        if path.rpartition(".")[-1] not in FILE_EXTENSION_ACCEPTED:
+            continue
+
+        path_file = os.path.join(path_scratch, path)
+        os.makedirs(os.path.dirname(path_file), exist_ok=True)
+
+        with open(path_file, "wb") as scratch_file:
+            scratch_file.write(reader.read_blob(blob_sha))
+
+    if not os.path.exists(path_scratch):
+        open(path_full_log, "w").close()
+        return
 
     if is_windows():
-        command = "cd {path_full_git} && {cmd_cloc} {path_full_git} --by-file --csv > {path_full_log}".format(
-            path_full_git=base_git_path, cmd_cloc=EXTERNAL_DIR+"cloc.exe", path_full_log=path_full_log)
+        command = [EXTERNAL_DIR + "cloc.exe", path_scratch, "--by-file", "--csv"]
     else:
-        command = "cd {path_full_git} && cloc {path_full_git} --by-file --csv > {path_full_log}".format(
-            path_full_git=base_git_path, path_full_log=path_full_log)
+        command = ["cloc", path_scratch, "--by-file", "--csv"]
 
-    logger.info(command)
-    os.system(command)
+    logger.info(" ".join(command))
+    output = run_heavy_command(command, cwd=path_scratch, check=False).stdout.decode("latin-1")
 
-def cloc_series(pipeline_id, classify_test_based_on_function, db):
+    with open(path_full_log, "w", encoding="latin-1") as log_file:
+        log_file.write(output.replace(path_scratch, base_git_path.rstrip("/")))
+
+    shutil.rmtree(path_scratch, ignore_errors=True)
+
+def process_revisions(base_git_path, pipeline_id, revisions, calculate_loc):
     """
-    Process the cloc series for a given pipeline.
+    Classify the test files and count the lines of code of a run of revisions.
+    This is the unit of work of generate_timeseries_task, executed in-process or in a worker process,
+    each call opening its own RevisionReader. Consecutive revisions share most of their blobs, so runs
+    of consecutive revisions keep the per-blob caches effective.
+    The results are yielded one revision at a time, so the caller can store each of them before the next
+    one is processed.
+    :param base_git_path:
     :param pipeline_id:
-    :param classify_test_based_on_function:
-    :param db:
-    :return:
+    :param revisions: (commit_order, commit_hash) tuples, in commit_order
+    :param calculate_loc:
+    :return: A generator of one {"commit_order", "tests_data", "details_data", "oversized_blobs",
+    "blob_store_hits", "excluded_files"} dict per revision, in commit_order.
     """
-    logger.info("{now} : BEGIN git log process_cloc: {path_git} \n".format(now=datetime.now(), path_git=pipeline_id))
+    classification_cache = {}
+    loc_cache = {}
+    path_filter = PathFilter()
 
-    ploc_item = []
-    tloc_item = []
+    store = open_blob_store()
+
+    try:
+        with RevisionReader(base_git_path) as reader:
+            for commit_order, commit_hash in revisions:
+                result = process_revision(reader, store, path_filter, base_git_path, pipeline_id, commit_order,
+                                          commit_hash, calculate_loc, classification_cache, loc_cache)
 
-    base_itens = crud.get_base_items_by_pipeline(db, pipeline_id)
-    revisions = [revision.base_item for revision in base_itens]
+                # Only the blobs of the latest revision are kept, consecutive revisions share most of them
+                classification_cache = result.pop("classification_cache")
+                loc_cache = result.pop("loc_cache")
 
-    revision_length = len(revisions)
-    commit_selected = range(revision_length)
+                yield result
+    finally:
+        if store is not None:
+            store.close()
 
-    test_datas = get_tests_data_by_pipeline(db, pipeline_id)
+def process_revisions_run(base_git_path, pipeline_id, revisions, calculate_loc):
+    """
+    Process a run of revisions in a worker process of process_revisions_parallel.
+    The results are sent back to the parent process at once, so they are collected in a list.
+    :param base_git_path:
+    :param pipeline_id:
+    :param revisions: (commit_order, commit_hash) tuples, in commit_order
+    :param calculate_loc:
+    :return: The results of process_revisions, as a list.
+    """
+    return list(process_revisions(base_git_path, pipeline_id, revisions, calculate_loc))
 
-    test_data_by_commit_order = {}
-    for data in test_datas:
-        if data.commit_order not in test_data_by_commit_order:
-            test_data_by_commit_order[data.commit_order] = []
-        test_data_by_commit_order[data.commit_order].append(data)
+def process_revision(reader, store, path_filter, base_git_path, pipeline_id, commit_order, commit_hash, calculate_loc,
+                     classification_cache, loc_cache):
+    """
+    Classify the test files and count the lines of code of a revision.
+    Files excluded by the path filter (deny-list, ignored, vendored or generated) are neither classified nor counted.
+    :param reader:
+    :param store: BlobStore, optional
+    :param path_filter: PathFilter
+    :param base_git_path:
+    :param pipeline_id:
+    :param commit_order:
+    :param commit_hash:
+    :param calculate_loc:
+    :param classification_cache: test classification results of the previous revision
+    :param loc_cache: line counts of the previous revision
+    :return: the result of the revision, with its own "classification_cache" and "loc_cache"
+    """
+    tests_data = []
+    details_data = []
+    oversized_blobs = []
+    revision_cache = {}
+    revision_loc_cache = {}
+    excluded_files = {}
+    store_hits = store.hits if store is not None else 0
 
-    for commit_order in commit_selected:
+    test_path_log = os.path.join(BASE_LOG_TEST_FILE, str(pipeline_id), str(commit_order))
 
-        details_data = []
+    if calculate_loc and LOC_COUNTER == "cloc":
+        loc_path_log = os.path.join(BASE_LOG_LOC, str(pipeline_id), str(commit_order))
 
-        ploc_sum = 0
-        tloc_sum = 0
+    clean_create_dir(test_path_log)
+    if calculate_loc and LOC_COUNTER == "cloc":
+        clean_create_dir(loc_path_log)
 
-        filtered_test_datas = test_data_by_commit_order.get(commit_order, [])
+    files = path_filter.filter_files(reader, reader.list_files(commit_hash), excluded_files)
 
-        if filtered_test_datas is None or len(filtered_test_datas) == 0:
-            ploc_item.append(ploc_sum)
-            tloc_item.append(tloc_sum)
+    for path, blob_sha, size in files:
+        try:
+            file_extension = path.rpartition(".")[-1]
+            if file_extension in FILE_EXTENSION_ACCEPTED:
+
+                file = os.path.join(base_git_path, path)
+
+                if is_oversized(size):
+                    oversized_blobs.append(blob_sha)
+
+                has_test_import, has_test_call, is_test_file = classify_test_file(
+                    reader, blob_sha, size, file_extension, classification_cache, revision_cache, store)
+
+                db_test_data = {
+                    "file_path": file,
+                    "is_test_file": is_test_file,
+                    "has_test_import": has_test_import,
+                    "has_test_call": has_test_call,
+                    "pipeline_id": pipeline_id,
+                    "commit_order": commit_order
+                }
+
+                tests_data.append(db_test_data)
+
+                if calculate_loc and LOC_COUNTER == "builtin":
+                    language, _, _, code = count_file_loc(reader, blob_sha, file_extension,
+                                                          loc_cache, revision_loc_cache, store)
+
+                    details_data.append({"language": language, "commit_order": commit_order,
+                                         "pipeline_id": str(pipeline_id),
+                                         "path": file.replace('\\', '/').replace('//', '/'),
+                                         "loc": code})
+
+        except Exception as e:
+            logger.error(f"Error processing file {path}: {e}")
             continue
 
-        if classify_test_based_on_function:
-            t_files = [data.file_path.replace('\\', '/').replace('//', '/') for data in filtered_test_datas if data.has_test_call == 1]
+    if store is not None:
+        store_hits = store.hits - store_hits
+
+    new_blobs = len([key for key in revision_cache if key not in classification_cache])
+    logger.info(f"Revision {commit_order}: {len(tests_data)} files, {new_blobs} blobs not in the previous revision, "
+                f"{store_hits} results from the blob store")
+
+    if calculate_loc and LOC_COUNTER == "cloc":
+        process_cloc_history(reader, files, base_git_path, loc_path_log)
+
+    if store is not None:
+        store.flush()
+
+    return {"commit_order": commit_order, "tests_data": tests_data, "details_data": details_data,
+            "oversized_blobs": oversized_blobs, "blob_store_hits": store_hits, "excluded_files": excluded_files,
+            "classification_cache": revision_cache, "loc_cache": revision_loc_cache}
 
-        else:
-            t_files = [data.file_path.replace('\\', '/').replace('//', '/') for data in filtered_test_datas if data.is_test_file == 1]
+def process_revisions_parallel(base_git_path, pipeline_id, revisions, calculate_loc, workers):
+    """
+    Fan runs of consecutive revisions out to a process pool.
+    Results are yielded in commit_order as soon as every earlier run is done.
+    :param base_git_path:
+    :param pipeline_id:
+    :param revisions: (commit_order, commit_hash) tuples, in commit_order
+    :param calculate_loc:
+    :param workers: number of worker processes
+    :return:
+    """
+    chunk_size = max(1, math.ceil(len(revisions) / (workers * REVISIONS_CHUNKS_PER_WORKER)))
+    chunks = [revisions[i:i + chunk_size] for i in range(0, len(revisions), chunk_size)]
+
+    # spawn: the celery worker runs under gevent, forking its hub and open connections is unsafe
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [executor.submit(process_revisions_run, base_git_path, pipeline_id, chunk, calculate_loc)
+                   for chunk in chunks]
 
-        opened_file = open(os.path.join(BASE_LOG_LOC, str(pipeline_id), str(commit_order), 'cloc.log'), "r",
-                           encoding="latin-1")
+        for future in futures:
+            yield from future.result()
 
-        for line in opened_file:
+def read_cloc_log(pipeline_id, commit_order):
+    """
+    Read the per-file rows of the cloc log of a revision.
+    :param pipeline_id:
+    :param commit_order:
+    :return: rows in the format stored by create_all_code_distribution_details
+    """
+    details_data = []
 
-            if line.find(BASE_PROJECTS_FOLDER_NAME) == -1 and line.find(IMPORTED_PROJECTS_FOLDER_NAME) == -1:
+    with open(os.path.join(BASE_LOG_LOC, str(pipeline_id), str(commit_order), 'cloc.log'), "r",
+              encoding="latin-1", newline="") as opened_file:
+
+        # language,filename,blank,comment,code
+        for row in csv.reader(opened_file):
+            if len(row) < 5:
                 continue
 
-            # language;filename;blank;comment;code;
-            line_data = line.split(',')
+            # Older cloc versions do not quote file names holding commas
+            path = ",".join(row[1:-3])
+            if path.find(BASE_PROJECTS_FOLDER_NAME) == -1 and path.find(IMPORTED_PROJECTS_FOLDER_NAME) == -1:
+                continue
 
-            language = line_data[0]
-            path_query = get_comma_separated_names(line_data, 5, 1, 2).replace('\\', '/').replace('//', '/')
-            value = parse_int(line_data[-1].replace('\n', ''))
+            path_query = path.replace('\\', '/').replace('//', '/')
 
             extension = path_query.rpartition(".")[-1]
             if extension not in FILE_EXTENSION_ACCEPTED:
                 continue
 
-            is_test_file = path_query in t_files
+            details_data.append({"language": row[0], "commit_order": commit_order,
+                                 "pipeline_id": str(pipeline_id),
+                                 "path": path_query, "loc": parse_int(row[-1])})
+
+    return details_data
 
-            if is_test_file:
-                tloc_sum = tloc_sum + value
+def cloc_series(pipeline_id, classify_test_based_on_function, db):
+    """
+    Process the cloc series for a given pipeline.
+    With the cloc counter the per-file rows are read from the cloc logs and stored, with the builtin
+    counter they were already stored by generate_timeseries_task.
+    TestData is walked revision by revision through a server-side cursor of its own session, so memory
+    does not grow with the length of the history.
+    :param pipeline_id:
+    :param classify_test_based_on_function:
+    :param db:
+    :return:
+    """
+    logger.info("{now} : BEGIN git log process_cloc: {path_git} \n".format(now=datetime.now(), path_git=pipeline_id))
+
+    ploc_item = []
+    tloc_item = []
+
+    revision_length = len(crud.get_base_items_by_pipeline(db, pipeline_id))
+
+    # The cursor must outlive the commits of create_all_code_distribution_details
+    stream_db = SessionLocal()
+
+    try:
+        test_datas = crud.stream_tests_data_by_pipeline(stream_db, pipeline_id)
+        test_datas_by_commit_order = itertools.groupby(test_datas, key=lambda data: data.commit_order)
+
+        next_group = next(test_datas_by_commit_order, None)
+
+        for commit_order in range(revision_length):
+
+            ploc_sum = 0
+            tloc_sum = 0
+
+            if next_group is None or next_group[0] != commit_order:
+                ploc_item.append(ploc_sum)
+                tloc_item.append(tloc_sum)
+                continue
+
+            if classify_test_based_on_function:
+                t_files = {data.file_path.replace('\\', '/').replace('//', '/') for data in next_group[1]
+                           if data.has_test_call == 1}
             else:
-                ploc_sum = ploc_sum + value
+                t_files = {data.file_path.replace('\\', '/').replace('//', '/') for data in next_group[1]
+                           if data.is_test_file == 1}
 
-            details_data.append({"language": language, "commit_order": commit_order,
-                                                   "pipeline_id": str(pipeline_id),
-                                                   "path": path_query, "loc": value})
+            next_group = next(test_datas_by_commit_order, None)
 
-        crud.create_all_code_distribution_details(db, details_data)
+            if LOC_COUNTER == "cloc":
+                details_data = read_cloc_log(pipeline_id, commit_order)
+                crud.create_all_code_distribution_details(db, details_data)
+            else:
+                details_data = [{"path": detail.path, "loc": detail.loc} for detail in
+                                crud.get_code_distribution_details_by_pipeline_and_commit_order(db, pipeline_id, commit_order)]
 
-        ploc_item.append(ploc_sum)
-        tloc_item.append(tloc_sum)
+            for detail in details_data:
+                if detail["path"] in t_files:
+                    tloc_sum = tloc_sum + detail["loc"]
+                else:
+                    ploc_sum = ploc_sum + detail["loc"]
 
-        opened_file.close()
+            ploc_item.append(ploc_sum)
+            tloc_item.append(tloc_sum)
+    finally:
+        stream_db.close()
 
     logger.info("{now} : END git log process_cloc: {path_git} \n".format(now=datetime.now(), path_git=str(pipeline_id)))
 
-    return [ploc_item, tloc_item]
\ No newline at end of file
+    return [ploc_item, tloc_item]
@@ -0,0 +1,319 @@
+import re
+import subprocess
+
+from ..config import COMMAND_TIMEOUT, HEAVY_COMMAND_TIMEOUT
+from ..logger_config import logger
+from .process_utils import ReadWatchdog, heavy_command_slot, kill_process, run_command, run_heavy_command, \
+    start_process
+
+SYMLINK_MODE = b"120000"
+
+# Bytes read from `git cat-file --batch` at a time when draining the unread part of a blob
+READ_CHUNK_SIZE = 64 * 1024
+
+# hash, parent hashes, author name, committer name, author date, raw message, NUL separated (git log -z also ends each record with a NUL)
+LOG_FORMAT = "%H%x00%P%x00%an%x00%cn%x00%ad%x00%B"
+LOG_FIELDS = 6
+
+SHORTSTAT_REGEX = re.compile(r"(\d+) (?:insertion|deletion)")
+
+def get_commits_churn(base_git_path):
+    """
+    Get the churn (inserted plus deleted lines) of every commit of a repository in a single `git log` pass.
+    Merge commits have no diff in `git log` and a churn of 0.
+    :param base_git_path:
+    :return: A dict of commit hash to churn.
+    """
+    output = run_heavy_command(["git", "log", "--no-renames", "--shortstat", "--format=%x00%H"],
+                               cwd=base_git_path).stdout.decode("utf-8", errors="replace")
+
+    churn = {}
+    for record in output.split("\0")[1:]:
+        commit_hash, _, shortstat = record.strip().partition("\n")
+        churn[commit_hash] = sum(int(value) for value in SHORTSTAT_REGEX.findall(shortstat))
+
+    return churn
+
+def is_ancestor(base_git_path, ancestor, descendant="HEAD"):
+    """
+    Check if a commit is an ancestor of (or the same as) another one.
+    :param base_git_path:
+    :param ancestor:
+    :param descendant:
+    :return: False as well when either commit is unknown to the repository.
+    """
+    result = run_command(["git", "merge-base", "--is-ancestor", ancestor, descendant], cwd=base_git_path, check=False)
+
+    return result.returncode == 0
+
+def list_commit_hashes(base_git_path, revision_range="HEAD"):
+    """
+    List the hashes of the commits of a revision range, oldest first, in the order of iter_commits.
+    :param base_git_path:
+    :param revision_range: e.g. "<hash>..HEAD"
+    :return:
+    """
+    output = run_command(["git", "rev-list", "--reverse", revision_range], cwd=base_git_path).stdout.decode("ascii")
+
+    return output.split()
+
+def iter_commits(base_git_path, revision_range="HEAD"):
+    """
+    Stream the commits of a repository from `git log`, oldest first, parsing the output incrementally.
+    Yields the fields stored by crud.create_commit, with the values pydriller gives for them, and whether
+    the commit is a merge. The one difference is a commit declaring a legacy encoding (i18n.commitEncoding):
+    git re-encodes its names and message to UTF-8, where pydriller decodes their raw bytes as UTF-8.
+    :param base_git_path:
+    :param revision_range: commits to read, e.g. "<hash>..HEAD" for the ones after a commit
+    :return: A generator of {"hash", "author_name", "committer_name", "author_date", "message", "merge"} dicts.
+    """
+    slot = heavy_command_slot()
+    process = None
+    watchdog = None
+
+    try:
+        slot.acquire()
+
+        process = start_process(["git", "log", "--reverse", "-z", "--date=format:%Y-%m-%d %H:%M:%S",
+                                 f"--format={LOG_FORMAT}", revision_range], cwd=base_git_path,
+                                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE)
+        # The timeout bounds the time git log leaves the pipe idle, not the time the caller takes
+        watchdog = ReadWatchdog(process, HEAVY_COMMAND_TIMEOUT, "git log")
+
+        fields = []
+        remainder = b""
+        with watchdog:
+            chunk = process.stdout.read1(READ_CHUNK_SIZE)
+
+        while chunk:
+            # One chunk is read ahead, so the end of the output is known before the last commits are yielded:
+            # the slot is released as soon as git log exits, not when the caller is done with them. While git log
+            # runs the slot stays taken, even when the caller is suspended, since the process is still alive.
+            with watchdog:
+                next_chunk = process.stdout.read1(READ_CHUNK_SIZE)
+
+            if not next_chunk:
+                watchdog.stop()
+                process.wait()
+                slot.release()
+
+            parts = (remainder + chunk).split(b"\0")
+            remainder = parts.pop()
+            commits = []
+
+            for part in parts:
+                fields.append(part.decode("utf-8", errors="replace"))
+
+                if len(fields) == LOG_FIELDS:
+                    commit_hash, parents, author_name, committer_name, author_date, message = fields
+                    fields = []
+
+                    commits.append({
+                        "hash": commit_hash,
+                        "author_name": author_name,
+                        "committer_name": committer_name,
+                        "author_date": author_date,
+                        "message": message.strip(),
+                        "merge": len(parents.split()) > 1
+                    })
+
+            yield from commits
+            chunk = next_chunk
+    finally:
+        if watchdog is not None:
+            watchdog.stop()
+        if process is not None:
+            kill_process(process)
+            process.stdout.close()
+        slot.release()
+
+    if watchdog.expired:
+        raise Exception(f"git log timed out in {base_git_path}")
+
+    if process.returncode != 0:
+        raise Exception(f"git log failed in {base_git_path} with exit code {process.returncode}")
+
+def is_partial_clone(base_git_path):
+    """
+    Check if a repository is a partial clone, missing objects being fetched from its origin on demand.
+    :param base_git_path:
+    :return:
+    """
+    result = run_command(["git", "config", "--get", "remote.origin.promisor"], cwd=base_git_path, check=False)
+
+    return result.stdout.strip() == b"true"
+
+def list_missing_objects(base_git_path, commit_hashes):
+    """
+    List the objects of the trees of some commits that are missing from a partial clone.
+    The trees of a missing tree are not listed, they are known once it is fetched.
+    :param base_git_path:
+    :param commit_hashes:
+    :return: A list of object hashes.
+    """
+    output = run_command(["git", "rev-list", "--objects", "--no-walk", "--missing=print", "--stdin"],
+                         cwd=base_git_path, input="\n".join(commit_hashes).encode("ascii")
+                         ).stdout.decode("utf-8", errors="replace")
+
+    return [line[1:] for line in output.splitlines() if line.startswith("?")]
+
+def prefetch_objects(base_git_path, commit_hashes):
+    """
+    Fetch in bulk the objects a partial clone misses to read every file of some commits.
+    Reading a missing blob would otherwise fetch it on its own, one round trip per file.
+    :param base_git_path:
+    :param commit_hashes:
+    :return: The number of objects fetched, 0 when the repository is not a partial clone.
+    """
+    if not commit_hashes or not is_partial_clone(base_git_path):
+        return 0
+
+    fetched = 0
+    previous_missing = None
+
+    # Each round fetches the missing blobs and trees, whose own entries may be missing in turn (treeless clones)
+    while True:
+        missing = list_missing_objects(base_git_path, commit_hashes)
+        if not missing:
+            return fetched
+
+        if missing == previous_missing:
+            raise Exception(f"Could not fetch {len(missing)} missing objects in {base_git_path}")
+
+        logger.info(f"Fetching {len(missing)} missing objects in {base_git_path}")
+        run_heavy_command(["git", "-c", "fetch.negotiationAlgorithm=noop", "fetch", "--quiet", "origin", "--no-tags",
+                           "--no-write-fetch-head", "--recurse-submodules=no", "--filter=blob:none", "--stdin"],
+                          cwd=base_git_path, input="\n".join(missing).encode("ascii"))
+
+        fetched += len(missing)
+        previous_missing = missing
+
+class RevisionReader:
+    """
+    Read the files of any revision straight from the git object database.
+
+    Files are listed with `git ls-tree` and blob contents are served by a single long-lived
+    `git cat-file --batch` process, so no revision is ever checked out in the working tree.
+    Each read of a blob may wait at most COMMAND_TIMEOUT seconds for the process, which is killed and
+    restarted on the next read otherwise.
+    """
+
+    def __init__(self, base_git_path):
+        self.base_git_path = base_git_path
+        self.process = None
+        self.watchdog = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """
+        Start the `git cat-file --batch` session if it is not running yet.
+        :return:
+        """
+        if self.process is None:
+            self.process = start_process(["git", "cat-file", "--batch"], cwd=self.base_git_path,
+                                         stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            self.watchdog = ReadWatchdog(self.process, COMMAND_TIMEOUT, "git cat-file --batch")
+
+    def close(self):
+        """
+        Stop the `git cat-file --batch` session.
+        :return:
+        """
+        if self.process is not None:
+            self.watchdog.stop()
+
+            try:
+                self.process.stdin.close()
+                self.process.stdout.close()
+                self.process.wait(timeout=COMMAND_TIMEOUT or None)
+            except (OSError, subprocess.TimeoutExpired):
+                kill_process(self.process)
+
+            self.process = None
+
+    def list_files(self, commit_hash):
+        """
+        List the regular files of a revision.
+        :param commit_hash:
+        :return: A list of (path, blob_sha, size) tuples, paths relative to the repository root.
+        """
+        output = run_command(["git", "ls-tree", "-r", "-z", "-l", "--full-tree", commit_hash],
+                             cwd=self.base_git_path).stdout
+
+        files = []
+        for entry in output.split(b"\0"):
+            if not entry:
+                continue
+
+            # <mode> SP <type> SP <object> SP+ <size> TAB <path>
+            meta, _, path = entry.partition(b"\t")
+            mode, object_type, blob_sha, size = meta.split()
+
+            if object_type != b"blob" or mode == SYMLINK_MODE:
+                continue
+
+            files.append((path.decode("utf-8", errors="replace"), blob_sha.decode("ascii"), int(size)))
+
+        return files
+
+    def read_blob(self, blob_sha, limit=None):
+        """
+        Read the contents of a blob.
+        :param blob_sha:
+        :param limit: maximum number of bytes returned, the rest of the blob is drained in bounded chunks
+        :return: The blob contents as bytes.
+        """
+        self.open()
+
+        try:
+            with self.watchdog:
+                contents = self.read_object(blob_sha, limit)
+        except Exception:
+            if not self.watchdog.expired:
+                raise
+
+        if not self.watchdog.expired:
+            return contents
+
+        # The watchdog killed the stuck session, the next read starts a new one
+        self.close()
+        raise Exception(f"git cat-file timed out reading object {blob_sha} in {self.base_git_path}")
+
+    def read_object(self, blob_sha, limit):
+        """
+        Request a blob from the `git cat-file --batch` session and read its contents.
+        :param blob_sha:
+        :param limit: see read_blob
+        :return: The blob contents as bytes.
+        """
+        self.process.stdin.write(blob_sha.encode("ascii") + b"\n")
+        self.process.stdin.flush()
+
+        # <sha> SP <type> SP <size> LF <contents> LF
+        header = self.process.stdout.readline().split()
+        if len(header) != 3:
+            logger.error(f"git cat-file could not read object {blob_sha}")
+            raise Exception(f"Object {blob_sha} not found in {self.base_git_path}")
+
+        size = int(header[2])
+        if limit is None or size <= limit:
+            contents = self.process.stdout.read(size)
+        else:
+            contents = self.process.stdout.read(limit)
+
+            remaining = size - limit
+            while remaining > 0:
+                chunk = self.process.stdout.read(min(remaining, READ_CHUNK_SIZE))
+                if not chunk:
+                    raise Exception(f"git cat-file ended while reading object {blob_sha}")
+                remaining -= len(chunk)
+
+        self.process.stdout.read(1)
+
+        return contents
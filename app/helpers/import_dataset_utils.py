@@ -4,6 +4,7 @@ from datetime import datetime
 import pandas as pd
 
 from app import crud, models
+from app.config import COMMIT_MESSAGE_INSERT_BATCH_SIZE
 from app.constants import BASE_LOG_CLOC, BASE_PROJECTS, BASE_LOG_CO_EVOLUTION, BASE_SUMMARY_MAINTENANCE_ACTIVITIES, \
     BASE_LOG_PROJECT_DIMENSION, BASE_LOG_COMMITS, BASE_LOG_PERIOD_REVISIONS, BASE_LOG_REVISIONS, BASE_LOG_TEST_FILE, \
     BASE_LOG_MAINTENANCE_ACTIVITIES, BASE_LOG_LOC, BASE_PROJECTS_FOLDER_NAME, IMPORTED_PROJECTS_FOLDER_NAME, \
@@ -12,7 +13,8 @@ from app.database import get_db
 from app.dtos.commit_maintenance_activities_result import CommitMaintenanceActivitiesResult
 from app.dtos.my_project_result import MyProjectResult
 from app.enums import StatusEnum, StageEnum, LanguageEnum
-from app.helpers.calculate_metrics_utils import get_maintenance_activities_repo, get_project_dimension_repo
+from app.helpers.calculate_metrics_utils import get_maintenance_activities_repo, get_project_dimension_repo, \
+    build_commit_message_rows
 from app.helpers.co_evolution_utils import check_coevolution
 from app.helpers.file_utils import get_json, save_json
 from app.helpers.string_utils import get_comma_separated_names
@@ -630,6 +632,8 @@ def save_commit_message_item():
                     logger.info(f"CommitMessageItem already exist for project_id {project_id} and pipeline.")
                     continue
 
+                commit_message_items = []
+
                 m_file = open(BASE_LOG_MAINTENANCE_ACTIVITIES + str(project_result.id) + '.csv', 'r', encoding='latin-1')
                 for m_row in m_file:
                     commit_message_item = CommitMaintenanceActivitiesResult()
@@ -640,9 +644,10 @@ def save_commit_message_item():
 
                     commit_message_item.set_from_csv(csv_line)
 
-                    commit_message_item.pipeline_id = db_pipeline.id
+                    commit_message_items.append(commit_message_item)
 
-                    crud.create_commit_message_item(db, commit_message_item.to_dict())
+                crud.create_all_commit_message_items(db, build_commit_message_rows(commit_message_items, db_pipeline.id),
+                                                     COMMIT_MESSAGE_INSERT_BATCH_SIZE)
 
             logger.info(f"End project {project_id}")
 
@@ -0,0 +1,139 @@
+import re
+
+from .blob_store_utils import build_blob_key
+
+# Bump whenever the counting rules below change, so memoized counts are discarded.
+LOC_COUNTER_VERSION = "2"
+
+C_BLOCK_COMMENT = r"/\*[\s\S]*?(?:\*/|\Z)"
+DOUBLE_QUOTED_STRING = r'"(?:\\.|[^"\\\n])*"'
+SINGLE_QUOTED_STRING = r"'(?:\\.|[^'\\\n])*'"
+
+def build_comment_regex(line_comments, block_comments, strings):
+    """
+    Build the regex matching the comments of a language. String literals are matched too,
+    so comment markers inside them are not taken as comments.
+    :param line_comments: regexes of the line comment markers
+    :param block_comments: regexes of whole block comments
+    :param strings: regexes of string literals
+    :return:
+    """
+    alternatives = list(block_comments)
+
+    if strings:
+        alternatives.append("(?P<string>%s)" % "|".join(strings))
+
+    alternatives += ["(?:%s)[^\n]*" % line_comment for line_comment in line_comments]
+
+    return re.compile("|".join(alternatives), re.MULTILINE)
+
+C_STYLE = build_comment_regex([r"//"], [C_BLOCK_COMMENT], [DOUBLE_QUOTED_STRING, SINGLE_QUOTED_STRING])
+
+# extension: (language name as reported by cloc, comment regex)
+LANGUAGES = {
+    "js": ("JavaScript", C_STYLE),
+    "java": ("Java", C_STYLE),
+    "py": ("Python", build_comment_regex([r"#"], [r'"""[\s\S]*?(?:"""|\Z)', r"'''[\s\S]*?(?:'''|\Z)"],
+                                         [DOUBLE_QUOTED_STRING, SINGLE_QUOTED_STRING])),
+    "php": ("PHP", build_comment_regex([r"//", r"#"], [C_BLOCK_COMMENT], [DOUBLE_QUOTED_STRING, SINGLE_QUOTED_STRING])),
+    "rb": ("Ruby", build_comment_regex([r"#"], [r"^=begin\b[\s\S]*?(?:^=end\b[^\n]*|\Z)"],
+                                       [DOUBLE_QUOTED_STRING, SINGLE_QUOTED_STRING])),
+    "c": ("C", C_STYLE),
+    "cpp": ("C++", C_STYLE),
+    "cs": ("C#", C_STYLE),
+    "m": ("Objective-C", C_STYLE),
+    "clj": ("Clojure", build_comment_regex([r";"], [], [DOUBLE_QUOTED_STRING])),
+    "go": ("Go", build_comment_regex([r"//"], [C_BLOCK_COMMENT], [DOUBLE_QUOTED_STRING, r"`[^`]*`"])),
+    "hs": ("Haskell", build_comment_regex([r"--"], [r"\{-[\s\S]*?(?:-\}|\Z)"], [DOUBLE_QUOTED_STRING])),
+    "lua": ("Lua", build_comment_regex([r"--"], [r"--\[(?P<level>=*)\[[\s\S]*?(?:\](?P=level)\]|\Z)"],
+                                       [DOUBLE_QUOTED_STRING, SINGLE_QUOTED_STRING])),
+    "pl": ("Perl", build_comment_regex([r"#"], [r"^=[a-zA-Z][\s\S]*?(?:^=cut\b[^\n]*|\Z)"],
+                                       [DOUBLE_QUOTED_STRING, SINGLE_QUOTED_STRING])),
+    "r": ("R", build_comment_regex([r"#"], [], [DOUBLE_QUOTED_STRING, SINGLE_QUOTED_STRING])),
+    "rs": ("Rust", build_comment_regex([r"//"], [C_BLOCK_COMMENT], [DOUBLE_QUOTED_STRING])),
+    "scala": ("Scala", C_STYLE),
+    "sh": ("Bourne Shell", build_comment_regex([r"#"], [], [DOUBLE_QUOTED_STRING, SINGLE_QUOTED_STRING])),
+    "swift": ("Swift", build_comment_regex([r"//"], [C_BLOCK_COMMENT], [DOUBLE_QUOTED_STRING])),
+    "tex": ("TeX", build_comment_regex([r"(?<!\\)%"], [], [])),
+    "vim": ("vim script", build_comment_regex([r'^\s*"'], [], [])),
+}
+
+def remove_comment(match):
+    """
+    Replace a comment by the line breaks it spans, keeping string literals untouched.
+    :param match:
+    :return:
+    """
+    if match.lastgroup == "string":
+        return match.group()
+
+    return "\n" * match.group().count("\n")
+
+def count_loc(contents, file_extension):
+    """
+    Count the blank, comment and code lines of a file.
+    :param contents: file contents as bytes
+    :param file_extension:
+    :return: (blank, comment, code)
+    """
+    _, comment_regex = LANGUAGES[file_extension]
+
+    text = contents.decode("latin-1").replace("\r\n", "\n").replace("\r", "\n")
+
+    # An empty file has no lines at all, as for cloc
+    if not text:
+        return 0, 0, 0
+
+    lines = text.split("\n")
+    code_lines = comment_regex.sub(remove_comment, text).split("\n")
+
+    if text.endswith("\n"):
+        lines.pop()
+        code_lines.pop()
+
+    blank = 0
+    comment = 0
+    code = 0
+
+    for line, code_line in zip(lines, code_lines):
+        if not line.strip():
+            blank += 1
+        elif not code_line.strip():
+            comment += 1
+        else:
+            code += 1
+
+    return blank, comment, code
+
+def count_file_loc(reader, blob_sha, file_extension, previous_cache, revision_cache, store=None):
+    """
+    Count the lines of a blob, reusing the count of the previous revision when the blob is unchanged,
+    then the count stored by any earlier pipeline.
+    Both caches are keyed by (blob_sha, file_extension, LOC_COUNTER_VERSION).
+    :param reader:
+    :param blob_sha:
+    :param file_extension:
+    :param previous_cache: counts of the previous revision
+    :param revision_cache: counts of the current revision, filled by this call
+    :param store: BlobStore, optional
+    :return: (language, blank, comment, code)
+    """
+    key = (blob_sha, file_extension, LOC_COUNTER_VERSION)
+
+    result = revision_cache.get(key) or previous_cache.get(key)
+
+    if result is None and store is not None:
+        stored = store.get(build_blob_key("loc", *key))
+        if stored is not None:
+            result = tuple(stored)
+
+    if result is None:
+        language, _ = LANGUAGES[file_extension]
+        result = (language,) + count_loc(reader.read_blob(blob_sha), file_extension)
+
+        if store is not None:
+            store.put(build_blob_key("loc", *key), result)
+
+    revision_cache[key] = result
+
+    return result
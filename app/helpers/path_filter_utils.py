@@ -0,0 +1,267 @@
+import re
+
+from app.config import PATH_DENY_LIST, PATH_FILTER_RULES
+from app.logger_config import logger
+
+# Reasons a path is excluded for, in the order they are checked
+EXCLUDE_REASONS = ["deny_list", "gitignore", "vendored", "generated"]
+
+# linguist attributes of .gitattributes excluding a file, and the reason recorded for them
+LINGUIST_ATTRIBUTES = {"linguist-vendored": "vendored", "linguist-generated": "generated"}
+
+def translate_glob(pattern):
+    """
+    Translate a gitignore glob, without its leading and trailing slashes, into a regex.
+    :param pattern:
+    :return: The regex source, matching a whole path relative to the directory of the pattern.
+    """
+    regex = ""
+    i = 0
+
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            regex += "/.*"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2:]:
+            end = pattern.index("]", i + 2)
+            characters = pattern[i + 1:end]
+            if characters[0] in "!^":
+                characters = "^" + characters[1:]
+            regex += "[" + characters.replace("\\", "\\\\") + "]"
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            regex += re.escape(pattern[i + 1])
+            i += 2
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+
+    return regex
+
+def compile_pattern(pattern, base):
+    """
+    Compile a gitignore pattern of the rules file of a directory.
+    A pattern without a slash matches at any depth below the directory, one with a slash is anchored to it.
+    :param pattern: pattern without its "!" and trailing slash
+    :param base: directory of the rules file, "" for the repository root, else ending with "/"
+    :return: The compiled regex, matched against paths relative to the repository root.
+    """
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+
+    prefix = re.escape(base) if anchored else re.escape(base) + "(?:.*/)?"
+
+    return re.compile(prefix + translate_glob(pattern) + r"\Z")
+
+def parse_gitignore(contents, base):
+    """
+    Parse the rules of a .gitignore file.
+    :param contents: text of the file
+    :param base: directory of the file, "" for the repository root, else ending with "/"
+    :return: A list of (regex, negated, directory_only) rules, in file order.
+    """
+    rules = []
+
+    for line in contents.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+
+        try:
+            rules.append((compile_pattern(line, base), negated, directory_only))
+        except re.error:
+            logger.warning(f"Ignoring invalid pattern {line} of {base}.gitignore")
+
+    return rules
+
+def parse_gitattributes(contents, base):
+    """
+    Parse the linguist-vendored and linguist-generated attributes of a .gitattributes file.
+    :param contents: text of the file
+    :param base: directory of the file, "" for the repository root, else ending with "/"
+    :return: A list of (regex, reason, excluded) rules, in file order. excluded is False when the attribute is unset.
+    """
+    rules = []
+
+    for line in contents.splitlines():
+        fields = line.split()
+        if len(fields) < 2 or fields[0].startswith("#") or fields[0].startswith("!") or fields[0].endswith("/"):
+            continue
+
+        for attribute in fields[1:]:
+            name, _, value = attribute.lstrip("-!").partition("=")
+            if name not in LINGUIST_ATTRIBUTES:
+                continue
+
+            excluded = not attribute.startswith(("-", "!")) and value.lower() not in ("false", "0")
+
+            try:
+                rules.append((compile_pattern(fields[0], base), LINGUIST_ATTRIBUTES[name], excluded))
+            except re.error:
+                logger.warning(f"Ignoring invalid pattern {fields[0]} of {base}.gitattributes")
+
+    return rules
+
+def is_ignored(rules, path, directories):
+    """
+    Check a path against gitignore rules: it is ignored when one of its directories is, else when the last rule
+    matching it is not negated.
+    :param rules: (regex, negated, directory_only) rules, in precedence order
+    :param path:
+    :param directories: dict of directory to whether it is ignored, filled by this call
+    :return:
+    """
+    parts = path.split("/")
+
+    for depth in range(1, len(parts)):
+        directory = "/".join(parts[:depth])
+
+        if directory not in directories:
+            directories[directory] = matches_last(rules, directory, True)
+
+        if directories[directory]:
+            return True
+
+    return matches_last(rules, path, False)
+
+def matches_last(rules, path, is_directory):
+    """
+    Find whether the last gitignore rule matching a path ignores it.
+    :param rules:
+    :param path:
+    :param is_directory:
+    :return:
+    """
+    for regex, negated, directory_only in reversed(rules):
+        if directory_only and not is_directory:
+            continue
+
+        if regex.match(path):
+            return not negated
+
+    return False
+
+class PathFilter:
+    """
+    Exclude the files of a revision that are not part of the project's own code: paths of the deny-list
+    (PATH_DENY_LIST), ignored ones (.gitignore) and vendored or generated ones (linguist-vendored and
+    linguist-generated in .gitattributes).
+
+    The rules files are read from the revision itself. Consecutive revisions mostly share them, so the rules
+    and the decisions taken on each path are kept until a rules file changes.
+    """
+
+    def __init__(self, deny_list=PATH_DENY_LIST, rules=PATH_FILTER_RULES):
+        self.deny_rules = parse_gitignore("\n".join(deny_list.split(",")), "")
+        self.rules_files = tuple("." + name.strip() for name in rules.split(",") if name.strip())
+        self.rules_key = None
+        self.ignore_rules = []
+        self.attribute_rules = []
+        self.reasons = {}
+        self.deny_directories = {}
+        self.ignore_directories = {}
+
+    def load(self, reader, files):
+        """
+        Load the rules files of a revision.
+        :param reader: RevisionReader of the repository
+        :param files: (path, blob_sha, size) tuples of the revision
+        :return:
+        """
+        rules_files = sorted((path.count("/"), path, blob_sha) for path, blob_sha, _ in files
+                             if path.rpartition("/")[-1] in self.rules_files)
+
+        rules_key = tuple((path, blob_sha) for _, path, blob_sha in rules_files)
+        if rules_key == self.rules_key:
+            return
+
+        self.rules_key = rules_key
+        self.ignore_rules = []
+        self.attribute_rules = []
+        self.reasons = {}
+        self.ignore_directories = {}
+
+        # Shallower files first, rules of deeper ones take precedence
+        for _, path, blob_sha in rules_files:
+            base, _, name = path.rpartition("/")
+            base = base + "/" if base else ""
+            contents = reader.read_blob(blob_sha).decode("utf-8", errors="replace")
+
+            if name == ".gitignore":
+                self.ignore_rules += parse_gitignore(contents, base)
+            else:
+                self.attribute_rules += parse_gitattributes(contents, base)
+
+    def get_exclude_reason(self, path):
+        """
+        Find why a path is excluded.
+        :param path: path relative to the repository root
+        :return: The reason, one of EXCLUDE_REASONS, None when the path is kept.
+        """
+        if path in self.reasons:
+            return self.reasons[path]
+
+        reason = None
+
+        if self.deny_rules and is_ignored(self.deny_rules, path, self.deny_directories):
+            reason = "deny_list"
+        elif self.ignore_rules and is_ignored(self.ignore_rules, path, self.ignore_directories):
+            reason = "gitignore"
+        else:
+            attributes = {}
+            for regex, attribute_reason, excluded in self.attribute_rules:
+                if regex.match(path):
+                    attributes[attribute_reason] = excluded
+
+            reason = next((attribute_reason for attribute_reason in ("vendored", "generated")
+                           if attributes.get(attribute_reason)), None)
+
+        self.reasons[path] = reason
+
+        return reason
+
+    def filter_files(self, reader, files, excluded):
+        """
+        Drop the excluded files of a revision.
+        :param reader: RevisionReader of the repository
+        :param files: (path, blob_sha, size) tuples of the revision
+        :param excluded: dict of exclude reason to count, updated with the files dropped
+        :return: The list of kept (path, blob_sha, size) tuples.
+        """
+        for reason in EXCLUDE_REASONS:
+            excluded.setdefault(reason, 0)
+
+        self.load(reader, files)
+
+        kept = []
+        for file in files:
+            reason = self.get_exclude_reason(file[0])
+            if reason is None:
+                kept.append(file)
+            else:
+                excluded[reason] += 1
+
+        return kept
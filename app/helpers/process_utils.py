@@ -0,0 +1,214 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+
+from app.config import COMMAND_TIMEOUT, HEAVY_COMMAND_TIMEOUT, HEAVY_COMMANDS_PER_NODE
+from app.constants import BASE_LOCKS
+from app.logger_config import logger
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Seconds between two attempts to take a free slot of a node semaphore
+SLOT_POLL_INTERVAL = 0.5
+
+# Seconds between two checks of the deadline of a ReadWatchdog, at most
+WATCHDOG_POLL_INTERVAL = 1
+
+# Characters of the error output of a failed command written to the log
+STDERR_LOG_LENGTH = 2000
+
+class NodeSemaphore:
+    """
+    Counting semaphore shared by every process of the node (API, celery workers and their process pools).
+
+    Each slot is a lock file under BASE_LOCKS, held with flock while the slot is taken, so a slot is released
+    by the kernel even when its holder dies. Waiting polls non-blocking locks, so the gevent pool of the
+    worker keeps running other tasks.
+    """
+
+    def __init__(self, name, slots):
+        self.paths = [os.path.join(BASE_LOCKS, f"{name}-{slot}.lock") for slot in range(max(slots, 0))]
+        self.file = None
+
+    def acquire(self):
+        """
+        Take a slot, waiting until one is free. Without slots (or flock) there is no limit.
+        :return:
+        """
+        if not self.paths or fcntl is None:
+            return
+
+        os.makedirs(BASE_LOCKS, exist_ok=True)
+
+        while True:
+            for path in self.paths:
+                file = open(path, "a")
+                try:
+                    fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    self.file = file
+                    return
+                except BlockingIOError:
+                    file.close()
+
+            time.sleep(SLOT_POLL_INTERVAL)
+
+    def release(self):
+        """
+        Release the slot taken.
+        :return:
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+def heavy_command_slot():
+    """
+    Get the semaphore limiting the heavy commands (clones, fetches, full history walks, cloc) running on the node.
+    :return:
+    """
+    return NodeSemaphore("heavy-command", HEAVY_COMMANDS_PER_NODE)
+
+def start_process(args, **kwargs):
+    """
+    Start a process in a process group of its own, so it can be killed along with every process it starts
+    (git runs helpers such as index-pack or remote-https).
+    :param args:
+    :param kwargs: arguments of subprocess.Popen
+    :return: The Popen object.
+    """
+    if os.name != "nt":
+        kwargs["start_new_session"] = True
+
+    return subprocess.Popen(args, **kwargs)
+
+def kill_process(process):
+    """
+    Kill a process started by start_process and its process group, then reap it.
+    :param process:
+    :return:
+    """
+    if process.poll() is None:
+        try:
+            if os.name != "nt":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+
+    process.wait()
+
+class ReadWatchdog:
+    """
+    Kill a long-lived process when one of the reads of its output waits longer than timeout.
+
+    Only the time spent blocked on the pipe counts: reads are armed with `with watchdog:` and the time the
+    caller spends between them (writing to the database, waiting on a queue, ...) is not measured. A single
+    daemon thread checks the deadline, so arming every read of a `git cat-file --batch` session is cheap.
+    """
+
+    def __init__(self, process, timeout, name):
+        self.process = process
+        self.timeout = timeout
+        self.name = name
+        self.deadline = None
+        self.expired = False
+        self.stopped = threading.Event()
+
+        if timeout:
+            threading.Thread(target=self.watch, name=f"watchdog-{process.pid}", daemon=True).start()
+
+    def __enter__(self):
+        if self.timeout:
+            self.deadline = time.monotonic() + self.timeout
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.deadline = None
+
+    def watch(self):
+        """
+        Wait for the deadline of an armed read to pass, then kill the process, until stopped.
+        :return:
+        """
+        while not self.stopped.wait(min(WATCHDOG_POLL_INTERVAL, self.timeout)):
+            deadline = self.deadline
+            if deadline is not None and time.monotonic() > deadline:
+                self.expired = True
+                logger.error(f"{self.name} produced no output for {self.timeout} seconds, killing it")
+                kill_process(self.process)
+                return
+
+    def stop(self):
+        """
+        Stop watching the process.
+        :return:
+        """
+        self.stopped.set()
+
+def run_command(args, cwd=None, input=None, timeout=COMMAND_TIMEOUT, heavy=False, check=True):
+    """
+    Run a command in a process group of its own, capturing its output.
+    The process group is killed when the command times out or the caller is interrupted (task revoked,
+    greenlet killed, ...), so no git process outlives the task that started it.
+    The whole output is buffered in memory by communicate(), so commands whose output grows with the
+    history or the size of the repository are streamed instead (see iter_commits and RevisionReader).
+    :param args:
+    :param cwd:
+    :param input: bytes written to the standard input of the command
+    :param timeout: seconds, 0 or None waits forever
+    :param heavy: take a slot of the node-wide heavy command semaphore while the command runs
+    :param check: raise subprocess.CalledProcessError when the command fails
+    :return: A subprocess.CompletedProcess, with stdout and stderr as bytes.
+    """
+    slot = heavy_command_slot() if heavy else None
+    if slot is not None:
+        slot.acquire()
+
+    try:
+        process = start_process(args, cwd=cwd, stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            stdout, stderr = process.communicate(input, timeout=timeout or None)
+        except subprocess.TimeoutExpired:
+            logger.error(f"{' '.join(args)} timed out after {timeout} seconds, killing it")
+            kill_process(process)
+            raise
+        except BaseException:
+            kill_process(process)
+            raise
+
+    finally:
+        if slot is not None:
+            slot.release()
+
+    if check and process.returncode != 0:
+        logger.error(f"{' '.join(args)} failed with exit code {process.returncode}: "
+                     f"{stderr.decode('utf-8', errors='replace')[-STDERR_LOG_LENGTH:]}")
+        raise subprocess.CalledProcessError(process.returncode, args, stdout, stderr)
+
+    return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+
+def run_heavy_command(args, cwd=None, input=None, timeout=HEAVY_COMMAND_TIMEOUT, check=True):
+    """
+    Run a heavy command, see run_command.
+    :param args:
+    :param cwd:
+    :param input:
+    :param timeout:
+    :param check:
+    :return:
+    """
+    return run_command(args, cwd=cwd, input=input, timeout=timeout, heavy=True, check=check)
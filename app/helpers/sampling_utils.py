@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+from app import crud
+from app.config import REVISION_SAMPLING, REVISION_SAMPLING_EVERY_N, REVISION_SAMPLING_MAX_K, \
+    REVISION_SAMPLING_SELECTION
+from app.helpers.git_utils import get_commits_churn
+
+COMPETENCE_FORMATS = {
+    "monthly": "%Y-%m",
+    "weekly": "%G-W%V",
+    "every_n": "%Y-%m-%d",
+    "max_k": "%Y-%m-%d",
+}
+
+SAMPLING_PERIODS = {
+    "monthly": "month",
+    "weekly": "week",
+}
+
+def select_evenly_spaced(length, k):
+    """
+    Select k evenly spaced indexes of a sequence, including its first and last items.
+    :param length:
+    :param k:
+    :return:
+    """
+    if length <= k:
+        return list(range(length))
+
+    if k == 1:
+        return [0]
+
+    return sorted({round(i * (length - 1) / (k - 1)) for i in range(k)})
+
+def select_highest_churn(hashes, k, churn):
+    """
+    Split the history into k runs of consecutive commits and select the commit with the highest churn of each run.
+    :param hashes: commit hashes in chronological order
+    :param k:
+    :param churn: dict of commit hash to churn
+    :return: selected indexes, the earliest commit of a run when several share its highest churn
+    """
+    if k <= 0:
+        return []
+
+    if len(hashes) <= k:
+        return list(range(len(hashes)))
+
+    bounds = [round(i * len(hashes) / k) for i in range(k + 1)]
+
+    return [max(range(start, stop), key=lambda index: churn.get(hashes[index], 0))
+            for start, stop in zip(bounds, bounds[1:])]
+
+def select_revisions(db, pipeline_id, path_git, strategy=REVISION_SAMPLING,
+                     selection=REVISION_SAMPLING_SELECTION):
+    """
+    Select the revisions (base items) analysed by the time series, one per competence.
+    Strategies: monthly (first commit of each month), weekly (first commit of each ISO week),
+    every_n (one commit every REVISION_SAMPLING_EVERY_N commits) and max_k (at most REVISION_SAMPLING_MAX_K
+    commits, evenly spaced or the highest churn commit of each run, picked by selection).
+    The commits are selected by the database, only the selected ones are loaded.
+    :param db:
+    :param pipeline_id:
+    :param path_git: repository, used for the churn of the max_k strategy
+    :param strategy:
+    :param selection: "even" or "churn", revisions picked by the max_k strategy
+    :return: (competences, base) lists
+    """
+    if strategy not in COMPETENCE_FORMATS:
+        raise Exception(f"Unknown revision sampling strategy {strategy}")
+
+    if strategy in SAMPLING_PERIODS:
+        commits = crud.get_first_commits_by_period(db, pipeline_id, SAMPLING_PERIODS[strategy])
+    elif strategy == "every_n":
+        commits = crud.get_every_nth_commit_by_pipeline(db, pipeline_id, max(1, REVISION_SAMPLING_EVERY_N))
+    else:
+        if selection == "churn":
+            hashes = [commit.hash for commit in crud.stream_commit_hashes_by_pipeline(db, pipeline_id)]
+            positions = select_highest_churn(hashes, max(1, REVISION_SAMPLING_MAX_K), get_commits_churn(path_git))
+        else:
+            positions = select_evenly_spaced(crud.count_commits_by_pipeline(db, pipeline_id),
+                                             max(1, REVISION_SAMPLING_MAX_K))
+
+        commits = crud.get_commits_by_pipeline_at_positions(db, pipeline_id, positions)
+
+    competences = [commit.author_date.strftime(COMPETENCE_FORMATS[strategy]) for commit in commits]
+    base = [commit.hash for commit in commits]
+
+    return competences, base
+
+def build_revision_rows(competences, base, pipeline_id):
+    """
+    Build the competence and base item rows of the selected revisions.
+    The rows are inserted in one transaction, so created_at is set here, increasing, to keep their order.
+    :param competences:
+    :param base:
+    :param pipeline_id:
+    :return: (competences rows, base items rows)
+    """
+    start = datetime.now()
+
+    competences_data = [{"competence": competence, "pipeline_id": pipeline_id,
+                         "created_at": start + timedelta(microseconds=index)}
+                        for index, competence in enumerate(competences)]
+    base_items_data = [{"base_item": item, "pipeline_id": pipeline_id,
+                        "created_at": start + timedelta(microseconds=index)}
+                       for index, item in enumerate(base)]
+
+    return competences_data, base_items_data
@@ -1,8 +1,8 @@
-import os
+import platform
 
 def is_windows():
     """
     Check if the operating system is Windows.
     :return:
     """
-    return os.system("ver") == 0
\ No newline at end of file
+    return platform.system() == "Windows"
\ No newline at end of file
@@ -175,11 +175,10 @@ def build_non_adaptive_linguistic():
     return build_non_positive_linguistic(build_adaptive_regex(use_conventional_commits=False))
 
 def is_adaptive(text):
+    # The patterns are compiled once by the classifier, see MaintenanceClassifier.is_adaptive
+    from .maintenance_classifier import get_maintenance_classifier
 
-    return (match(text, build_adaptive_regex())
-            + match(text, build_adaptive_action_regex())
-            - match(text, build_non_adaptive_context())
-            - match(text, build_non_adaptive_linguistic()))
+    return get_maintenance_classifier().is_adaptive(text)
 
 
 
@@ -249,17 +249,10 @@ def is_core_bug(commit_text):
     return cnt > 0
 
 def is_fix(commit_text):
+    # The patterns are compiled once by the classifier, see MaintenanceClassifier.is_fix
+    from .maintenance_classifier import get_maintenance_classifier
 
-    text = commit_text.lower()
-    #text = normalize(text)
-
-    fix_num = len(re.findall(build_bug_fix_regex(), text))
-    valid_num = len(re.findall(build_valid_find_regex(), text))
-    negated_num = len(re.findall(build_negeted_bug_fix_regex(), text))
-    # TODO  consider modals
-    #negated_num = len(re.findall(build_non_positive_linguistic(build_bug_fix_regex()), text))
-    return (fix_num - valid_num - negated_num) > 0
-    #return (fix_num ) > 0 # max recall with current predictor
+    return get_maintenance_classifier().is_fix(commit_text)
 
 def corrective_to_bq():
     # TODO - the \n in the string seperator is printed as a new line and should be fixed
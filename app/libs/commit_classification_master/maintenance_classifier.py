@@ -0,0 +1,150 @@
+"""
+Compiled bundle of the corrective, adaptive, perfective and refactor linguistic models.
+
+The build_*_regex functions of the models assemble multi-kilobyte patterns from the term lists.
+Rebuilding them for every message, and having re look them up in its small internal cache,
+costs more than the matching itself, so the classifier builds and compiles every pattern once.
+The results are the same as the ones of is_fix, is_adaptive and built_is_refactor.
+"""
+import functools
+import re
+
+from .adaptive_model import build_adaptive_regex, build_adaptive_action_regex, build_non_adaptive_context\
+    , build_non_adaptive_linguistic
+from .corrective_model import build_bug_fix_regex, build_valid_find_regex, build_negeted_bug_fix_regex
+from .language_utils import build_sepereted_term, build_non_positive_linguistic
+from .refactor_model import build_refactor_regex, build_refactor_goals_regex, build_non_code_perfective_regex\
+    , build_documentation_entities_context, build_perfective_regex, removal
+
+# Bump whenever a pattern of the models changes, so stored classifications are discarded.
+MAINTENANCE_CLASSIFIER_VERSION = "1"
+
+
+class MaintenanceClassifier:
+
+    def __init__(self):
+        # Corrective
+        self.bug_fix = re.compile(build_bug_fix_regex())
+        self.valid_find = re.compile(build_valid_find_regex())
+        self.negated_bug_fix = re.compile(build_negeted_bug_fix_regex())
+
+        # Adaptive
+        self.adaptive = re.compile(build_adaptive_regex())
+        self.adaptive_action = re.compile(build_adaptive_action_regex())
+        self.non_adaptive_context = re.compile(build_non_adaptive_context())
+        self.non_adaptive_linguistic = re.compile(build_non_adaptive_linguistic())
+
+        # Refactor
+        refactor_without_cc = build_refactor_regex(use_conventional_commits=False)
+        self.refactor = re.compile(build_refactor_regex())
+        self.removal = re.compile(build_sepereted_term(removal))
+        self.refactor_goals = re.compile(build_refactor_goals_regex())
+        self.non_code_perfective = re.compile(build_non_code_perfective_regex())
+        self.documentation_refactor = re.compile(build_documentation_entities_context(refactor_without_cc))
+        self.non_positive_refactor = re.compile(build_non_positive_linguistic(refactor_without_cc))
+        self.non_positive_removal = re.compile(build_non_positive_linguistic(build_sepereted_term(removal)))
+        self.non_positive_refactor_goals = re.compile(build_non_positive_linguistic(build_refactor_goals_regex()))
+
+        # Perfective
+        self.perfective = re.compile(build_perfective_regex())
+
+    @staticmethod
+    def count(pattern, text):
+        return len(pattern.findall(text))
+
+    def is_fix(self, commit_text):
+        text = commit_text.lower()
+
+        return (self.count(self.bug_fix, text)
+                - self.count(self.valid_find, text)
+                - self.count(self.negated_bug_fix, text)) > 0
+
+    def is_adaptive(self, commit_text):
+        text = commit_text.lower()
+
+        return (self.count(self.adaptive, text)
+                + self.count(self.adaptive_action, text)
+                - self.count(self.non_adaptive_context, text)
+                - self.count(self.non_adaptive_linguistic, text))
+
+    def is_refactor(self, commit_text):
+        text = commit_text.lower()
+
+        return (self.count(self.refactor, text)
+                + self.count(self.removal, text)
+                + self.count(self.refactor_goals, text)
+                - self.count(self.non_code_perfective, text)
+                - self.count(self.documentation_refactor, text)
+                - self.count(self.non_positive_refactor, text)
+                - self.count(self.non_positive_removal, text)
+                - self.count(self.non_positive_refactor_goals, text)
+                ) > 0
+
+    def is_perfective(self, commit_text):
+        text = commit_text.lower()
+
+        return (self.count(self.perfective, text) + self.count(self.refactor, text)) > 0
+
+    def classify(self, message):
+        """
+        Classify a commit message with every model, evaluating each distinct pattern at most once.
+        The *_in_text matches are found in the message as given and the flags in its lower case version,
+        as the separate classifiers do, so the matches are shared when the message is already in lower case.
+        The negative patterns of is_fix and is_refactor only lower a count, they are skipped when the positive
+        patterns found nothing.
+        :param message:
+        :return: A dict with the fields of CommitMaintenanceActivitiesResult set by the classification.
+        """
+        text = message.lower()
+        lower_case = text == message
+
+        corrective_in_text = self.bug_fix.findall(message)
+        adaptive_in_text = self.adaptive_action.findall(message)
+        refactor_in_text = self.refactor.findall(message)
+
+        # Corrective
+        fix_num = len(corrective_in_text) if lower_case else self.count(self.bug_fix, text)
+        is_corrective = (fix_num > 0
+                         and fix_num - self.count(self.valid_find, text) - self.count(self.negated_bug_fix, text) > 0)
+
+        # Adaptive
+        is_adaptive = (self.count(self.adaptive, text)
+                       + (len(adaptive_in_text) if lower_case else self.count(self.adaptive_action, text))
+                       - self.count(self.non_adaptive_context, text)
+                       - self.count(self.non_adaptive_linguistic, text))
+
+        # Refactor
+        refactor_num = len(refactor_in_text) if lower_case else self.count(self.refactor, text)
+        positive_num = refactor_num + self.count(self.removal, text) + self.count(self.refactor_goals, text)
+        is_refactor = (positive_num > 0
+                       and (positive_num
+                            - self.count(self.non_code_perfective, text)
+                            - self.count(self.documentation_refactor, text)
+                            - self.count(self.non_positive_refactor, text)
+                            - self.count(self.non_positive_removal, text)
+                            - self.count(self.non_positive_refactor_goals, text)) > 0)
+
+        # Perfective
+        perfective_num = self.count(self.perfective, text)
+
+        return {
+            "is_corrective": is_corrective,
+            "corrective_in_text": corrective_in_text,
+            "bug_fix_regex_count": len(corrective_in_text),
+            "is_adaptive": is_adaptive,
+            "adaptive_in_text": adaptive_in_text,
+            "adaptive_regex_count": len(adaptive_in_text),
+            "is_adaptive_by_negation": is_corrective == 0 and is_refactor == 0 and perfective_num == 0,
+            "is_perfective": perfective_num + refactor_num > 0,
+            "is_refactor": is_refactor,
+            "refactor_in_text": refactor_in_text,
+            "refactor_regex_count": len(refactor_in_text),
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def get_maintenance_classifier():
+    """
+    Build the classifier once per process.
+    """
+    return MaintenanceClassifier()
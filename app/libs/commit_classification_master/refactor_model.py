@@ -344,19 +344,10 @@ def refactor_to_bq():
 
 
 def built_is_refactor(commit_text):
-    removal_re = build_sepereted_term(removal)
-
-    return (match(commit_text, build_refactor_regex())
-            + match(commit_text, removal_re)
-            + match(commit_text, build_refactor_goals_regex())
-            - match(commit_text, build_non_code_perfective_regex())
-            - match(commit_text
-                    , build_documentation_entities_context(build_refactor_regex(use_conventional_commits=False)))
-            - match(commit_text
-                    , build_non_positive_linguistic(build_refactor_regex(use_conventional_commits=False)))
-            - match(commit_text, build_non_positive_linguistic(build_sepereted_term(removal)))
-            - match(commit_text, build_non_positive_linguistic(build_refactor_goals_regex()))
-            ) > 0
+    # The patterns are compiled once by the classifier, see MaintenanceClassifier.is_refactor
+    from .maintenance_classifier import get_maintenance_classifier
+
+    return get_maintenance_classifier().is_refactor(commit_text)
 
 def build_perfective_regex():
     non_code = build_sepereted_term (prefective_entities)
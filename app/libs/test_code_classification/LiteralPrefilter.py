@@ -0,0 +1,101 @@
+'''
+    Set-based literal prefilter for the test include and keyword tokens.
+
+    Most tokens are plain literals (@Test, assertEquals, describe\( ...) or
+    contain some. Substring tests over the lowercased file bytes tell which
+    tokens can possibly match, so only their regexes run, and only on the
+    files where one of their literals occurs.
+
+    The literals are read from the parse tree of the sre parser, a private
+    module of CPython. When it cannot be imported or parses a token in an
+    unexpected way, the token gets no literal and its regex always runs.
+
+'''
+
+import re
+
+try:
+    import re._parser as sre_parse
+    from re._constants import LITERAL
+except ImportError:
+    try:
+        # Python < 3.11
+        import sre_parse
+        from sre_constants import LITERAL
+    except ImportError:
+        sre_parse = None
+        LITERAL = None
+
+def required_literals(token):
+    """
+        required_literals extracts the runs of literal characters that every
+        match of a token contains
+
+        Parameters: token - regex string
+        Return: (literals, pure) where literals is a tuple of the lowercased
+                ASCII runs as bytes (empty when the token has none) and pure
+                tells if the token is a single literal and nothing else
+    """
+    if sre_parse is None:
+        return (), False
+
+    try:
+        parsed = sre_parse.parse(token)
+
+        runs = [[]]
+        pure = True
+        for op, value in parsed:
+            # Line breaks are excluded, the regexes see the contents with normalised newlines
+            if op is LITERAL and value < 128 and chr(value) not in "\r\n":
+                runs[-1] += [value]
+            else:
+                pure = False
+                runs += [[]]
+    except Exception:
+        # re.error, or a parse tree of another shape than expected
+        return (), False
+
+    literals = tuple(bytes(run).lower() for run in runs if run)
+
+    return literals, pure and len(literals) == 1
+
+class LiteralPrefilter:
+    def __init__(self, tokens, flags=0):
+        """
+            Parameters: tokens - list of regex strings of one kind (includes
+                        or keywords) for one file extension, all valid
+                        flags - flags the regexes are compiled with
+        """
+        self.pureLiterals = []
+        self.filtered = []
+        self.unfiltered = []
+
+        for token in tokens:
+            literals, pure = required_literals(token)
+            if pure:
+                self.pureLiterals += [literals[0]]
+            elif literals:
+                self.filtered += [(literals, re.compile(token, flags))]
+            else:
+                # Nothing is known about what the token matches, its regex always runs
+                self.unfiltered += [re.compile(token, flags)]
+
+    def candidates(self, loweredContents):
+        """
+            candidates decides the vote of a file from its literals alone when
+            possible, otherwise narrows the tokens down to those that may match
+
+            Parameters: loweredContents - bytes of the file, lowercased
+            Return: 1 if a pure literal token occurs, otherwise the list of the
+                    compiled tokens that may match (empty when none can)
+        """
+        for literal in self.pureLiterals:
+            if literal in loweredContents:
+                return 1
+
+        patterns = list(self.unfiltered)
+        for literals, pattern in self.filtered:
+            if all(literal in loweredContents for literal in literals):
+                patterns += [pattern]
+
+        return patterns
@@ -0,0 +1,164 @@
+'''
+    Precompiled matcher answering both the test include
+    and the test keyword votes of a file, running only the
+    tokens left by the literal prefilter (or, without it,
+    all tokens in a single scan).
+
+'''
+
+import re
+
+from app.libs.test_code_classification.LiteralPrefilter import LiteralPrefilter
+from app.logger_config import logger
+
+FLAGS = re.IGNORECASE | re.MULTILINE
+
+def valid_tokens(tokens, fileExtension):
+    """
+        valid_tokens drops (and logs) the tokens that do not compile
+
+        Parameters: tokens - list of regex strings
+                    fileExtension - extension the tokens belong to
+        Return: A list of the tokens that compile
+    """
+    validTokens = []
+    for token in tokens:
+        try:
+            re.compile(token, FLAGS)
+        except re.error as e:
+            logger.warning(f"Skipping invalid test token {token!r} for .{fileExtension}: {e}")
+            continue
+
+        validTokens += [token]
+
+    return validTokens
+
+def alternation(tokens):
+    """
+        alternation joins tokens into one regex string, each in a non-capturing group
+
+        Parameters: tokens - list of regex strings
+        Return: The alternation string
+    """
+    return "|".join("(?:" + token + ")" for token in tokens)
+
+def normalise_contents(fileContents):
+    """
+        normalise_contents decodes file bytes the way the regexes expect them
+
+        Parameters: fileContents - bytes of the file
+        Return: The contents as a string with universal newlines
+    """
+    # Each step drops the previous string, at most two copies are held at once
+    fileContents = fileContents.decode("latin-1")
+    if "\r" in fileContents:
+        fileContents = fileContents.replace("\r\n", "\n")
+        fileContents = fileContents.replace("\r", "\n")
+
+    return fileContents
+
+class TestFrameworkMatcher:
+    def __init__(self, testLookup, keywordLookup, usePrefilter=True):
+        """
+            Parameters: testLookup - dictionary that stores the test framework
+                        reference by file extension (tech_lookup_generator)
+                        keywordLookup - dictionary that stores the keywords
+                        by file extension (lookup_generator)
+                        usePrefilter - decide from the literals of the tokens
+                        before running any regex
+        """
+        self.usePrefilter = usePrefilter
+        self.patterns = {}
+
+        for fileExtension in set(testLookup) | set(keywordLookup):
+            includes = valid_tokens([token.tokenString for token in testLookup.get(fileExtension, [])],
+                                    fileExtension)
+            keywords = valid_tokens(keywordLookup.get(fileExtension, []), fileExtension)
+
+            alternatives = []
+            if includes:
+                alternatives += ["(?P<include>" + alternation(includes) + ")"]
+            if keywords:
+                alternatives += ["(?P<keyword>" + alternation(keywords) + ")"]
+
+            self.patterns[fileExtension] = (
+                re.compile("|".join(alternatives), FLAGS) if alternatives else None,
+                re.compile(alternation(includes), FLAGS) if includes else None,
+                re.compile(alternation(keywords), FLAGS) if keywords else None,
+                LiteralPrefilter(includes, FLAGS),
+                LiteralPrefilter(keywords, FLAGS),
+            )
+
+    def votes(self, fileExtension, fileContents):
+        """
+            votes determines if a file references a testing framework
+            and if it contains a testing keyword
+
+            Parameters: fileExtension - extension of the file
+                        fileContents - bytes of the file
+            Return: (include vote, keyword vote), each 0 or 1
+        """
+        if fileExtension not in self.patterns:
+            return 0, 0
+
+        combinedPattern, includePattern, keywordPattern, includePrefilter, keywordPrefilter = \
+            self.patterns[fileExtension]
+        if combinedPattern is None:
+            return 0, 0
+
+        if self.usePrefilter:
+            return self.prefiltered_votes(includePrefilter, keywordPrefilter, fileContents)
+
+        fileContents = normalise_contents(fileContents)
+
+        include = 0
+        keyword = 0
+        for match in combinedPattern.finditer(fileContents):
+            if match.lastgroup == "include":
+                include = 1
+            else:
+                keyword = 1
+
+            if include and keyword:
+                return 1, 1
+
+        # A match of one kind may hide an overlapping match of the other, look for it on its own
+        if include and keywordPattern is not None and keywordPattern.search(fileContents):
+            keyword = 1
+        elif keyword and includePattern is not None and includePattern.search(fileContents):
+            include = 1
+
+        return include, keyword
+
+    def prefiltered_votes(self, includePrefilter, keywordPrefilter, fileContents):
+        """
+            prefiltered_votes determines both votes running only the tokens
+            whose literals occur in the file
+
+            The lowered copy of the file is released before the file is
+            decoded, so at most two copies of the file are held at once
+            besides the bytes (one when the file has no carriage return).
+
+            Parameters: includePrefilter - LiteralPrefilter of the includes
+                        keywordPrefilter - LiteralPrefilter of the keywords
+                        fileContents - bytes of the file
+            Return: (include vote, keyword vote), each 0 or 1
+        """
+        loweredContents = fileContents.lower()
+        allCandidates = [prefilter.candidates(loweredContents) for prefilter in (includePrefilter, keywordPrefilter)]
+        del loweredContents
+
+        decodedContents = None
+
+        votes = []
+        for candidates in allCandidates:
+            if candidates == 1:
+                votes += [1]
+                continue
+
+            if candidates and decodedContents is None:
+                decodedContents = normalise_contents(fileContents)
+
+            votes += [1 if any(pattern.search(decodedContents) for pattern in candidates) else 0]
+
+        return tuple(votes)
@@ -0,0 +1,88 @@
+'''
+    Benchmark of the literal prefilter of TestFrameworkMatcher.
+
+    Usage: python -m app.libs.test_code_classification.benchmark <source tree> [repeats]
+
+    Classifies every file of the tree whose extension has tokens, with and
+    without the prefilter, checks that both give the same votes and reports
+    the time taken by each.
+
+'''
+
+import os
+import sys
+import time
+
+from app.libs.test_code_classification.TestFrameworkMatcher import TestFrameworkMatcher
+from app.libs.test_code_classification.utilities import lookup_generator, tech_lookup_generator
+
+LOOKUP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_files(root, extensions):
+    """
+        load_files reads the files of a source tree
+
+        Parameters: root - path of the source tree
+                    extensions - extensions to keep
+        Return: A list of (extension, bytes) tuples
+    """
+    files = []
+    for directory, _, names in os.walk(root):
+        for name in names:
+            fileExtension = name.rpartition(".")[-1]
+            path = os.path.join(directory, name)
+            if fileExtension in extensions and os.path.isfile(path):
+                with open(path, "rb") as file:
+                    files += [(fileExtension, file.read())]
+
+    return files
+
+def time_votes(matcher, files, repeats):
+    """
+        time_votes classifies all files with a matcher
+
+        Parameters: matcher - TestFrameworkMatcher
+                    files - list of (extension, bytes) tuples
+                    repeats - number of passes over the files
+        Return: (best time of a pass in seconds, list of votes)
+    """
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        votes = [matcher.votes(fileExtension, contents) for fileExtension, contents in files]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, votes
+
+def main(root, repeats=3):
+    keywordLookup = lookup_generator(os.path.join(LOOKUP_DIR, "keywords.txt"))
+    testLookup = tech_lookup_generator(os.path.join(LOOKUP_DIR, "testingTechnologiesFixed3.csv"))
+
+    files = load_files(root, set(testLookup) | set(keywordLookup))
+    size = sum(len(contents) for _, contents in files)
+    print(f"{len(files)} files, {size / 1024 / 1024:.1f} MiB")
+
+    regexTime, regexVotes = time_votes(TestFrameworkMatcher(testLookup, keywordLookup, usePrefilter=False),
+                                       files, repeats)
+    prefilterTime, prefilterVotes = time_votes(TestFrameworkMatcher(testLookup, keywordLookup), files, repeats)
+
+    if regexVotes != prefilterVotes:
+        mismatches = sum(1 for a, b in zip(regexVotes, prefilterVotes) if a != b)
+        print(f"Votes differ on {mismatches} files")
+        return 1
+
+    testFiles = sum(1 for include, keyword in prefilterVotes if include and keyword)
+    print(f"{testFiles} test files")
+    print(f"regex only: {regexTime:.3f}s")
+    print(f"prefilter:  {prefilterTime:.3f}s")
+    print(f"speed-up:   {regexTime / prefilterTime:.1f}x")
+
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(2)
+
+    sys.exit(main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 3))
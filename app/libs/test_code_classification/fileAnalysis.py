@@ -1,5 +1,8 @@
 import re
 
+# Bump whenever TestFrameworkMatcher, test_include/test_keyword or the lookup files change, so cached votes are discarded.
+CLASSIFIER_VERSION = "2"
+
 # def directoryVote(pattern, file):
 #     """
 #         directoryVote determines if a file is located in a 'test' directory
@@ -45,8 +48,8 @@ def test_include(testLookup, fileExtension, fileContents):
     includeList = testLookup[fileExtension]
     for includeToken in includeList:
         #print(includeToken.tokenString)
-        includePattern = re.compile(includeToken.tokenString)
-        match = includePattern.search(fileContents, re.IGNORECASE|re.MULTILINE)
+        includePattern = re.compile(includeToken.tokenString, re.IGNORECASE|re.MULTILINE)
+        match = includePattern.search(fileContents)
         
         if(match):
             #print("match: " + str(includeToken.framework))
@@ -68,8 +71,8 @@ def test_keyword(keywordLookup, fileExtension, fileContents):
         keywordList = keywordLookup[fileExtension]
 
         for keyword in keywordList:
-            keywordPattern = re.compile(keyword)
-            match = keywordPattern.search(fileContents, re.IGNORECASE|re.MULTILINE)
+            keywordPattern = re.compile(keyword, re.IGNORECASE|re.MULTILINE)
+            match = keywordPattern.search(fileContents)
             if(match):
                 return 1
             
@@ -92,8 +95,8 @@ def findTestTechs(techLookup, fileExtension, fileContents):
     for testToken in techList:
         #print(testToken.tokenString)
         
-        techPattern = re.compile(testToken.tokenString)
-        match = techPattern.search(fileContents, re.IGNORECASE|re.MULTILINE)
+        techPattern = re.compile(testToken.tokenString, re.IGNORECASE|re.MULTILINE)
+        match = techPattern.search(fileContents)
         
         #print(testToken.tokenString, fileContents)
         
@@ -119,8 +122,8 @@ def findKeywordTechs(keywordLookup, fileExtension, fileContents):
         
 
         for keyword in keywordList:
-            keywordPattern = re.compile(keyword)
-            match = keywordPattern.search(fileContents, re.IGNORECASE|re.MULTILINE)
+            keywordPattern = re.compile(keyword, re.IGNORECASE|re.MULTILINE)
+            match = keywordPattern.search(fileContents)
             if(match):
                 matchedKeywords += [keyword]
             
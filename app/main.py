@@ -11,7 +11,7 @@ from .helpers.import_dataset_utils import generate_metrics, save_commits, save_c
 from .routers.dashboards import general
 from .database import engine
 from .routers.auths import auth, permissions
-from .routers.cruds import repository, additional_data, pipeline, user, term
+from .routers.cruds import repository, additional_data, commit_filter, pipeline, user, term
 from .routers.community import community_repository
 from .tasks import clone, extract_commits, generate_time_series, calculate_metrics, co_evolution_analysis
 from fastapi.middleware.cors import CORSMiddleware
@@ -47,6 +47,7 @@ app.include_router(community_repository.router)
 app.include_router(auth.router)
 app.include_router(repository.router)
 app.include_router(additional_data.router)
+app.include_router(commit_filter.router)
 app.include_router(pipeline.router)
 app.include_router(term.router)
 app.include_router(user.router)
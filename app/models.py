@@ -201,3 +201,28 @@ class Insights(Base):
     generated_text = Column(Text, nullable=False)
     pipeline_id = Column(UUID(as_uuid=True), ForeignKey("pipeline.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+
+class PipelineStatistics(Base):
+    __tablename__ = "pipeline_statistics"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    stage = Column(Enum(StageEnum), nullable=False)
+    statistics = Column(JSON, nullable=False)
+    pipeline_id = Column(UUID(as_uuid=True), ForeignKey("pipeline.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+
+class CommitFilter(Base):
+    __tablename__ = "commit_filters"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    repository = Column(UUID(as_uuid=True), ForeignKey("repository.id"), nullable=False, unique=True)
+    skip_merges = Column(Boolean, nullable=False, default=False)
+    author_deny_regex = Column(String, nullable=True)
+    message_deny_regex = Column(String, nullable=True)
+    since = Column(DateTime, nullable=True)
+    until = Column(DateTime, nullable=True)
+    max_commits = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=True, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    repository_relation = relationship("Repository")
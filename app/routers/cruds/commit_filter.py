@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app import schemas, crud
+from app.database import get_db
+from app.helpers.commit_filter_utils import get_invalid_regex
+from app.helpers.user_utils import get_username_from_token
+from app.security import get_token, can_create, can_edit, can_delete
+
+router = APIRouter(
+    prefix="/crud/commit_filter",
+    tags=["commit_filter"],
+    responses={404: {"description": "CommitFilter not found"}},
+)
+
+@router.post("/", response_model=schemas.CommitFilter)
+def create_commit_filter(
+    commit_filter: schemas.CommitFilterCreate, db: Session = Depends(get_db), token: str = Depends(get_token)
+):
+    username = get_username_from_token(token)
+    db_repository = crud.get_repository_by_id(db, repository_id=str(commit_filter.repository))
+    if db_repository is None:
+        raise HTTPException(status_code=404, detail="Repository not found")
+
+    if not can_create(db_repository, username):
+        raise HTTPException(status_code=403, detail="Not authorized to create this commit filter")
+
+    if crud.get_commit_filter_by_repository(db, repository_id=str(commit_filter.repository)) is not None:
+        raise HTTPException(status_code=400, detail="Repository already has a commit filter")
+
+    invalid_regex = get_invalid_regex(commit_filter)
+    if invalid_regex is not None:
+        raise HTTPException(status_code=400, detail=f"Invalid regex {invalid_regex}")
+
+    return crud.create_commit_filter(db=db, commit_filter=commit_filter)
+
+@router.get("/{commit_filter_id}", response_model=schemas.CommitFilter)
+def read_commit_filter_by_id(commit_filter_id: str, db: Session = Depends(get_db)):
+    db_commit_filter = crud.get_commit_filter_by_id(db, commit_filter_id=commit_filter_id)
+    if db_commit_filter is None:
+        raise HTTPException(status_code=404, detail="CommitFilter not found")
+    return db_commit_filter
+
+@router.get("/repository/{repository_id}", response_model=schemas.CommitFilter)
+def read_commit_filter_by_repository(repository_id: str, db: Session = Depends(get_db)):
+    db_commit_filter = crud.get_commit_filter_by_repository(db, repository_id=repository_id)
+    if db_commit_filter is None:
+        raise HTTPException(status_code=404, detail="CommitFilter not found")
+    return db_commit_filter
+
+@router.put("/{commit_filter_id}", response_model=schemas.CommitFilter)
+def update_commit_filter(
+    commit_filter_id: str, commit_filter: schemas.CommitFilterUpdate, db: Session = Depends(get_db), token: str = Depends(get_token)
+):
+    username = get_username_from_token(token)
+    db_repository = crud.get_repository_by_id_and_username(db, repository_id=str(commit_filter.repository), username=username)
+    if db_repository is None:
+        raise HTTPException(status_code=404, detail="Repository not found")
+
+    if not can_edit(db_repository, username):
+        raise HTTPException(status_code=403, detail="Not authorized to update this commit filter")
+
+    db_commit_filter = crud.get_commit_filter_by_id(db, commit_filter_id=commit_filter_id)
+    if db_commit_filter is None or db_commit_filter.repository != db_repository.id:
+        raise HTTPException(status_code=404, detail="CommitFilter not found")
+
+    invalid_regex = get_invalid_regex(commit_filter)
+    if invalid_regex is not None:
+        raise HTTPException(status_code=400, detail=f"Invalid regex {invalid_regex}")
+
+    return crud.update_commit_filter(db=db, commit_filter_id=commit_filter_id, commit_filter=commit_filter)
+
+@router.delete("/{commit_filter_id}")
+def delete_commit_filter(commit_filter_id: str, db: Session = Depends(get_db), token: str = Depends(get_token)):
+    username = get_username_from_token(token)
+
+    db_commit_filter = crud.get_commit_filter_by_id(db, commit_filter_id=commit_filter_id)
+    if db_commit_filter is None:
+        raise HTTPException(status_code=404, detail="CommitFilter not found")
+
+    db_repository = crud.get_repository_by_id_and_username(db, repository_id=db_commit_filter.repository, username=username)
+    if db_repository is None:
+        raise HTTPException(status_code=404, detail="Repository not found")
+
+    if not can_delete(db_repository, username):
+        raise HTTPException(status_code=403, detail="Not authorized to delete this commit filter")
+
+    crud.delete_commit_filter(db=db, commit_filter_id=commit_filter_id)
+    return {}
@@ -54,6 +54,29 @@ class AdditionalData(AdditionalDataBase):
     class Config:
         from_attributes = True
 
+class CommitFilterBase(BaseModel):
+    repository: UUID
+    skip_merges: bool = False
+    author_deny_regex: Optional[str] = None
+    message_deny_regex: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    max_commits: Optional[int] = None
+
+class CommitFilterCreate(CommitFilterBase):
+    pass
+
+class CommitFilterUpdate(CommitFilterBase):
+    pass
+
+class CommitFilter(CommitFilterBase):
+    id: UUID
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 class PipelineBase(BaseModel):
     repository: UUID
     stage: Optional[StageEnum] = None
@@ -2,15 +2,17 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from .. import schemas, crud
+from ..config import COMMIT_MESSAGE_INSERT_BATCH_SIZE
 from ..crud import get_commits_by_pipeline
 from ..database import get_db
 from ..dtos.commit_maintenance_activities_result import CommitMaintenanceActivitiesResult
 from ..dtos.my_project_result import MyProjectResult
 from ..enums import StatusEnum
 from ..helpers.calculate_metrics_utils import (
-    get_project_dimension_repo, corrective_classifier, adaptive_classifier,
-    adaptive_by_negation_classifier, perfective_classifier, refactor_classifier, get_maintenance_activities_repo
+    get_project_dimension_repo, classify_commit_message, classify_many, build_commit_message_rows,
+    get_maintenance_activities_repo
 )
+from ..helpers.blob_store_utils import open_message_store
 from ..helpers.http_utils import start_process_safe
 from ..schemas import StageEnum
 from ..celery_config import celery_app
@@ -117,23 +119,23 @@ def commit_classification_task(pipeline_id: str):
         commit_messages = {}
 
         for commit in commits:
-            message = commit.message.replace('\n', ' ')
+            message = commit.message.replace('\n', ' ').lower()
             commit_messages[commit.hash] = CommitMaintenanceActivitiesResult()
             commit_messages[commit.hash].hash = commit.hash
             commit_messages[commit.hash].message = message
 
-        for commit_message_key in commit_messages:
-            commit_message_item = commit_messages[commit_message_key]
-            commit_message_item.message = commit_message_item.message.lower()
-            commit_message_item = corrective_classifier(commit_message_item)
-            commit_message_item = adaptive_classifier(commit_message_item)
-            commit_message_item = adaptive_by_negation_classifier(commit_message_item)
-            commit_message_item = perfective_classifier(commit_message_item)
-            commit_message_item = refactor_classifier(commit_message_item)
+        store = open_message_store()
+        try:
+            classifications = classify_many([item.message for item in commit_messages.values()], store=store)
+        finally:
+            if store is not None:
+                store.close()
 
-            commit_message_item.pipeline_id = pipeline_id
+        for commit_message_item, classification in zip(commit_messages.values(), classifications):
+            classify_commit_message(commit_message_item, classification)
 
-            crud.create_commit_message_item(db, commit_message_item.to_dict())
+        crud.create_all_commit_message_items(db, build_commit_message_rows(commit_messages.values(), pipeline_id),
+                                             COMMIT_MESSAGE_INSERT_BATCH_SIZE)
 
         maintenance_activities_task.delay(pipeline_id)
 
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from .. import schemas, crud
 from ..database import get_db
 from ..enums import StatusEnum
+from ..helpers.clone_utils import clone_repository
 from ..helpers.file_utils import create_default_diretories, is_empty
 from ..helpers.http_utils import start_process_safe
 from ..schemas import StageEnum
@@ -49,7 +50,8 @@ def clone_task(pipeline_id: str):
         BASE_LOG_PROJECT_DIMENSION,
         BASE_LOG_MAINTENANCE_ACTIVITIES,
         BASE_SUMMARY_MAINTENANCE_ACTIVITIES,
-        BASE_LOG_CO_EVOLUTION
+        BASE_LOG_CO_EVOLUTION,
+        BASE_MIRRORS
     ])
 
     logger.info(f"{datetime.now()} : BEGIN clone_task pipeline_id {pipeline_id}")
@@ -78,8 +80,7 @@ def clone_task(pipeline_id: str):
         path_project = BASE_PROJECTS + "/" + str(pipeline_id) + "/" + fullname
         logger.info(f"Cloning in {path_project}")
 
-        command = f"git clone --branch {db_repository.default_branch} {cloneurl} {path_project}"
-        os.system(command)
+        clone_repository(cloneurl, db_repository.default_branch, path_project)
 
         if is_empty(path_project):
             raise Exception(f"{path_project} is empty")
@@ -1,14 +1,16 @@
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from pydriller import Repository
 from .. import schemas, crud
 from ..constants import *
-from ..crud import get_commits_by_pipeline
 from ..database import get_db
 from ..dtos.my_project_result import MyProjectResult
 from ..enums import StatusEnum
+from ..config import REVISION_SAMPLING, REVISION_SAMPLING_SELECTION
+from ..helpers.extract_commits_utils import extract_pipeline_commits
+from ..helpers.git_utils import is_partial_clone
 from ..helpers.http_utils import start_process_safe
+from ..helpers.sampling_utils import select_revisions, build_revision_rows
 from ..schemas import StageEnum
 from ..celery_config import celery_app
 from ..logger_config import *
@@ -63,17 +65,13 @@ def extract_history_task(pipeline_id: str):
         if not os.path.exists(path_git):
             raise Exception(f"Path {path_git} does not exist")
 
-        for commit in Repository(path_git).traverse_commits():
-            db_commit = {
-                "hash": commit.hash,
-                "author_name": commit.author.name,
-                "committer_name": commit.committer.name,
-                "author_date": commit.author_date.strftime('%Y-%m-%d %H:%M:%S'),
-                "message": commit.msg,
-                "pipeline_id": pipeline_id
-            }
+        statistics = extract_pipeline_commits(db, pipeline_id, db_repository.id, path_git)
 
-            crud.create_commit(db, db_commit)
+        crud.create_pipeline_statistics(db, {
+            "pipeline_id": pipeline_id,
+            "stage": StageEnum.EXTRACT_COMMITS,
+            "statistics": statistics
+        })
 
         logger.info(f"{datetime.now()} : END extract_history_task pipeline_id {pipeline_id}")
 
@@ -110,38 +108,37 @@ def extract_revisions_task(pipeline_id: str):
 
         project_result = MyProjectResult(db_additional_data, pipeline_id)
 
-        commits = get_commits_by_pipeline(db, pipeline_id)
+        commit_count = crud.count_commits_by_pipeline(db, pipeline_id)
 
-        if not commits:
+        if not commit_count:
             logger.error(f"{datetime.now()} : No commits found for pipeline_id {pipeline_id}")
             raise Exception(f"No commits found for pipeline_id {pipeline_id}")
 
-        base = []
-        competences = []
+        path_git = os.path.join(BASE_PROJECTS, str(pipeline_id), project_result.base_git)
 
-        for commit in commits:
-            if commit.message is not None :
-                competence = commit.author_date.strftime('%Y-%m')
-                if competence not in competences:
-                    competences.append(competence)
-                    base.append(commit.hash)
+        # The churn of every commit needs its blobs, which a partial clone would fetch one at a time
+        selection = REVISION_SAMPLING_SELECTION
+        if selection == "churn" and is_partial_clone(path_git):
+            logger.warning(f"{datetime.now()} : Repository of pipeline_id {pipeline_id} is a partial clone, "
+                           f"selecting evenly spaced revisions instead of the highest churn ones")
+            selection = "even"
+
+        competences, base = select_revisions(db, pipeline_id, path_git, selection=selection)
+
+        crud.create_pipeline_statistics(db, {
+            "pipeline_id": pipeline_id,
+            "stage": StageEnum.EXTRACT_COMMITS,
+            "statistics": {
+                "revision_sampling": REVISION_SAMPLING,
+                "commits": commit_count,
+                "revisions": len(base)
+            }
+        })
 
         if base:
-            for competence in competences:
-                db_competence = {
-                    "competence": competence,
-                    "pipeline_id": pipeline_id
-                }
-
-                crud.create_competence(db, db_competence)
-
-            for item in base:
-                db_base = {
-                    "base_item": item,
-                    "pipeline_id": pipeline_id
-                }
+            competences_data, base_items_data = build_revision_rows(competences, base, pipeline_id)
 
-                crud.create_base_item(db, db_base)
+            crud.create_all_competences_and_base_items(db, competences_data, base_items_data)
 
         else:
             logger.error(f"{datetime.now()} : extract_revisions_task pipeline_id {pipeline_id} failed. No data found.")
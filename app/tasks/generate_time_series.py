@@ -2,16 +2,16 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from .. import schemas, crud
+from ..config import (LOC_COUNTER, GENERATE_TIMESERIES_WORKERS, MAX_CLASSIFIED_FILE_SIZE, OVERSIZED_FILE_POLICY,
+                      PATH_DENY_LIST, PATH_FILTER_RULES)
 from ..constants import *
 from ..database import get_db
 from ..dtos.my_project_result import MyProjectResult
-from app.libs.test_code_classification.fileAnalysis import test_include, test_keyword
-from app.libs.test_code_classification.utilities import lookup_generator, tech_lookup_generator
 from ..enums import StatusEnum
 from ..helpers.file_utils import clean_create_dir
-from ..helpers.generate_timeseries_utils import process_cloc_history, cloc_series
+from ..helpers.generate_timeseries_utils import cloc_series, process_revisions, process_revisions_parallel
+from ..helpers.git_utils import prefetch_objects
 from ..helpers.http_utils import start_process_safe
-from ..helpers.system_utils import is_windows
 from ..schemas import StageEnum
 from ..celery_config import celery_app
 from ..logger_config import *
@@ -43,9 +43,6 @@ async def generate_timeseries(process: schemas.ProcessBase, db: Session = Depend
 def generate_timeseries_task(pipeline_id: str):
     logger.info(f"{datetime.now()} : BEGIN generate_timeseries_task pipeline_id {pipeline_id}")
 
-    keyword_lookup = lookup_generator(os.path.join(TEST_CODE_CLASSIFICATION_DIR, "keywords.txt"))
-    tech_lookup = tech_lookup_generator(os.path.join(TEST_CODE_CLASSIFICATION_DIR, "testingTechnologiesFixed3.csv"))
-
     calculate_loc = True
 
     db = next(get_db())
@@ -71,81 +68,57 @@ def generate_timeseries_task(pipeline_id: str):
         if not commit_history:
             return False
 
-        commit_order = 0
+        revisions = [(commit_order, commit_hash) for commit_order, commit_hash in enumerate(commit_history)
+                     if commit_hash != ""]
 
         clean_create_dir(os.path.join(BASE_LOG_TEST_FILE, str(project_result.id)))
 
-        if calculate_loc:
+        if calculate_loc and LOC_COUNTER == "cloc":
             clean_create_dir(os.path.join(BASE_LOG_LOC, str(project_result.id)))
 
-        for commit_hash in commit_history:
-            if commit_hash == "":
-                commit_order += 1
-                continue
-
-            tests_data = []
-
-            base_git_path = os.path.join(BASE_PROJECTS, str(pipeline_id), project_result.base_git)
-
-            if is_windows():
-                command = f"cd {base_git_path} && git checkout -f {commit_hash} && git stash --all"
-            else:
-                command = f"cd {base_git_path} && git checkout -f {commit_hash} && git stash --all && chmod -R 777 {base_git_path}"
-
-            os.system(command)
-
-            test_path_log = os.path.join(BASE_LOG_TEST_FILE, str(project_result.id), str(commit_order))
-
-            if calculate_loc:
-                loc_path_log = os.path.join(BASE_LOG_LOC, str(project_result.id), str(commit_order))
-
-            clean_create_dir(test_path_log)
-            if calculate_loc:
-                clean_create_dir(loc_path_log)
-
-            for path_item, _, files_git_path in os.walk(base_git_path):
-                for file_git_path in files_git_path:
-                    try:
-                        file_extension = file_git_path.rpartition(".")[-1]
-                        if file_extension in FILE_EXTENSION_ACCEPTED:
-
-                            file_contents = ""
-                            file = os.path.join(base_git_path, path_item, file_git_path)
-
-                            with open(file, "r", encoding="latin-1") as opened_file:
-                                for line in opened_file:
-                                    file_contents += line + "\n"
-
-                            file_contents += " " + file_contents
-
-                            has_test_import = test_include(tech_lookup, file_extension, file_contents)
-                            has_test_call = test_keyword(keyword_lookup, file_extension, file_contents)
-
-                            is_test_file = 0
-                            if has_test_import + has_test_call == 2:
-                                is_test_file = 1
-
-                            db_test_data = {
-                                "file_path": file,
-                                "is_test_file": is_test_file,
-                                "has_test_import": has_test_import,
-                                "has_test_call": has_test_call,
-                                "pipeline_id": pipeline_id,
-                                "commit_order": commit_order
-                            }
-
-                            tests_data.append(db_test_data)
-
-                    except Exception as e:
-                        logger.error(f"Error processing file {file_git_path}: {e}")
-                        continue
-
-            crud.create_all_test_data(db, tests_data)
-
-            if calculate_loc:
-                process_cloc_history(base_git_path, loc_path_log)
-
-            commit_order += 1
+        base_git_path = os.path.join(BASE_PROJECTS, str(pipeline_id), project_result.base_git)
+
+        prefetched_objects = prefetch_objects(base_git_path, [commit_hash for _, commit_hash in revisions])
+
+        if GENERATE_TIMESERIES_WORKERS > 1:
+            results = process_revisions_parallel(base_git_path, pipeline_id, revisions, calculate_loc,
+                                                 GENERATE_TIMESERIES_WORKERS)
+        else:
+            results = process_revisions(base_git_path, pipeline_id, revisions, calculate_loc)
+
+        oversized_files = 0
+        oversized_blobs = set()
+        blob_store_hits = 0
+        excluded_files = {}
+
+        for result in results:
+            crud.create_all_test_data(db, result["tests_data"])
+
+            if calculate_loc and LOC_COUNTER == "builtin":
+                crud.create_all_code_distribution_details(db, result["details_data"])
+
+            oversized_files += len(result["oversized_blobs"])
+            oversized_blobs.update(result["oversized_blobs"])
+            blob_store_hits += result["blob_store_hits"]
+
+            for reason, count in result["excluded_files"].items():
+                excluded_files[reason] = excluded_files.get(reason, 0) + count
+
+        crud.create_pipeline_statistics(db, {
+            "pipeline_id": pipeline_id,
+            "stage": StageEnum.GENERATE_TIME_SERIES,
+            "statistics": {
+                "max_classified_file_size": MAX_CLASSIFIED_FILE_SIZE,
+                "oversized_file_policy": OVERSIZED_FILE_POLICY,
+                "oversized_files": oversized_files,
+                "oversized_blobs": len(oversized_blobs),
+                "blob_store_hits": blob_store_hits,
+                "prefetched_objects": prefetched_objects,
+                "path_deny_list": PATH_DENY_LIST,
+                "path_filter_rules": PATH_FILTER_RULES,
+                "excluded_files": excluded_files
+            }
+        })
 
         logger.info(f"{datetime.now()} : END generate_timeseries_task pipeline_id {pipeline_id}")
 
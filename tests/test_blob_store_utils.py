@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from app.helpers import blob_store_utils
+from app.helpers.blob_store_utils import *
+
+class TestBlobStoreUtils(unittest.TestCase):
+
+    def setUp(self):
+        self.base = tempfile.mkdtemp()
+        self.path = os.path.join(self.base, "store", "blobs.sqlite3")
+
+    def tearDown(self):
+        shutil.rmtree(self.base, ignore_errors=True)
+
+    def test_put_get_before_and_after_flush(self):
+        value = {"votes": [1, 0], "path": "café.py"}
+
+        with BlobStore(self.path, 10) as store:
+            store.put("test/1/py/abc", value)
+            self.assertEqual(store.get("test/1/py/abc"), value)
+
+            store.flush()
+            self.assertEqual(store.pending, {})
+            self.assertEqual(store.get("test/1/py/abc"), value)
+            self.assertIsNone(store.get("test/1/py/missing"))
+            self.assertEqual((store.hits, store.misses), (1, 1))
+
+    def test_results_persist_across_sessions(self):
+        with BlobStore(self.path, 10) as store:
+            store.put("loc/1/py/abc", 42)
+
+        with BlobStore(self.path, 10) as store:
+            self.assertEqual(store.get("loc/1/py/abc"), 42)
+
+    def test_get_many_above_lookup_batch_size(self):
+        keys = [f"loc/1/py/{number}" for number in range(LOOKUP_BATCH_SIZE * 2 + 10)]
+
+        with BlobStore(self.path, len(keys)) as store:
+            for number, key in enumerate(keys[:-5]):
+                store.put(key, number)
+            store.flush()
+            store.put(keys[-5], "pending")
+
+            found = store.get_many(keys + keys[:3])
+
+        self.assertEqual(len(found), len(keys) - 4)
+        self.assertEqual(found[keys[0]], 0)
+        self.assertEqual(found[keys[-6]], len(keys) - 6)
+        self.assertEqual(found[keys[-5]], "pending")
+        self.assertNotIn(keys[-1], found)
+        self.assertEqual((store.hits, store.misses), (len(keys) - 5, 4))
+
+    def test_evict_keeps_most_recently_used(self):
+        store = BlobStore(self.path, 2)
+        store.open()
+
+        with patch.object(blob_store_utils.time, "time", return_value=1000):
+            for key in ("a", "b", "c"):
+                store.put(key, key)
+            store.flush()
+
+        with patch.object(blob_store_utils.time, "time", return_value=2000):
+            store.get("a")
+            store.get_many(["c"])
+            store.flush()
+
+        store.evict()
+
+        self.assertIsNone(store.get("b"))
+        self.assertEqual(store.get_many(["a", "c"]), {"a": "a", "c": "c"})
+        store.close()
+
+    def test_close_flushes_and_evicts(self):
+        with BlobStore(self.path, 1) as store:
+            with patch.object(blob_store_utils.time, "time", return_value=1000):
+                store.put("old", 1)
+                store.flush()
+
+            store.put("new", 2)
+
+        with BlobStore(self.path, 1) as store:
+            self.assertEqual(store.get_many(["old", "new"]), {"new": 2})
+
+    def test_open_store_disabled(self):
+        self.assertIsNone(open_store("blobs.sqlite3", 0))
+
+    def test_open_store(self):
+        with patch.object(blob_store_utils, "BASE_BLOB_STORE", os.path.join(self.base, "store")):
+            store = open_store("blobs.sqlite3", 10)
+
+        self.assertEqual(store.path, self.path)
+        self.assertIsNotNone(store.connection)
+        store.close()
+        self.assertIsNone(store.connection)
+
+    def test_build_keys(self):
+        self.assertEqual(build_blob_key("test", "abc", "py", 2), "test/2/py/abc")
+        self.assertNotEqual(build_message_key("maintenance", "fix bug", 1),
+                            build_message_key("maintenance", "fix bugs", 1))
+        self.assertTrue(build_message_key("maintenance", "\ud800", 1).startswith("maintenance/1/"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import re
+import unittest
+from app.dtos.commit_maintenance_activities_result import CommitMaintenanceActivitiesResult
+from app.helpers.calculate_metrics_utils import *
+from app.libs.commit_classification_master.adaptive_model import build_adaptive_action_regex
+from app.libs.commit_classification_master.corrective_model import build_bug_fix_regex
+from app.libs.commit_classification_master.maintenance_classifier import get_maintenance_classifier
+from app.libs.commit_classification_master.refactor_model import build_perfective_regex, build_refactor_regex
+from tests.test_maintenance_classifier import load_messages, baseline_is_fix, baseline_is_adaptive, \
+    baseline_is_refactor, baseline_is_perfective, count
+
+FIELDS = ["is_corrective", "corrective_in_text", "bug_fix_regex_count", "is_adaptive", "adaptive_in_text",
+          "adaptive_regex_count", "is_adaptive_by_negation", "is_perfective", "is_refactor", "refactor_in_text",
+          "refactor_regex_count"]
+
+def build_commit_message(message):
+    commit_message = CommitMaintenanceActivitiesResult()
+    commit_message.message = message
+
+    return commit_message
+
+def classify_separately(message):
+    """
+    Classify a message with the five classifiers, one after the other.
+    """
+    commit_message = build_commit_message(message)
+
+    for classifier in (corrective_classifier, adaptive_classifier, adaptive_by_negation_classifier,
+                       perfective_classifier, refactor_classifier):
+        classifier(commit_message)
+
+    return {field: getattr(commit_message, field) for field in FIELDS}
+
+def classify_baseline(message):
+    """
+    Classify a message as the five classifiers did, rebuilding every pattern from the build_* functions.
+    """
+    corrective_in_text = re.findall(build_bug_fix_regex(), message)
+    adaptive_in_text = re.findall(build_adaptive_action_regex(), message)
+    refactor_in_text = re.findall(build_refactor_regex(), message)
+
+    return {
+        "is_corrective": baseline_is_fix(message),
+        "corrective_in_text": corrective_in_text,
+        "bug_fix_regex_count": len(corrective_in_text),
+        "is_adaptive": baseline_is_adaptive(message),
+        "adaptive_in_text": adaptive_in_text,
+        "adaptive_regex_count": len(adaptive_in_text),
+        "is_adaptive_by_negation": (baseline_is_fix(message) == 0
+                                    and baseline_is_refactor(message) == 0
+                                    and count(build_perfective_regex(), message) == 0),
+        "is_perfective": baseline_is_perfective(message),
+        "is_refactor": baseline_is_refactor(message),
+        "refactor_in_text": refactor_in_text,
+        "refactor_regex_count": len(refactor_in_text),
+    }
+
+class TestCalculateMetricsUtils(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.messages = load_messages()
+
+    def test_classifiers_match_models(self):
+        for message in self.messages:
+            with self.subTest(message=message):
+                self.assertEqual(classify_separately(message), classify_baseline(message))
+
+    def test_classify_matches_classifiers(self):
+        classifier = get_maintenance_classifier()
+
+        for message in self.messages:
+            with self.subTest(message=message):
+                self.assertEqual(classifier.classify(message), classify_separately(message))
+
+    def test_classify_commit_message_matches_classifiers(self):
+        for message in self.messages:
+            with self.subTest(message=message):
+                commit_message = classify_commit_message(build_commit_message(message))
+
+                self.assertEqual({field: getattr(commit_message, field) for field in FIELDS},
+                                 classify_separately(message))
+
+    def test_classify_commit_message_uses_given_classification(self):
+        classification = get_maintenance_classifier().classify("Fix crash")
+
+        commit_message = classify_commit_message(build_commit_message("Fix crash"), classification)
+
+        self.assertTrue(commit_message.is_corrective)
+        self.assertEqual(commit_message.corrective_in_text, classification["corrective_in_text"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from app.helpers import clone_utils
+from app.helpers.clone_utils import *
+from app.helpers.git_utils import is_partial_clone
+from tests.test_git_utils import run_git, write_file
+
+def create_origin(base, name, files):
+    """
+    Create a bare repository with one commit on main, allowing partial clones.
+    """
+    source = os.path.join(base, name + ".source")
+    os.makedirs(source)
+    run_git(source, "init", "-q")
+    run_git(source, "checkout", "-q", "-b", "main")
+    for path, contents in files.items():
+        write_file(source, path, contents)
+    run_git(source, "add", "-A")
+    run_git(source, "commit", "-q", "-m", "Initial commit")
+
+    origin = os.path.join(base, name + ".git")
+    run_git(base, "clone", "-q", "--bare", source, origin)
+    run_git(origin, "config", "uploadpack.allowFilter", "true")
+
+    return f"file://{origin}"
+
+class TestCloneUtils(unittest.TestCase):
+
+    def setUp(self):
+        self.base = tempfile.mkdtemp()
+        self.mirrors = os.path.join(self.base, "mirrors")
+        self.clone_url = create_origin(self.base, "origin", {"a.py": b"a = 1\n", "dir/b.py": b"b = 1\n"})
+
+        patcher = patch.object(clone_utils, "BASE_MIRRORS", self.mirrors)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.base, ignore_errors=True)
+
+    def test_partial_clone_bypasses_mirror(self):
+        path = os.path.join(self.base, "project")
+
+        clone_repository(self.clone_url, "main", path, max_size=1 << 30, clone_filter="tree:0")
+
+        self.assertTrue(is_partial_clone(path))
+        self.assertTrue(os.path.exists(os.path.join(path, "dir", "b.py")))
+        self.assertEqual(run_git(path, "config", "--get", "remote.origin.partialclonefilter").strip(), b"tree:0")
+        self.assertFalse(os.path.exists(self.mirrors))
+
+    def test_clone_through_mirror(self):
+        path = os.path.join(self.base, "project")
+
+        clone_repository(self.clone_url, "main", path, max_size=1 << 30, clone_filter="")
+
+        self.assertFalse(is_partial_clone(path))
+        self.assertTrue(os.path.isdir(get_mirror_path(self.clone_url)))
+        self.assertEqual(run_git(path, "remote", "get-url", "origin").strip().decode(), self.clone_url)
+    # Mirror cache tests
+    def clone_mirrors(self, max_size=1 << 30):
+        """
+        Clone two repositories through their mirrors, the first one being the least recently used.
+        """
+        other_url = create_origin(self.base, "other", {"c.py": b"c = 1\n" * 1000})
+        for index, clone_url in enumerate((self.clone_url, other_url)):
+            clone_repository(clone_url, "main", os.path.join(self.base, f"project{index}"), max_size=max_size,
+                             clone_filter="")
+            os.utime(get_mirror_path(clone_url) + ".lock", (1000 + index, 1000 + index))
+
+        return get_mirror_path(self.clone_url), get_mirror_path(other_url)
+
+    def test_evict_least_recently_used_mirror(self):
+        oldest, newest = self.clone_mirrors()
+        max_size = get_directory_size(oldest) + get_directory_size(newest) - 1
+
+        self.assertEqual(evict_mirrors(max_size), 1)
+        self.assertFalse(os.path.exists(oldest))
+        self.assertTrue(os.path.isdir(newest))
+
+    def test_evict_nothing_within_max_size(self):
+        oldest, newest = self.clone_mirrors()
+
+        self.assertEqual(evict_mirrors(get_directory_size(oldest) + get_directory_size(newest)), 0)
+        self.assertTrue(os.path.isdir(oldest) and os.path.isdir(newest))
+
+    def test_evict_skips_locked_mirror(self):
+        oldest, newest = self.clone_mirrors()
+
+        with MirrorLock(oldest):
+            self.assertEqual(evict_mirrors(0), 1)
+
+        self.assertTrue(os.path.isdir(oldest))
+        self.assertFalse(os.path.exists(newest))
+
+    def test_evict_keeps_mirror_just_used(self):
+        oldest, newest = self.clone_mirrors()
+
+        self.assertEqual(evict_mirrors(0, keep_path=oldest), 1)
+        self.assertTrue(os.path.isdir(oldest))
+        self.assertFalse(os.path.exists(newest))
+
+    def test_clone_evicts_other_mirrors_above_max_size(self):
+        oldest, newest = self.clone_mirrors(max_size=1)
+
+        self.assertFalse(os.path.exists(oldest))
+        self.assertTrue(os.path.isdir(newest))
+        # The clones do not depend on the evicted mirror
+        self.assertEqual(run_git(os.path.join(self.base, "project0"), "cat-file", "-p", "HEAD:a.py"), b"a = 1\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
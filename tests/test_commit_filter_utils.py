@@ -0,0 +1,126 @@
+import unittest
+from datetime import datetime, timezone
+from app import models
+from app.helpers.commit_filter_utils import *
+
+def build_commit(number, author="Ann", message="Change", date="2020-01-01 00:00:00", merge=False):
+    return {"hash": f"{number:040d}", "author_name": author, "committer_name": author, "author_date": date,
+            "message": message, "merge": merge}
+
+def build_commits():
+    return [
+        build_commit(1, date="2019-12-31 23:59:59"),
+        build_commit(2, merge=True, date="2020-01-02 00:00:00"),
+        build_commit(3, author="dependabot[bot]", date="2020-01-03 00:00:00"),
+        build_commit(4, message="WIP: do not review", date="2020-01-04 00:00:00"),
+        build_commit(5, date="2020-01-05 00:00:00"),
+        build_commit(6, date="2020-01-06 00:00:00"),
+        build_commit(7, date="2020-02-01 00:00:00"),
+    ]
+
+class TestCommitFilterUtils(unittest.TestCase):
+
+    def filter(self, **settings):
+        skipped = {}
+        db_commit_filter = models.CommitFilter(**settings) if settings else None
+        kept = [int(commit["hash"]) for commit in filter_commits(build_commits(), db_commit_filter, skipped)]
+
+        return kept, skipped
+
+    def test_without_filter_keeps_every_commit(self):
+        kept, skipped = self.filter()
+
+        self.assertEqual(kept, [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(skipped, {reason: 0 for reason in SKIP_REASONS})
+
+    def test_merge_flag_is_removed(self):
+        commits = list(filter_commits(build_commits(), None, {}))
+
+        self.assertTrue(all("merge" not in commit for commit in commits))
+
+    def test_skip_merges(self):
+        kept, skipped = self.filter(skip_merges=True)
+
+        self.assertEqual(kept, [1, 3, 4, 5, 6, 7])
+        self.assertEqual(skipped["merges"], 1)
+
+    def test_author_deny_regex(self):
+        kept, skipped = self.filter(author_deny_regex=r"\[bot\]$")
+
+        self.assertEqual(kept, [1, 2, 4, 5, 6, 7])
+        self.assertEqual(skipped["authors"], 1)
+
+    def test_message_deny_regex(self):
+        kept, skipped = self.filter(message_deny_regex="^WIP")
+
+        self.assertEqual(kept, [1, 2, 3, 5, 6, 7])
+        self.assertEqual(skipped["messages"], 1)
+
+    def test_date_window_is_inclusive(self):
+        kept, skipped = self.filter(since=datetime(2020, 1, 2), until=datetime(2020, 1, 6))
+
+        self.assertEqual(kept, [2, 3, 4, 5, 6])
+        self.assertEqual(skipped["dates"], 2)
+
+    def test_date_window_ignores_timezone(self):
+        kept, _ = self.filter(since=datetime(2020, 1, 5, tzinfo=timezone.utc))
+
+        self.assertEqual(kept, [5, 6, 7])
+
+    def test_max_commits_keeps_oldest(self):
+        kept, skipped = self.filter(max_commits=3)
+
+        self.assertEqual(kept, [1, 2, 3])
+        self.assertEqual(skipped["max_commits"], 4)
+
+    def test_max_commits_zero_keeps_none(self):
+        kept, skipped = self.filter(max_commits=0)
+
+        self.assertEqual(kept, [])
+        self.assertEqual(skipped["max_commits"], 7)
+
+    def test_max_commits_counts_commits_kept_by_other_criteria(self):
+        kept, skipped = self.filter(skip_merges=True, author_deny_regex=r"\[bot\]$", message_deny_regex="^WIP",
+                                    max_commits=3)
+
+        self.assertEqual(kept, [1, 5, 6])
+        self.assertEqual(skipped, {"merges": 1, "authors": 1, "messages": 1, "dates": 0, "max_commits": 1})
+
+    def test_commits_past_max_commits_are_counted_under_other_criteria_first(self):
+        kept, skipped = self.filter(skip_merges=True, max_commits=1)
+
+        self.assertEqual(kept, [1])
+        self.assertEqual(skipped["merges"], 1)
+        self.assertEqual(skipped["max_commits"], 5)
+
+    def test_combined_criteria(self):
+        kept, skipped = self.filter(skip_merges=True, author_deny_regex="bot", message_deny_regex="WIP",
+                                    since=datetime(2020, 1, 1), until=datetime(2020, 1, 31), max_commits=10)
+
+        self.assertEqual(kept, [5, 6])
+        self.assertEqual(skipped, {"merges": 1, "authors": 1, "messages": 1, "dates": 2, "max_commits": 0})
+
+    def test_first_matching_reason_is_counted(self):
+        commits = [build_commit(1, author="bot", message="WIP", merge=True)]
+        skipped = {}
+
+        list(filter_commits(commits, models.CommitFilter(skip_merges=True, author_deny_regex="bot",
+                                                         message_deny_regex="WIP"), skipped))
+
+        self.assertEqual(skipped["merges"], 1)
+        self.assertEqual(skipped["authors"], 0)
+
+    def test_get_invalid_regex(self):
+        self.assertIsNone(get_invalid_regex(models.CommitFilter(author_deny_regex="bot", message_deny_regex=None)))
+        self.assertEqual(get_invalid_regex(models.CommitFilter(author_deny_regex="bot", message_deny_regex="(")),
+                         "(")
+
+    def test_commit_filter_to_dict(self):
+        self.assertIsNone(commit_filter_to_dict(None))
+        self.assertEqual(commit_filter_to_dict(models.CommitFilter(skip_merges=None, since=datetime(2020, 1, 2),
+                                                                   max_commits=5)),
+                         {"skip_merges": False, "author_deny_regex": None, "message_deny_regex": None,
+                          "since": "2020-01-02T00:00:00", "until": None, "max_commits": 5})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -21,6 +21,30 @@ class TestConfig(unittest.TestCase):
         "SERVER_HOST": "127.0.0.1",
         "SERVER_PORT": "8000",
         "SERVER_RESULTS_PATH": "/var/results",
+        "LOC_COUNTER": "builtin",
+        "GENERATE_TIMESERIES_WORKERS": "1",
+        "MAX_CLASSIFIED_FILE_SIZE": "1048576",
+        "OVERSIZED_FILE_POLICY": "sample",
+        "BLOB_STORE_MAX_ENTRIES": "2000000",
+        "MESSAGE_STORE_MAX_ENTRIES": "1000000",
+        "REVISION_SAMPLING": "monthly",
+        "REVISION_SAMPLING_EVERY_N": "100",
+        "REVISION_SAMPLING_MAX_K": "60",
+        "REVISION_SAMPLING_SELECTION": "even",
+        "COMMIT_EXTRACTOR": "pydriller",
+        "COMMIT_INSERT_BATCH_SIZE": "1000",
+        "COMMIT_QUEUE_SIZE": "4",
+        "COMMIT_EXTRACTION_MODE": "full",
+        "MIRROR_CACHE_MAX_SIZE": "21474836480",
+        "CLONE_FILTER": "blob:none",
+        "COMMAND_TIMEOUT": "600",
+        "HEAVY_COMMAND_TIMEOUT": "7200",
+        "HEAVY_COMMANDS_PER_NODE": "4",
+        "PATH_DENY_LIST": "node_modules/,vendor/",
+        "PATH_FILTER_RULES": "gitignore,gitattributes",
+        "COMMIT_CLASSIFICATION_WORKERS": "1",
+        "COMMIT_MESSAGE_INSERT_BATCH_SIZE": "1000",
+        "COMMIT_MESSAGE_MATCHES": "store",
 
     })
     def test_environment_variables(self):
@@ -40,6 +64,30 @@ class TestConfig(unittest.TestCase):
         self.assertIsNotNone(SERVER_HOST)
         self.assertIsNotNone(SERVER_PORT)
         self.assertIsNotNone(SERVER_RESULTS_PATH)
+        self.assertIsNotNone(LOC_COUNTER)
+        self.assertIsNotNone(GENERATE_TIMESERIES_WORKERS)
+        self.assertIsNotNone(MAX_CLASSIFIED_FILE_SIZE)
+        self.assertIsNotNone(OVERSIZED_FILE_POLICY)
+        self.assertIsNotNone(BLOB_STORE_MAX_ENTRIES)
+        self.assertIsNotNone(MESSAGE_STORE_MAX_ENTRIES)
+        self.assertIsNotNone(REVISION_SAMPLING)
+        self.assertIsNotNone(REVISION_SAMPLING_EVERY_N)
+        self.assertIsNotNone(REVISION_SAMPLING_MAX_K)
+        self.assertIsNotNone(REVISION_SAMPLING_SELECTION)
+        self.assertIsNotNone(COMMIT_EXTRACTOR)
+        self.assertIsNotNone(COMMIT_INSERT_BATCH_SIZE)
+        self.assertIsNotNone(COMMIT_QUEUE_SIZE)
+        self.assertIsNotNone(COMMIT_EXTRACTION_MODE)
+        self.assertIsNotNone(MIRROR_CACHE_MAX_SIZE)
+        self.assertIsNotNone(CLONE_FILTER)
+        self.assertIsNotNone(COMMAND_TIMEOUT)
+        self.assertIsNotNone(HEAVY_COMMAND_TIMEOUT)
+        self.assertIsNotNone(HEAVY_COMMANDS_PER_NODE)
+        self.assertIsNotNone(PATH_DENY_LIST)
+        self.assertIsNotNone(PATH_FILTER_RULES)
+        self.assertIsNotNone(COMMIT_CLASSIFICATION_WORKERS)
+        self.assertIsNotNone(COMMIT_MESSAGE_INSERT_BATCH_SIZE)
+        self.assertIsNotNone(COMMIT_MESSAGE_MATCHES)
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -14,6 +14,9 @@ from app.constants import (
     BASE_LOG_MAINTENANCE_ACTIVITIES,
     BASE_SUMMARY_MAINTENANCE_ACTIVITIES,
     BASE_LOG_CO_EVOLUTION,
+    BASE_BLOB_STORE,
+    BASE_MIRRORS,
+    BASE_LOCKS,
     RESOURCES_DIR,
     EXTERNAL_DIR,
     TEST_CODE_CLASSIFICATION_DIR,
@@ -39,6 +42,9 @@ class TestConstants(unittest.TestCase):
         self.assertIsNotNone(BASE_LOG_MAINTENANCE_ACTIVITIES)
         self.assertIsNotNone(BASE_SUMMARY_MAINTENANCE_ACTIVITIES)
         self.assertIsNotNone(BASE_LOG_CO_EVOLUTION)
+        self.assertIsNotNone(BASE_BLOB_STORE)
+        self.assertIsNotNone(BASE_MIRRORS)
+        self.assertIsNotNone(BASE_LOCKS)
         self.assertIsNotNone(RESOURCES_DIR)
         self.assertIsNotNone(EXTERNAL_DIR)
         self.assertIsNotNone(TEST_CODE_CLASSIFICATION_DIR)
@@ -1,8 +1,12 @@
 import unittest
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 from uuid import uuid4
 from pydantic import HttpUrl
 from app.crud import *
+from app.database import Base
 from app.enums import UserStatusEnum, StatusEnum, StageEnum
 
 class TestCRUD(unittest.TestCase):
@@ -162,6 +166,39 @@ class TestCRUD(unittest.TestCase):
         self.assertEqual(result.language, "JavaScript")
         self.assertEqual(result.forks_count, 20)
 
+    def test_create_commit_filter_saves_filter_correctly(self):
+        repo_id = uuid4()
+        data = schemas.CommitFilterCreate(
+            repository=repo_id,
+            skip_merges=True,
+            author_deny_regex=r"\[bot\]$"
+        )
+        self.db.add.return_value = None
+        self.db.commit.return_value = None
+
+        result = create_commit_filter(self.db, data)
+        self.assertEqual(result.repository, repo_id)
+        self.assertTrue(result.skip_merges)
+        self.assertEqual(result.author_deny_regex, r"\[bot\]$")
+
+    def test_update_commit_filter_updates_fields_correctly(self):
+        filter_id = "filter_123"
+        updated_filter = schemas.CommitFilterUpdate(
+            repository=uuid4(),
+            skip_merges=False,
+            message_deny_regex="^Bump ",
+            since=datetime(2020, 1, 1),
+            max_commits=1000
+        )
+        mock_filter = models.CommitFilter(id=filter_id, skip_merges=True)
+        self.db.query.return_value.filter.return_value.first.return_value = mock_filter
+
+        result = update_commit_filter(self.db, filter_id, updated_filter)
+        self.assertFalse(result.skip_merges)
+        self.assertEqual(result.message_deny_regex, "^Bump ")
+        self.assertEqual(result.since, datetime(2020, 1, 1))
+        self.assertEqual(result.max_commits, 1000)
+
     def test_delete_additional_data_removes_data(self):
         data_id = "data_123"
         self.db.query.return_value.filter.return_value.delete.return_value = 1
@@ -356,6 +393,58 @@ class TestCRUD(unittest.TestCase):
         self.assertEqual(result.message, "Test commit")
         self.assertEqual(result.author_date, "2020-01-01T00:00:00Z")
 
+    def test_create_all_commits_inserts_in_one_statement(self):
+        commits_data = [{
+            "pipeline_id": uuid4(),
+            "hash": f"hash{i}",
+            "author_name": "Test Author",
+            "committer_name": "Test Committer",
+            "author_date": "2020-01-01T00:00:00Z",
+            "message": "Test commit"
+        } for i in range(3)]
+
+        create_all_commits(self.db, commits_data)
+        self.db.execute.assert_called_once()
+        self.assertEqual(self.db.execute.call_args[0][1], commits_data)
+        self.db.commit.assert_called_once()
+        self.db.refresh.assert_not_called()
+
+    def test_get_last_commit_by_pipeline_returns_newest_commit(self):
+        pipeline_id = uuid4()
+        mock_commit = models.Commit(pipeline_id=pipeline_id, hash="abc")
+        self.db.query.return_value.filter.return_value.order_by.return_value.first.return_value = mock_commit
+
+        result = get_last_commit_by_pipeline(self.db, pipeline_id)
+        self.assertEqual(result.hash, "abc")
+
+    def test_stream_commits_by_pipeline_yields_in_batches(self):
+        pipeline_id = uuid4()
+        mock_rows = [("abc", "Test Author", "Test Committer", "2020-01-01T00:00:00Z", "Test commit")]
+        self.db.query.return_value.filter.return_value.order_by.return_value.yield_per.return_value = mock_rows
+
+        result = list(stream_commits_by_pipeline(self.db, pipeline_id, batch_size=500))
+        self.assertEqual(result, mock_rows)
+        self.db.query.return_value.filter.return_value.order_by.return_value.yield_per.assert_called_once_with(500)
+
+    def test_get_first_commits_by_period_uses_distinct_on_in_postgresql(self):
+        pipeline_id = uuid4()
+        mock_rows = [("abc", "2020-01-01T00:00:00Z"), ("def", "2020-02-03T00:00:00Z")]
+        self.db.get_bind.return_value.dialect.name = "postgresql"
+        self.db.query.return_value.filter.return_value.distinct.return_value.order_by.return_value.all.return_value = mock_rows
+
+        result = get_first_commits_by_period(self.db, pipeline_id, "month")
+        self.assertEqual(result, mock_rows)
+
+    def test_create_all_competences_and_base_items_commits_once(self):
+        pipeline_id = uuid4()
+        competences_data = [{"competence": "2020-01", "pipeline_id": pipeline_id}]
+        base_items_data = [{"base_item": "abc", "pipeline_id": pipeline_id}]
+
+        create_all_competences_and_base_items(self.db, competences_data, base_items_data)
+        self.assertEqual(self.db.execute.call_count, 2)
+        self.db.commit.assert_called_once()
+        self.db.refresh.assert_not_called()
+
     def test_create_test_data_saves_test_data_correctly(self):
         test_data = {
             "id": uuid4(),
@@ -389,6 +478,15 @@ class TestCRUD(unittest.TestCase):
         result = get_tests_data_by_pipeline(self.db, pipeline_id)
         self.assertEqual(len(result), 2)
 
+    def test_stream_test_datas_by_pipeline_yields_in_batches(self):
+        pipeline_id = uuid4()
+        mock_rows = [(1, "src/a.py", True, True), (2, "src/b.py", False, False)]
+        self.db.query.return_value.filter.return_value.order_by.return_value.yield_per.return_value = mock_rows
+
+        result = list(stream_tests_data_by_pipeline(self.db, pipeline_id, batch_size=500))
+        self.assertEqual(result, mock_rows)
+        self.db.query.return_value.filter.return_value.order_by.return_value.yield_per.assert_called_once_with(500)
+
     def test_create_code_metrics_saves_metrics_correctly(self):
         code_metrics = {
             "id": uuid4(),
@@ -471,6 +569,21 @@ class TestCRUD(unittest.TestCase):
         self.assertIsNone(result.adaptive_by_negation_in_text)
         self.assertIsNone(result.corrective_in_text)
 
+    def test_create_all_commit_message_items_inserts_in_batches_and_commits_once(self):
+        commit_message_items_data = [{
+            "pipeline_id": uuid4(),
+            "hash": f"hash{i}",
+            "message": "fix bug",
+            "is_corrective": True
+        } for i in range(3)]
+
+        create_all_commit_message_items(self.db, commit_message_items_data, batch_size=2)
+        self.assertEqual(self.db.execute.call_count, 2)
+        self.assertEqual(self.db.execute.call_args_list[0][0][1], commit_message_items_data[:2])
+        self.assertEqual(self.db.execute.call_args_list[1][0][1], commit_message_items_data[2:])
+        self.db.commit.assert_called_once()
+        self.db.refresh.assert_not_called()
+
     def test_create_maintenance_activity_summary_saves_summary_correctly(self):
         maintenance_summary = {
             "id": uuid4(),
@@ -537,6 +650,110 @@ class TestCRUD(unittest.TestCase):
         result = create_insights(self.db, insights_data)
         self.assertEqual(result.generated_text, "value_insight")
 
+    def test_create_pipeline_statistics_saves_statistics_correctly(self):
+        statistics_data = {
+            "id": uuid4(),
+            "pipeline_id": uuid4(),
+            "stage": StageEnum.GENERATE_TIME_SERIES,
+            "statistics": {"oversized_files": 3, "oversized_blobs": 1}
+        }
+        mock_statistics = models.PipelineStatistics(**statistics_data)
+        self.db.add.return_value = None
+        self.db.commit.return_value = None
+        self.db.refresh.return_value = mock_statistics
+
+        result = create_pipeline_statistics(self.db, statistics_data)
+        self.assertEqual(result.stage, StageEnum.GENERATE_TIME_SERIES)
+        self.assertEqual(result.statistics["oversized_files"], 3)
+
+    def test_get_pipeline_statistics_by_pipeline_returns_statistics(self):
+        pipeline_id = uuid4()
+        mock_statistics = [models.PipelineStatistics(pipeline_id=pipeline_id, stage=StageEnum.GENERATE_TIME_SERIES,
+                                                     statistics={"oversized_files": 0})]
+        self.db.query.return_value.filter.return_value.order_by.return_value.all.return_value = mock_statistics
+
+        result = get_pipeline_statistics_by_pipeline(self.db, pipeline_id)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0].statistics["oversized_files"], 0)
+
+    def test_get_latest_pipeline_with_statistics_returns_pipeline(self):
+        repository_id = uuid4()
+        mock_pipeline = models.Pipeline(id=uuid4(), repository=repository_id)
+        self.db.query.return_value.join.return_value.filter.return_value.order_by.return_value.first.return_value = mock_pipeline
+
+        result = get_latest_pipeline_with_statistics(self.db, repository_id, StageEnum.EXTRACT_COMMITS, uuid4())
+        self.assertEqual(result.repository, repository_id)
+
+
+class TestCommitSelectors(unittest.TestCase):
+    # The selectors run against a real SQLite database, the engine used outside PostgreSQL
+
+    COMMITS = [
+        ("december_monday", "2019-12-30 10:00:00"),
+        ("december_tuesday", "2019-12-31 12:00:00"),
+        ("january_first", "2020-01-01 09:00:00"),
+        ("january_sunday", "2020-01-05 23:59:59"),
+        ("second_week", "2020-01-06 00:00:00"),
+        ("first_week_late", "2020-01-03 08:00:00"),
+        ("second_week_tie", "2020-01-06 00:00:00"),
+        ("march", "2020-03-15 18:00:00"),
+    ]
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine, tables=[models.Commit.__table__])
+        self.db = sessionmaker(bind=self.engine)()
+        self.pipeline_id = uuid4()
+
+        # created_at gives the history order, the author dates are not in that order
+        start = datetime(2021, 1, 1)
+        commits = [(self.pipeline_id, commit_hash, author_date) for commit_hash, author_date in self.COMMITS]
+        commits.append((uuid4(), "other_pipeline", "2019-12-30 00:00:00"))
+        create_all_commits(self.db, [{
+            "id": uuid4(),
+            "hash": commit_hash,
+            "author_name": "Test Author",
+            "committer_name": "Test Committer",
+            "author_date": datetime.fromisoformat(author_date),
+            "message": "Test commit",
+            "pipeline_id": pipeline_id,
+            "created_at": start + timedelta(seconds=index),
+        } for index, (pipeline_id, commit_hash, author_date) in enumerate(commits)])
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def hashes(self, rows):
+        return [row.hash for row in rows]
+
+    def test_first_commits_by_month(self):
+        rows = get_first_commits_by_period(self.db, self.pipeline_id, "month")
+
+        self.assertEqual(self.hashes(rows), ["december_monday", "january_first", "march"])
+        self.assertEqual(rows[0].author_date, datetime(2019, 12, 30, 10))
+
+    def test_first_commits_by_week_across_year_boundary(self):
+        # 2019-12-30 to 2020-01-05 is the ISO week 2020-W01, the tie on 2020-01-06 goes to the older insert
+        rows = get_first_commits_by_period(self.db, self.pipeline_id, "week")
+
+        self.assertEqual(self.hashes(rows), ["december_monday", "second_week", "march"])
+        self.assertEqual([row.author_date.strftime("%G-W%V") for row in rows], ["2020-W01", "2020-W02", "2020-W11"])
+
+    def test_first_commits_by_period_of_unknown_pipeline(self):
+        self.assertEqual(get_first_commits_by_period(self.db, uuid4(), "month"), [])
+
+    def test_every_nth_commit_in_history_order(self):
+        self.assertEqual(self.hashes(get_every_nth_commit_by_pipeline(self.db, self.pipeline_id, 3)),
+                         ["december_monday", "january_sunday", "second_week_tie"])
+        self.assertEqual(len(get_every_nth_commit_by_pipeline(self.db, self.pipeline_id, 1)), len(self.COMMITS))
+
+    def test_commits_at_positions_in_history_order(self):
+        rows = get_commits_by_pipeline_at_positions(self.db, self.pipeline_id, [7, 0, 4, 20])
+
+        self.assertEqual(self.hashes(rows), ["december_monday", "second_week", "march"])
+        self.assertEqual(get_commits_by_pipeline_at_positions(self.db, self.pipeline_id, []), [])
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,317 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from app.helpers import git_utils
+from app.helpers.extract_commits_utils import iter_pydriller_commits
+from app.helpers.git_utils import *
+
+GIT_ENV = {
+    b"GIT_AUTHOR_NAME": b"Ann",
+    b"GIT_AUTHOR_EMAIL": b"ann@example.com",
+    b"GIT_COMMITTER_NAME": b"Cid",
+    b"GIT_COMMITTER_EMAIL": b"cid@example.com",
+    b"GIT_AUTHOR_DATE": b"2020-01-02T03:04:05+0000",
+    b"GIT_COMMITTER_DATE": b"2020-01-02T03:04:05+0000",
+    b"GIT_CONFIG_GLOBAL": os.devnull.encode(),
+    b"GIT_CONFIG_NOSYSTEM": b"1",
+}
+
+def run_git(path, *args, env=None):
+    """
+    Run git in a repository with fixed identities and dates.
+    """
+    git_env = dict(os.environb)
+    git_env.update(GIT_ENV)
+    git_env.update(env or {})
+
+    return subprocess.run(["git", *args], cwd=path, env=git_env, check=True, capture_output=True).stdout
+
+def write_file(path, name, contents):
+    path_file = os.path.join(path, name)
+    os.makedirs(os.path.dirname(path_file), exist_ok=True)
+
+    with open(path_file, "wb") as file:
+        file.write(contents)
+
+class TestGitUtils(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.path = tempfile.mkdtemp()
+        run_git(cls.path, "init", "-q")
+        run_git(cls.path, "checkout", "-q", "-b", "main")
+
+        write_file(cls.path, "a.py", b"print(1)\n")
+        write_file(cls.path, "dir with space/b c.py", b"x = 1\n")
+        write_file(cls.path, "new\nline.py", b"y = 2\n")
+        run_git(cls.path, "add", "-A")
+        run_git(cls.path, "commit", "-q", "-m", "Initial commit\n\nWith a body")
+        cls.first = run_git(cls.path, "rev-parse", "HEAD").decode().strip()
+
+        # Submodule (gitlink) and symlink entries
+        run_git(cls.path, "update-index", "--add", "--cacheinfo", f"160000,{cls.first},sub")
+        os.symlink("a.py", os.path.join(cls.path, "link.py"))
+        run_git(cls.path, "add", "link.py")
+        run_git(cls.path, "commit", "-q", "--allow-empty-message", "-m", "",
+                env={b"GIT_AUTHOR_DATE": b"2020-02-03T10:00:00+0200"})
+
+        run_git(cls.path, "checkout", "-q", "-b", "side", cls.first)
+        write_file(cls.path, "side.py", b"s = 3\n")
+        run_git(cls.path, "add", "side.py")
+        run_git(cls.path, "commit", "-q", "-m", "Side change", env={b"GIT_AUTHOR_NAME": "José Latin".encode()})
+
+        # A commit whose author name is not valid UTF-8 and that declares no encoding
+        tree, parent = run_git(cls.path, "rev-parse", "HEAD^{tree}", "HEAD").decode().split()
+        raw_commit = (f"tree {tree}\nparent {parent}\n".encode()
+                      + b"author Ren\xe9 Raw <rene@example.com> 1577934245 +0000\n"
+                      + b"committer Cid <cid@example.com> 1577934245 +0000\n\nRaw author\n")
+        raw_hash = subprocess.run(["git", "hash-object", "-t", "commit", "-w", "--stdin"], cwd=cls.path,
+                                  input=raw_commit, check=True, capture_output=True).stdout.decode().strip()
+        run_git(cls.path, "update-ref", "refs/heads/side", raw_hash)
+
+        run_git(cls.path, "checkout", "-q", "main")
+        run_git(cls.path, "merge", "-q", "--no-ff", "-m", "Merge branch 'side'", "side")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.path, ignore_errors=True)
+
+    # iter_commits tests
+    def test_iter_commits_matches_pydriller(self):
+        commits = list(iter_commits(self.path))
+
+        self.assertEqual(commits, list(iter_pydriller_commits(self.path)))
+        self.assertEqual(len(commits), 5)
+
+    def test_iter_commits_fields(self):
+        # The commits share their committer date, so their order between the branches is not fixed
+        commits = {commit["message"].partition("\n")[0]: commit for commit in iter_commits(self.path)}
+        first, empty, side, raw, merge = (commits["Initial commit"], commits[""], commits["Side change"],
+                                          commits["Raw author"], commits["Merge branch 'side'"])
+
+        self.assertEqual(first["hash"], self.first)
+        self.assertEqual(first["message"], "Initial commit\n\nWith a body")
+        self.assertEqual((first["author_name"], first["committer_name"]), ("Ann", "Cid"))
+        self.assertEqual(empty["message"], "")
+        self.assertEqual(empty["author_date"], "2020-02-03 10:00:00")
+        self.assertEqual(side["author_name"], "José Latin")
+        self.assertEqual(raw["author_name"], "Ren\ufffd Raw")
+        self.assertEqual([commit["merge"] for commit in (first, empty, side, raw, merge)],
+                         [False, False, False, False, True])
+
+    def test_iter_commits_reencodes_legacy_encodings(self):
+        path = tempfile.mkdtemp()
+        try:
+            run_git(path, "init", "-q")
+            write_file(path, "a.py", b"a = 1\n")
+            run_git(path, "add", "a.py")
+            run_git(path, "-c", "i18n.commitEncoding=ISO-8859-1", "commit", "-q", "-m", b"Caf\xe9",
+                    env={b"GIT_AUTHOR_NAME": b"Jos\xe9 Latin"})
+
+            # pydriller decodes the raw bytes as UTF-8, git honours the encoding header of the commit
+            commit, = iter_commits(path)
+            self.assertEqual((commit["author_name"], commit["message"]), ("José Latin", "Café"))
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def test_iter_commits_of_range(self):
+        commits = list(iter_commits(self.path, f"{self.first}..HEAD"))
+
+        self.assertEqual([commit["hash"] for commit in commits],
+                         [commit["hash"] for commit in iter_pydriller_commits(self.path, f"{self.first}..HEAD")])
+        self.assertNotIn(self.first, [commit["hash"] for commit in commits])
+
+    def test_iter_commits_timeout_ignores_time_spent_by_caller(self):
+        commits = []
+
+        with patch.object(git_utils, "HEAVY_COMMAND_TIMEOUT", 0.2):
+            for commit in iter_commits(self.path):
+                time.sleep(0.3)
+                commits.append(commit)
+
+        self.assertEqual(len(commits), 5)
+
+    def test_iter_commits_of_unknown_revision(self):
+        with self.assertRaises(Exception):
+            list(iter_commits(self.path, "unknown"))
+
+    # RevisionReader tests
+    def test_list_files_skips_submodules_and_symlinks(self):
+        with RevisionReader(self.path) as reader:
+            files = reader.list_files("HEAD")
+
+        self.assertEqual(sorted(path for path, _, _ in files),
+                         ["a.py", "dir with space/b c.py", "new\nline.py", "side.py"])
+
+    def test_list_files_sizes_and_contents(self):
+        with RevisionReader(self.path) as reader:
+            for path, blob_sha, size in reader.list_files("HEAD"):
+                with self.subTest(path=path):
+                    with open(os.path.join(self.path, path), "rb") as file:
+                        contents = file.read()
+
+                    self.assertEqual(reader.read_blob(blob_sha), contents)
+                    self.assertEqual(size, len(contents))
+
+    def test_read_blob_with_limit(self):
+        files = {path: blob_sha for path, blob_sha, _ in RevisionReader(self.path).list_files("HEAD")}
+
+        with RevisionReader(self.path) as reader:
+            self.assertEqual(reader.read_blob(files["a.py"], limit=5), b"print")
+            # The rest of the blob was drained, the next read is aligned
+            self.assertEqual(reader.read_blob(files["side.py"]), b"s = 3\n")
+
+    def test_read_missing_object(self):
+        files = {path: blob_sha for path, blob_sha, _ in RevisionReader(self.path).list_files("HEAD")}
+
+        with RevisionReader(self.path) as reader:
+            with self.assertRaises(Exception):
+                reader.read_blob("0" * 40)
+
+            self.assertEqual(reader.read_blob(files["a.py"]), b"print(1)\n")
+
+    def test_read_blob_times_out_and_restarts_session(self):
+        files = {path: blob_sha for path, blob_sha, _ in RevisionReader(self.path).list_files("HEAD")}
+        real_start_process = git_utils.start_process
+
+        def start_stuck_process(args, **kwargs):
+            return real_start_process(["sleep", "30"], **kwargs)
+
+        with RevisionReader(self.path) as reader:
+            reader.close()
+
+            with patch.object(git_utils, "COMMAND_TIMEOUT", 0.2), \
+                    patch.object(git_utils, "start_process", start_stuck_process):
+                start = time.monotonic()
+                with self.assertRaisesRegex(Exception, "timed out"):
+                    reader.read_blob(files["a.py"])
+
+                self.assertLess(time.monotonic() - start, 5)
+                self.assertIsNone(reader.process)
+
+            self.assertEqual(reader.read_blob(files["a.py"]), b"print(1)\n")
+
+class TestReadWatchdog(unittest.TestCase):
+
+    def setUp(self):
+        self.process = git_utils.start_process(["sleep", "30"], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE)
+
+    def tearDown(self):
+        git_utils.kill_process(self.process)
+        self.process.stdout.close()
+
+    def test_kills_process_when_armed_read_waits_too_long(self):
+        watchdog = git_utils.ReadWatchdog(self.process, 0.2, "sleep")
+
+        with watchdog:
+            self.assertEqual(self.process.stdout.read(), b"")
+
+        self.assertTrue(watchdog.expired)
+        self.assertIsNotNone(self.process.wait(timeout=5))
+
+    def test_time_between_reads_is_not_counted(self):
+        watchdog = git_utils.ReadWatchdog(self.process, 0.2, "sleep")
+        time.sleep(0.5)
+        watchdog.stop()
+
+        self.assertFalse(watchdog.expired)
+        self.assertIsNone(self.process.poll())
+class TestPartialClone(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.base = tempfile.mkdtemp()
+        source = os.path.join(cls.base, "source")
+        os.makedirs(source)
+        run_git(source, "init", "-q")
+        run_git(source, "checkout", "-q", "-b", "main")
+
+        for number, files in enumerate([{"a.py": b"a = 1\n", "dir/b.py": b"b = 1\n"},
+                                        {"a.py": b"a = 2\n", "dir/sub/c.py": b"c = 1\n"},
+                                        {"dir/b.py": b"b = 2\n", "d.py": b"d = 1\n"}]):
+            for name, contents in files.items():
+                write_file(source, name, contents)
+            run_git(source, "add", "-A")
+            run_git(source, "commit", "-q", "-m", f"Commit {number}")
+
+        cls.origin = os.path.join(cls.base, "origin.git")
+        run_git(cls.base, "clone", "-q", "--bare", source, cls.origin)
+        run_git(cls.origin, "config", "uploadpack.allowFilter", "true")
+        cls.commits = run_git(cls.origin, "rev-list", "--reverse", "main").decode().split()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.base, ignore_errors=True)
+
+    def clone(self, *args):
+        path = tempfile.mkdtemp(dir=self.base)
+        run_git(self.base, "clone", "-q", *args, "--branch", "main", f"file://{self.origin}", path)
+
+        return path
+
+    def assert_reads_every_file_offline(self, path):
+        # Without its origin, reading an object the clone misses fails instead of fetching it
+        run_git(path, "remote", "set-url", "origin", os.path.join(self.base, "unreachable.git"))
+
+        with RevisionReader(path) as reader:
+            for commit in self.commits:
+                for file_path, blob_sha, size in reader.list_files(commit):
+                    with self.subTest(commit=commit, path=file_path):
+                        contents = run_git(self.origin, "cat-file", "blob", blob_sha)
+
+                        self.assertEqual(reader.read_blob(blob_sha), contents)
+                        self.assertEqual(size, len(contents))
+
+    def test_full_clone(self):
+        path = self.clone()
+
+        self.assertFalse(is_partial_clone(path))
+        self.assertEqual(list_missing_objects(path, self.commits), [])
+        self.assertEqual(prefetch_objects(path, self.commits), 0)
+
+    def test_prefetch_blobless_clone(self):
+        path = self.clone("--filter=blob:none")
+        missing = list_missing_objects(path, self.commits)
+        all_objects = {line.split()[0]
+                       for line in run_git(self.origin, "rev-list", "--objects", "--all").decode().splitlines()}
+
+        self.assertTrue(is_partial_clone(path))
+        # The checkout fetched the blobs of the last commit, the older ones are missing
+        self.assertTrue(missing)
+        self.assertLessEqual(set(missing), all_objects)
+
+        self.assertEqual(prefetch_objects(path, self.commits), len(missing))
+        self.assertEqual(list_missing_objects(path, self.commits), [])
+        self.assert_reads_every_file_offline(path)
+
+    def test_prefetch_treeless_clone(self):
+        path = self.clone("--filter=tree:0")
+        missing = list_missing_objects(path, self.commits)
+
+        self.assertTrue(is_partial_clone(path))
+        self.assertTrue(missing)
+
+        # The entries of the missing trees are found and fetched in the following rounds
+        self.assertGreater(prefetch_objects(path, self.commits), len(missing))
+        self.assertEqual(list_missing_objects(path, self.commits), [])
+        self.assert_reads_every_file_offline(path)
+
+    def test_read_missing_object_offline_fails(self):
+        path = self.clone("--filter=blob:none")
+        blob_sha = list_missing_objects(path, self.commits)[0]
+        run_git(path, "remote", "set-url", "origin", os.path.join(self.base, "unreachable.git"))
+
+        with RevisionReader(path) as reader:
+            with self.assertRaises(Exception):
+                reader.read_blob(blob_sha)
+
+    def test_prefetch_without_commits(self):
+        self.assertEqual(prefetch_objects(self.clone("--filter=blob:none"), []), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import re
+import tracemalloc
+import unittest
+from unittest.mock import patch
+from app.libs.test_code_classification import LiteralPrefilter as literal_prefilter
+from app.libs.test_code_classification.LiteralPrefilter import LiteralPrefilter, required_literals
+from app.libs.test_code_classification import TestFrameworkMatcher as framework_matcher
+from app.libs.test_code_classification.utilities import lookup_generator, tech_lookup_generator
+
+LOOKUP_DIR = os.path.join(os.path.dirname(__file__), "..", "app", "libs", "test_code_classification")
+
+SAMPLES = [
+    b"",
+    b"import org.junit.Test;\n\npublic class FooTest {\n    @Test\n    public void adds() {\n"
+    b"        assertEquals(2, add(1, 1));\n    }\n}\n",
+    b"IMPORT ORG.JUNIT.TEST;\r\n@TEST\r\npublic void Adds() { AssertEquals(2, 2); }\r\n",
+    b"import unittest\r\n\r\nclass T(unittest.TestCase):\r\n    def test_add(self):\r\n        pass\r\n",
+    b"from pytest import fixture\n# caf\xc3\xa9 \xff\xfe na\xefve\ndef Test_Add():\n    assert 1\n",
+    b"const assert = require('chai').assert;\ndescribe('add', () => {\n"
+    b"  it('adds', () => expect(1).toBe(1));\n});\n",
+    b"#include <gtest/gtest.h>\nTEST(Add, Works) {\n  EXPECT_EQ(2, 1 + 1);\n}\n",
+    b"package main\n\nimport \"testing\"\n\nfunc TestAdd(t *testing.T) {\n\tt.Errorf(\"\xe4\xbd\xa0\")\n}\n",
+    b"require 'rspec'\r\ndescribe Calculator do\r\n  it 'adds' do\r\n    expect(1).to eq(1)\r\n  end\r\nend\r\n",
+    b"\xef\xbb\xbfusing NUnit.Framework;\n[TestFixture]\n"
+    b"public class T { [Test] public void A() { Assert.AreEqual(1, 1); } }\n",
+    b"<?php\nuse PHPUnit\\Framework\\TestCase;\nclass T extends TestCase { public function testA() {} }\n",
+    b"def add(a, b):\n    return a + b  # no tests here\n",
+    b"@Test\r",
+    b"assert\xc0\xc1Equals(\x00\x01)",
+]
+
+def token_samples(tokens):
+    """
+    Turn tokens into plain text close to what they match: as written, upper-cased, split by a CRLF and
+    surrounded by non-ASCII bytes.
+    """
+    samples = []
+    for token in tokens:
+        text = re.sub(r"\\(.)", r"\1", token).replace(" +", " ").replace("[\\w\\.]*", "x.").encode("latin-1")
+        middle = len(text) // 2
+        samples += [text, text.upper(), b"x\r\n" + text + b"\r\ny", text[:middle] + b"\r\n" + text[middle:],
+                    b"\xe9\xff " + text.swapcase() + b" \xc3\xa9"]
+
+    return samples
+
+class TestLiteralPrefilter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.keyword_lookup = lookup_generator(os.path.join(LOOKUP_DIR, "keywords.txt"))
+        cls.test_lookup = tech_lookup_generator(os.path.join(LOOKUP_DIR, "testingTechnologiesFixed3.csv"))
+
+    def test_prefilter_votes_match_regex_votes(self):
+        regex_matcher = framework_matcher.TestFrameworkMatcher(self.test_lookup, self.keyword_lookup,
+                                                               usePrefilter=False)
+        prefilter_matcher = framework_matcher.TestFrameworkMatcher(self.test_lookup, self.keyword_lookup)
+        votes = set()
+
+        for extension in set(self.test_lookup) | set(self.keyword_lookup):
+            tokens = ([token.tokenString for token in self.test_lookup.get(extension, [])]
+                      + self.keyword_lookup.get(extension, []))
+
+            for contents in SAMPLES + token_samples(tokens):
+                with self.subTest(extension=extension, contents=contents):
+                    expected = regex_matcher.votes(extension, contents)
+                    self.assertEqual(prefilter_matcher.votes(extension, contents), expected)
+                    votes.add(expected)
+
+        self.assertEqual(votes, {(0, 0), (0, 1), (1, 0), (1, 1)})
+
+    def test_prefilter_votes_match_regex_votes_on_source_files(self):
+        regex_matcher = framework_matcher.TestFrameworkMatcher(self.test_lookup, self.keyword_lookup,
+                                                               usePrefilter=False)
+        prefilter_matcher = framework_matcher.TestFrameworkMatcher(self.test_lookup, self.keyword_lookup)
+        root = os.path.join(os.path.dirname(__file__), "..")
+
+        for directory in ("app", "tests"):
+            for path, _, names in os.walk(os.path.join(root, directory)):
+                for name in names:
+                    extension = name.rpartition(".")[-1]
+                    if extension not in prefilter_matcher.patterns:
+                        continue
+
+                    with open(os.path.join(path, name), "rb") as file:
+                        contents = file.read()
+
+                    with self.subTest(path=os.path.join(path, name)):
+                        self.assertEqual(prefilter_matcher.votes(extension, contents),
+                                         regex_matcher.votes(extension, contents))
+
+    def test_prefilter_votes_peak_memory(self):
+        matcher = framework_matcher.TestFrameworkMatcher(self.test_lookup, self.keyword_lookup)
+
+        # The include literal occurs but its regex does not match, so the file is lowered then decoded
+        for lineEnd, copies in ((b"\n", 1), (b"\r\n", 2)):
+            contents = (b"x = unittest" + lineEnd) * (1 << 18)
+
+            with self.subTest(lineEnd=lineEnd):
+                tracemalloc.start()
+                try:
+                    self.assertEqual(matcher.votes("py", contents), (0, 0))
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+
+                self.assertLess(peak, (copies + 0.25) * len(contents))
+
+    def test_required_literals_of_plain_tokens(self):
+        self.assertEqual(required_literals("@Test"), ((b"@test",), True))
+        self.assertEqual(required_literals(r"assertEquals\("), ((b"assertequals(",), True))
+        self.assertEqual(required_literals(r"import +[\w\.]*junit"), ((b"import", b"junit"), False))
+
+    def test_required_literals_of_alternation_optional_and_classes(self):
+        for token in ("(assert|expect)", "(?:spec)?", "o?", "[Tt]", r"\w+", "a*", "[^x]", "(?i)x?"):
+            with self.subTest(token=token):
+                self.assertEqual(required_literals(token), ((), False))
+
+        # Only the parts outside of alternations, optional parts and classes are required
+        self.assertEqual(required_literals("((from)|(import)) +unittest"), ((b"unittest",), False))
+        self.assertEqual(required_literals("colou?r"), ((b"colo", b"r"), False))
+        self.assertEqual(required_literals("[Tt]est"), ((b"est",), False))
+
+    def test_required_literals_of_invalid_token(self):
+        self.assertEqual(required_literals("(unclosed"), ((), False))
+
+    def test_line_breaks_are_not_literals(self):
+        self.assertEqual(required_literals("a\r\nb"), ((b"a", b"b"), False))
+
+    def test_without_sre_parser_every_token_runs(self):
+        with patch.object(literal_prefilter, "sre_parse", None):
+            prefilter = LiteralPrefilter(["@Test", r"assertEquals\("], framework_matcher.FLAGS)
+
+        self.assertEqual(prefilter.pureLiterals, [])
+        self.assertEqual(prefilter.filtered, [])
+        self.assertEqual(len(prefilter.candidates(b"nothing")), 2)
+
+if __name__ == "__main__":
+    unittest.main()
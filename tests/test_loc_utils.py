@@ -0,0 +1,35 @@
+import unittest
+from app.helpers.loc_utils import count_loc
+
+class TestLocUtils(unittest.TestCase):
+
+    def test_count_loc_empty_file(self):
+        self.assertEqual(count_loc(b"", "py"), (0, 0, 0))
+
+    def test_count_loc_whitespace_only_file(self):
+        self.assertEqual(count_loc(b"  \n\t\n\n", "java"), (3, 0, 0))
+
+    def test_count_loc_without_trailing_newline(self):
+        self.assertEqual(count_loc(b"int a;\n\nint b;", "c"), (1, 0, 2))
+
+    def test_count_loc_block_comment_spanning_lines(self):
+        contents = b"/* first\n * second\n */\nint a; /* trailing */\n"
+        self.assertEqual(count_loc(contents, "java"), (0, 3, 1))
+
+    def test_count_loc_code_after_block_comment_end(self):
+        contents = b"/* comment\n*/ int a;\n"
+        self.assertEqual(count_loc(contents, "c"), (0, 1, 1))
+
+    def test_count_loc_comment_markers_inside_strings(self):
+        contents = b's = "http://example.com"\nt = \'/* not a comment */\'\n// comment\n'
+        self.assertEqual(count_loc(contents, "js"), (0, 1, 2))
+
+    def test_count_loc_python_docstring_and_hash(self):
+        contents = b'"""\ndocstring\n"""\nx = "#"  # comment\n# comment\n\n'
+        self.assertEqual(count_loc(contents, "py"), (1, 4, 1))
+
+    def test_count_loc_crlf_line_endings(self):
+        self.assertEqual(count_loc(b"a = 1\r\n\r\n# c\r\n", "py"), (1, 1, 1))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import csv
+import os
+import re
+import unittest
+from app.libs.commit_classification_master.adaptive_model import *
+from app.libs.commit_classification_master.corrective_model import *
+from app.libs.commit_classification_master.language_utils import build_sepereted_term, build_non_positive_linguistic
+from app.libs.commit_classification_master.maintenance_classifier import get_maintenance_classifier
+from app.libs.commit_classification_master.refactor_model import *
+
+SAMPLES_PATH = os.path.join(os.path.dirname(__file__), "..", "app", "libs", "commit_classification_master", "data",
+                            "random_batch_18_nov_2020.csv")
+SAMPLES = 300
+
+def load_messages():
+    """
+    Sample commit messages of the library's data set, as written and in lower case, with a few written by hand.
+    """
+    with open(SAMPLES_PATH, encoding="utf-8", errors="replace", newline="") as file:
+        messages = [row["message"] for row in csv.DictReader(file)][:SAMPLES]
+
+    messages += [
+        "",
+        "Fix NullPointerException in parser",
+        "fixed typo in README, no bug",
+        "This is not a bug fix",
+        "Refactor: extract method and remove dead code",
+        "Don't refactor the tests yet",
+        "Migrate to Python 3 and upgrade Django",
+        "Update docs",
+        "Improve performance of the cache",
+        "fix(api): handle empty response",
+    ]
+
+    return messages + [message.lower() for message in messages if message.lower() != message]
+
+def count(regex, text):
+    return len(re.findall(regex, text.lower()))
+
+# The classifiers as the models composed them, rebuilding every pattern from the build_* functions
+
+def baseline_is_fix(text):
+    return (count(build_bug_fix_regex(), text)
+            - count(build_valid_find_regex(), text)
+            - count(build_negeted_bug_fix_regex(), text)) > 0
+
+def baseline_is_adaptive(text):
+    return (count(build_adaptive_regex(), text)
+            + count(build_adaptive_action_regex(), text)
+            - count(build_non_adaptive_context(), text)
+            - count(build_non_adaptive_linguistic(), text))
+
+def baseline_is_refactor(text):
+    refactor_without_cc = build_refactor_regex(use_conventional_commits=False)
+
+    return (count(build_refactor_regex(), text)
+            + count(build_sepereted_term(removal), text)
+            + count(build_refactor_goals_regex(), text)
+            - count(build_non_code_perfective_regex(), text)
+            - count(build_documentation_entities_context(refactor_without_cc), text)
+            - count(build_non_positive_linguistic(refactor_without_cc), text)
+            - count(build_non_positive_linguistic(build_sepereted_term(removal)), text)
+            - count(build_non_positive_linguistic(build_refactor_goals_regex()), text)
+            ) > 0
+
+def baseline_is_perfective(text):
+    return (count(build_perfective_regex(), text) + count(build_refactor_regex(), text)) > 0
+
+class TestMaintenanceClassifier(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.messages = load_messages()
+        cls.classifier = get_maintenance_classifier()
+
+    def test_is_fix_matches_model(self):
+        for message in self.messages:
+            with self.subTest(message=message):
+                self.assertEqual(self.classifier.is_fix(message), baseline_is_fix(message))
+                self.assertEqual(is_fix(message), baseline_is_fix(message))
+
+    def test_is_adaptive_matches_model(self):
+        for message in self.messages:
+            with self.subTest(message=message):
+                self.assertEqual(self.classifier.is_adaptive(message), baseline_is_adaptive(message))
+                self.assertEqual(is_adaptive(message), baseline_is_adaptive(message))
+
+    def test_is_refactor_matches_model(self):
+        for message in self.messages:
+            with self.subTest(message=message):
+                self.assertEqual(self.classifier.is_refactor(message), baseline_is_refactor(message))
+                self.assertEqual(built_is_refactor(message), baseline_is_refactor(message))
+
+    def test_is_perfective_matches_model(self):
+        for message in self.messages:
+            with self.subTest(message=message):
+                self.assertEqual(self.classifier.is_perfective(message), baseline_is_perfective(message))
+
+    def test_sample_covers_every_class(self):
+        self.assertTrue(any(baseline_is_fix(message) for message in self.messages))
+        self.assertTrue(any(baseline_is_adaptive(message) > 0 for message in self.messages))
+        self.assertTrue(any(baseline_is_refactor(message) for message in self.messages))
+        self.assertTrue(any(baseline_is_perfective(message) for message in self.messages))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -507,5 +507,66 @@ class TestModels(unittest.TestCase):
         self.assertEqual(retrieved_insight.generated_text,
                          "This project shows good test coverage and modular design.")
 
+    def test_pipeline_statistics_model(self):
+        repo = Repository(
+            id=uuid.uuid4(),
+            owner="test_owner",
+            default_branch="main",
+            clone_url="https://example.com/repo.git"
+        )
+        self.session.add(repo)
+        self.session.commit()
+
+        pipeline = Pipeline(
+            id=uuid.uuid4(),
+            repository=repo.id,
+            stage=StageEnum.GENERATE_TIME_SERIES,
+            status=StatusEnum.IN_PROGRESS
+        )
+        self.session.add(pipeline)
+        self.session.commit()
+
+        pipeline_statistics = PipelineStatistics(
+            id=uuid.uuid4(),
+            stage=StageEnum.GENERATE_TIME_SERIES,
+            statistics={"oversized_files": 3, "oversized_blobs": 1},
+            pipeline_id=pipeline.id
+        )
+        self.session.add(pipeline_statistics)
+        self.session.commit()
+
+        retrieved_statistics = self.session.query(PipelineStatistics).first()
+        self.assertIsNotNone(retrieved_statistics)
+        self.assertEqual(retrieved_statistics.stage, StageEnum.GENERATE_TIME_SERIES)
+        self.assertEqual(retrieved_statistics.statistics["oversized_files"], 3)
+
+    def test_commit_filter_model(self):
+        repo = Repository(
+            id=uuid.uuid4(),
+            owner="test_owner",
+            default_branch="main",
+            clone_url="https://example.com/repo.git"
+        )
+        self.session.add(repo)
+        self.session.commit()
+
+        commit_filter = CommitFilter(
+            id=uuid.uuid4(),
+            repository=repo.id,
+            skip_merges=True,
+            author_deny_regex=r"(dependabot|renovate)\[bot\]",
+            since=datetime(2020, 1, 1),
+            max_commits=5000
+        )
+        self.session.add(commit_filter)
+        self.session.commit()
+
+        retrieved_filter = self.session.query(CommitFilter).first()
+        self.assertIsNotNone(retrieved_filter)
+        self.assertTrue(retrieved_filter.skip_merges)
+        self.assertEqual(retrieved_filter.author_deny_regex, r"(dependabot|renovate)\[bot\]")
+        self.assertEqual(retrieved_filter.max_commits, 5000)
+        self.assertIsNone(retrieved_filter.until)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,157 @@
+import unittest
+from unittest.mock import MagicMock
+from app.helpers.path_filter_utils import *
+
+class TestPathFilterUtils(unittest.TestCase):
+
+    def ignored(self, gitignore, path, base=""):
+        return is_ignored(parse_gitignore(gitignore, base), path, {})
+
+    # gitignore tests
+    def test_unanchored_pattern_matches_at_any_depth(self):
+        self.assertTrue(self.ignored("*.log", "debug.log"))
+        self.assertTrue(self.ignored("*.log", "a/b/debug.log"))
+        self.assertFalse(self.ignored("*.log", "debug.log.txt"))
+
+    def test_anchored_pattern_matches_from_rules_directory_only(self):
+        self.assertTrue(self.ignored("/build/", "build/out.js"))
+        self.assertFalse(self.ignored("/build/", "src/build/out.js"))
+        self.assertTrue(self.ignored("docs/*.md", "docs/index.md"))
+        self.assertFalse(self.ignored("docs/*.md", "src/docs/index.md"))
+
+    def test_unanchored_directory_pattern_matches_at_any_depth(self):
+        self.assertTrue(self.ignored("build/", "build/out.js"))
+        self.assertTrue(self.ignored("build/", "src/build/out.js"))
+
+    def test_directory_only_pattern_does_not_match_file(self):
+        self.assertTrue(self.ignored("cache/", "cache/data.bin"))
+        self.assertFalse(self.ignored("cache/", "cache"))
+        self.assertFalse(self.ignored("cache/", "src/cache"))
+
+    def test_double_star_patterns(self):
+        self.assertTrue(self.ignored("**/fixtures/**", "fixtures/a.json"))
+        self.assertTrue(self.ignored("**/fixtures/**", "test/unit/fixtures/a/b.json"))
+        self.assertTrue(self.ignored("a/**/z", "a/z"))
+        self.assertTrue(self.ignored("a/**/z", "a/b/c/z"))
+        self.assertFalse(self.ignored("a/**/z", "b/a/z"))
+
+    def test_single_star_does_not_cross_directories(self):
+        self.assertTrue(self.ignored("src/*.js", "src/a.js"))
+        self.assertFalse(self.ignored("src/*.js", "src/lib/a.js"))
+
+    def test_negation_keeps_file(self):
+        gitignore = "*.log\n!keep.log\n"
+        self.assertTrue(self.ignored(gitignore, "debug.log"))
+        self.assertFalse(self.ignored(gitignore, "keep.log"))
+        self.assertFalse(self.ignored(gitignore, "a/keep.log"))
+
+    def test_last_matching_rule_wins(self):
+        self.assertTrue(self.ignored("!keep.log\n*.log\n", "keep.log"))
+
+    def test_negation_does_not_reinclude_file_of_ignored_directory(self):
+        self.assertTrue(self.ignored("logs/\n!logs/keep.log\n", "logs/keep.log"))
+
+    def test_comments_blank_lines_and_escapes(self):
+        rules = parse_gitignore("# comment\n\n\\#file\n\\!important\n", "")
+        self.assertEqual(len(rules), 2)
+        self.assertTrue(is_ignored(rules, "#file", {}))
+        self.assertTrue(is_ignored(rules, "!important", {}))
+
+    def test_nested_gitignore_rules_are_relative_to_their_directory(self):
+        self.assertTrue(self.ignored("/out\n", "pkg/out/a.js", "pkg/"))
+        self.assertFalse(self.ignored("/out\n", "out/a.js", "pkg/"))
+        self.assertTrue(self.ignored("*.tmp\n", "pkg/a/b.tmp", "pkg/"))
+        self.assertFalse(self.ignored("*.tmp\n", "b.tmp", "pkg/"))
+
+    def test_character_classes(self):
+        self.assertTrue(self.ignored("file[0-9].txt", "file1.txt"))
+        self.assertFalse(self.ignored("file[!0-9].txt", "file1.txt"))
+        self.assertTrue(self.ignored("file?.txt", "fileA.txt"))
+
+    # gitattributes tests
+    def test_parse_gitattributes_linguist_values(self):
+        rules = parse_gitattributes("vendor/** linguist-vendored\n"
+                                    "*.pb.go linguist-generated=true\n"
+                                    "vendor/own/** -linguist-vendored\n"
+                                    "gen/** linguist-generated=false\n"
+                                    "*.js text eol=lf\n"
+                                    "# docs/** linguist-documentation\n", "")
+
+        self.assertEqual([(reason, excluded) for _, reason, excluded in rules],
+                         [("vendored", True), ("generated", True), ("vendored", False), ("generated", False)])
+
+    def test_parse_gitattributes_skips_macros_and_directories(self):
+        self.assertEqual(parse_gitattributes("!vendor/** linguist-vendored\nvendor/ linguist-vendored\n", ""), [])
+
+    # PathFilter tests
+    def build_filter(self, blobs, deny_list="", rules="gitignore,gitattributes"):
+        reader = MagicMock()
+        reader.read_blob.side_effect = lambda blob_sha: blobs[blob_sha]
+        files = [(path, path, 1) for path in blobs]
+
+        path_filter = PathFilter(deny_list=deny_list, rules=rules)
+        path_filter.load(reader, files)
+
+        return path_filter, reader, files
+
+    def test_path_filter_exclude_reasons(self):
+        path_filter, _, _ = self.build_filter({
+            ".gitignore": b"*.log\n",
+            ".gitattributes": b"third_party/** linguist-vendored\nthird_party/own/** -linguist-vendored\n"
+                              b"*.pb.go linguist-generated\n",
+            "src/pkg/.gitignore": b"/tmp/\n",
+        }, deny_list="node_modules/")
+
+        self.assertEqual(path_filter.get_exclude_reason("node_modules/a/index.js"), "deny_list")
+        self.assertEqual(path_filter.get_exclude_reason("a/debug.log"), "gitignore")
+        self.assertEqual(path_filter.get_exclude_reason("src/pkg/tmp/a.py"), "gitignore")
+        self.assertIsNone(path_filter.get_exclude_reason("tmp/a.py"))
+        self.assertEqual(path_filter.get_exclude_reason("third_party/lib.c"), "vendored")
+        self.assertIsNone(path_filter.get_exclude_reason("third_party/own/lib.c"))
+        self.assertEqual(path_filter.get_exclude_reason("api/service.pb.go"), "generated")
+        self.assertIsNone(path_filter.get_exclude_reason("src/main.go"))
+
+    def test_default_deny_list_is_anchored_to_repository_root(self):
+        path_filter = PathFilter(deny_list="/node_modules/,/bower_components/,/vendor/,/build/,/dist/", rules="")
+
+        self.assertEqual(path_filter.get_exclude_reason("build/out.js"), "deny_list")
+        self.assertEqual(path_filter.get_exclude_reason("node_modules/a/index.js"), "deny_list")
+        self.assertIsNone(path_filter.get_exclude_reason("src/build/main.py"))
+        self.assertIsNone(path_filter.get_exclude_reason("internal/vendor/lib.go"))
+
+    def test_default_rules_keep_tracked_files_matching_gitignore(self):
+        path_filter, _, _ = self.build_filter({".gitignore": b"*.log\n",
+                                               ".gitattributes": b"gen/** linguist-generated\n"}, rules="gitattributes")
+
+        self.assertIsNone(path_filter.get_exclude_reason("debug.log"))
+        self.assertEqual(path_filter.get_exclude_reason("gen/a.py"), "generated")
+
+    def test_path_filter_ignores_disabled_rules_files(self):
+        path_filter, _, _ = self.build_filter({".gitignore": b"*.log\n"}, rules="")
+
+        self.assertIsNone(path_filter.get_exclude_reason("debug.log"))
+
+    def test_filter_files_counts_excluded_files(self):
+        blobs = {".gitignore": b"*.log\n", "debug.log": b"", "main.py": b"", "node_modules/x.js": b""}
+        path_filter, reader, files = self.build_filter(blobs, deny_list="node_modules/")
+        excluded = {}
+
+        kept = path_filter.filter_files(reader, files, excluded)
+
+        self.assertEqual([path for path, _, _ in kept], [".gitignore", "main.py"])
+        self.assertEqual(excluded, {"deny_list": 1, "gitignore": 1, "vendored": 0, "generated": 0})
+
+    def test_load_keeps_rules_until_a_rules_file_changes(self):
+        path_filter, reader, files = self.build_filter({".gitignore": b"*.log\n"})
+
+        path_filter.load(reader, files)
+        self.assertEqual(reader.read_blob.call_count, 1)
+
+        reader.read_blob.side_effect = lambda blob_sha: b"*.tmp\n"
+        path_filter.load(reader, [(".gitignore", "other", 1)])
+        self.assertEqual(reader.read_blob.call_count, 2)
+        self.assertIsNone(path_filter.get_exclude_reason("debug.log"))
+        self.assertEqual(path_filter.get_exclude_reason("a.tmp"), "gitignore")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from app.helpers.sampling_utils import *
+
+def build_hashes(length):
+    return [f"{number:040d}" for number in range(length)]
+
+class TestSamplingUtils(unittest.TestCase):
+
+    # select_evenly_spaced tests
+    def test_evenly_spaced_includes_first_and_last(self):
+        self.assertEqual(select_evenly_spaced(10, 4), [0, 3, 6, 9])
+        self.assertEqual(select_evenly_spaced(100, 3), [0, 50, 99])
+
+    def test_evenly_spaced_with_one(self):
+        self.assertEqual(select_evenly_spaced(10, 1), [0])
+
+    def test_evenly_spaced_with_k_equal_or_above_length(self):
+        self.assertEqual(select_evenly_spaced(5, 5), [0, 1, 2, 3, 4])
+        self.assertEqual(select_evenly_spaced(3, 10), [0, 1, 2])
+
+    def test_evenly_spaced_of_empty_sequence(self):
+        self.assertEqual(select_evenly_spaced(0, 5), [])
+        self.assertEqual(select_evenly_spaced(0, 0), [])
+
+    def test_evenly_spaced_with_zero(self):
+        self.assertEqual(select_evenly_spaced(10, 0), [])
+
+    def test_evenly_spaced_indexes_are_unique_and_sorted(self):
+        for length in range(1, 30):
+            for k in range(1, length + 1):
+                with self.subTest(length=length, k=k):
+                    indexes = select_evenly_spaced(length, k)
+
+                    self.assertEqual(indexes, sorted(set(indexes)))
+                    self.assertEqual(len(indexes), k)
+                    self.assertEqual((indexes[0], indexes[-1]), (0, length - 1) if k > 1 else (0, 0))
+
+    # select_highest_churn tests
+    def test_highest_churn_of_each_run(self):
+        hashes = build_hashes(6)
+        churn = {hashes[1]: 5, hashes[2]: 1, hashes[3]: 2, hashes[5]: 9}
+
+        self.assertEqual(select_highest_churn(hashes, 3, churn), [1, 3, 5])
+
+    def test_highest_churn_with_one(self):
+        hashes = build_hashes(6)
+
+        self.assertEqual(select_highest_churn(hashes, 1, {hashes[4]: 3}), [4])
+
+    def test_highest_churn_with_k_equal_or_above_length(self):
+        hashes = build_hashes(3)
+
+        self.assertEqual(select_highest_churn(hashes, 3, {}), [0, 1, 2])
+        self.assertEqual(select_highest_churn(hashes, 10, {}), [0, 1, 2])
+
+    def test_highest_churn_of_empty_history(self):
+        self.assertEqual(select_highest_churn([], 3, {}), [])
+        self.assertEqual(select_highest_churn([], 0, {}), [])
+
+    def test_highest_churn_with_zero(self):
+        self.assertEqual(select_highest_churn(build_hashes(5), 0, {}), [])
+
+    def test_highest_churn_ties_select_earliest_commit(self):
+        hashes = build_hashes(6)
+        churn = {hashes[1]: 4, hashes[2]: 4, hashes[4]: 7, hashes[5]: 7}
+
+        self.assertEqual(select_highest_churn(hashes, 2, churn), [1, 4])
+        self.assertEqual(select_highest_churn(hashes, 2, {}), [0, 3])
+
+    def test_highest_churn_selects_one_index_per_run(self):
+        for length in range(1, 30):
+            for k in range(1, length + 1):
+                with self.subTest(length=length, k=k):
+                    indexes = select_highest_churn(build_hashes(length), k, {})
+
+                    self.assertEqual(indexes, sorted(set(indexes)))
+                    self.assertEqual(len(indexes), k)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,7 @@ from pydantic import ValidationError
 
 from app.enums import StageEnum, StatusEnum
 from app.schemas import (
-    RepositoryCreate, RepositoryUpdate, AdditionalDataCreate, AdditionalDataUpdate,
+    RepositoryCreate, RepositoryUpdate, AdditionalDataCreate, AdditionalDataUpdate, CommitFilterCreate,
     PipelineCreate, PipelineUpdate, UserCreate, UserUpdate, TermBase
 )
 from uuid import uuid4
@@ -39,6 +39,12 @@ class TestSchemas(unittest.TestCase):
         self.assertEqual(schema.name, "Test Repo")
         self.assertEqual(schema.language, "Python")
 
+    def test_commit_filter_create_defaults(self):
+        schema = CommitFilterCreate(repository=uuid4())
+        self.assertFalse(schema.skip_merges)
+        self.assertIsNone(schema.author_deny_regex)
+        self.assertIsNone(schema.max_commits)
+
     def test_pipeline_create_valid(self):
         data = {
             "repository": uuid4(),